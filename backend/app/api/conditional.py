@@ -0,0 +1,51 @@
+# backend/app/api/conditional.py
+"""
+Conditional GET support for read endpoints.
+
+A user's data version is the latest `change_log` sequence number, which every
+repository write bumps in the same transaction. The ETag for a response is
+that version plus a digest of the request's query, so it changes whenever the
+user's data or the requested slice does. Handlers compare it against
+`If-None-Match` before reading anything else and answer 304 on a match.
+"""
+
+import hashlib
+from typing import Optional
+import aiosqlite
+from fastapi import Request, Response
+from app.core.metrics import metrics
+from app.repositories.changes import get_current_seq_async
+
+
+def make_etag(version: int, request: Request) -> str:
+    variant = f"{request.url.path}?{request.url.query}".encode()
+    return f'"{version}-{hashlib.sha1(variant).hexdigest()[:16]}"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """`If-None-Match` uses the weak comparison, so a `W/` prefix is ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+async def not_modified_or_tag(
+    request: Request,
+    response: Response,
+    db: aiosqlite.Connection,
+    user_id: str
+) -> Optional[Response]:
+    """
+    Return a 304 response if the client's copy is current; otherwise set the
+    ETag on `response` and return None so the handler builds the body.
+    """
+    etag = make_etag(await get_current_seq_async(db, user_id), request)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(etag, request.headers.get("if-none-match")):
+        metrics.incr("http.not_modified")
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
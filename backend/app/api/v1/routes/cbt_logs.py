@@ -1,79 +1,203 @@
 # backend/app/api/v1/routes/cbt_logs.py
 
-from typing import List
+from typing import AsyncIterator, List, Optional
 import asyncio
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.db.session import get_db
-from app.schemas.cbt import CBTLogPublic, CBTLogCreate, CBTAnalysisRequest, CBTAnalysisResponse
-from app.repositories.cbt import get_cbt_logs, create_cbt_log, update_cbt_log, delete_cbt_log
+import time
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.api.conditional import not_modified_or_tag
+from app.api.serialization import FAST_SERIALIZATION, cached_json_page
+from app.db.session import get_async_db, get_async_pool
+from app.schemas.cbt import (
+    CBTLogPublic,
+    CBTLogCreate,
+    CBTAnalysisError,
+    CBTAnalysisJob,
+    CBTAnalysisRequest,
+    CBTAnalysisResponse
+)
+from app.schemas.bulk import BulkCreateResponse
+from app.repositories.cbt import (
+    get_cbt_page_async,
+    create_cbt_log_async,
+    create_cbt_logs_bulk_async,
+    update_cbt_log_async,
+    delete_cbt_log_async
+)
+from app.repositories.ai_jobs import FAILED, SUCCEEDED, enqueue_ai_job_async, get_ai_job_async
+from app.repositories.bulk import MAX_BULK_ITEMS
+from app.repositories.pagination import MAX_PAGE_SIZE
 from app.services.ai_client import get_ai_client
-from app.services.gemini_client import SafetyException
+from app.services.admission import current_user_id
+from app.services.deadline import set_analysis_deadline
+from app.services.ai_jobs import ANALYZE_TIMEOUT_SECONDS, analysis_failure, get_analysis_workers
+from app.services.analysis_stream import AnalysisEvent, sse_message
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
+MAX_JOB_WAIT_SECONDS = 30
+
 
 @router.get("/", response_model=List[CBTLogPublic])
-def read_cbt_logs(db = Depends(get_db)):
-    return get_cbt_logs(db, user_id="1")
+async def read_cbt_logs(
+    request: Request,
+    response: Response,
+    since: Optional[int] = Query(None, description="Only logs with timestamp >= since"),
+    until: Optional[int] = Query(None, description="Only logs with timestamp < until"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db = Depends(get_async_db)
+):
+    not_modified = await not_modified_or_tag(request, response, db, user_id="1")
+    if not_modified:
+        return not_modified
+
+    async def load_page(cached: bool = True):
+        return await get_cbt_page_async(db, user_id="1", since=since, until=until, limit=limit, cursor=cursor, cached=cached)
+
+    try:
+        if FAST_SERIALIZATION:
+            # Caches the rendered JSON, so the decoded page is not cached as well
+            body, next_cursor = await cached_json_page(
+                db, "1", ("cbt_logs.json", since, until, limit, cursor), load_page, CBTLogPublic
+            )
+        else:
+            page = await load_page()
+            body, next_cursor = None, page.next_cursor
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if body is None:
+        return page.items
+    # Rows come from our own schema, so skip the response_model re-validation
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
 
 
 @router.post("/", response_model=CBTLogPublic)
-def create_cbt(log_in: CBTLogCreate, db = Depends(get_db)):
-    return create_cbt_log(db, user_id="1", log_in=log_in)
+async def create_cbt(log_in: CBTLogCreate, db = Depends(get_async_db)):
+    return await create_cbt_log_async(db, user_id="1", log_in=log_in)
+
+
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_cbt_bulk(
+    logs_in: List[CBTLogCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db = Depends(get_async_db)
+):
+    return (await create_cbt_logs_bulk_async(db, user_id="1", logs_in=logs_in))._asdict()
 
 
 @router.put("/{log_id}", response_model=CBTLogPublic)
-def update_cbt(log_id: str, log_in: CBTLogPublic, db = Depends(get_db)):
-    if not update_cbt_log(db, user_id="1", log_in=log_in):
+async def update_cbt(log_id: str, log_in: CBTLogPublic, db = Depends(get_async_db)):
+    if not await update_cbt_log_async(db, user_id="1", log_in=log_in):
         raise HTTPException(status_code=404, detail="CBT log not found")
     return log_in
 
 
 @router.delete("/{log_id}")
-def remove_cbt(log_id: str, db = Depends(get_db)):
-    if not delete_cbt_log(db, user_id="1", log_id=log_id):
+async def remove_cbt(log_id: str, db = Depends(get_async_db)):
+    if not await delete_cbt_log_async(db, user_id="1", log_id=log_id):
         raise HTTPException(status_code=404, detail="CBT log not found")
     return {"status": "success"}
 
 
-@router.post("/analyze", response_model=CBTAnalysisResponse)
-async def analyze_cbt(request: CBTAnalysisRequest):
+@router.post("/analyze", response_model=CBTAnalysisResponse, responses={202: {"model": CBTAnalysisJob}})
+async def analyze_cbt(
+    request: CBTAnalysisRequest,
+    http_request: Request,
+    mode: str = Query("sync", pattern="^(sync|async)$", description="async queues the analysis and returns a job")
+):
     """
     AI-powered cognitive analysis of automatic thoughts.
 
-    Returns distortion suggestions and rational reframes.
+    Returns distortion suggestions and rational reframes. With `mode=async`
+    the analysis is queued instead and a 202 with the job is returned at
+    once; poll the job's `Location` for the result.
     """
+    if mode == "async":
+        async with get_async_pool().connection() as db:
+            job = await enqueue_ai_job_async(db, user_id="1", request=request.model_dump())
+        get_analysis_workers().notify()
+        location = str(http_request.url_for("read_analysis_job", job_id=job["id"]).path)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=CBTAnalysisJob.model_validate(job).model_dump(mode="json", by_alias=True),
+            headers={"Location": location}
+        )
+
+    current_user_id.set("1")
+    set_analysis_deadline(ANALYZE_TIMEOUT_SECONDS)
     ai_client = get_ai_client()
 
     try:
         result = await asyncio.wait_for(
             ai_client.analyze_cbt(request),
-            timeout=10.0
+            timeout=ANALYZE_TIMEOUT_SECONDS
         )
         return result
-    except SafetyException as e:
-        # Fixed: avoid using 'message' in extra as it's reserved
-        logger.warning("Safety exception triggered", extra={"detail": e.message})
-        raise HTTPException(
-            status_code=status.HTTP_451_UNAVAILABLE_FOR_LEGAL_REASONS,
-            detail={
-                "message": e.message,
-                "trigger": "safety",
-                "crisis_resources": e.crisis_resources
-            }
-        )
-    except asyncio.TimeoutError:
-        logger.warning("AI analysis timed out")
-        raise HTTPException(
-            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-            detail="Analysis timed out. Please try again."
-        )
     except Exception as e:
-        logger.error("AI analysis failed", extra={"error": str(e)})
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Analysis service unavailable"
-        )
+        failure = analysis_failure(e)
+        headers = {"Retry-After": str(failure.retry_after)} if failure.retry_after else None
+        raise HTTPException(status_code=failure.status_code, detail=failure.detail, headers=headers)
+
+
+async def _analysis_events(ai_client, request: CBTAnalysisRequest, user_id: str) -> AsyncIterator[bytes]:
+    current_user_id.set(user_id)
+    events = ai_client.analyze_cbt_stream(request)
+    deadline = set_analysis_deadline(ANALYZE_TIMEOUT_SECONDS)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(anext(events), timeout=max(deadline - time.monotonic(), 0))
+            except StopAsyncIteration:
+                return
+            yield sse_message(event)
+    except Exception as e:
+        yield sse_message(AnalysisEvent("error", CBTAnalysisError(**analysis_failure(e)._asdict())))
+    finally:
+        await events.aclose()
+
+
+@router.post("/analyze/stream", responses={200: {"content": {"text/event-stream": {}}}})
+async def analyze_cbt_stream(request: CBTAnalysisRequest):
+    """
+    The same analysis as `/analyze`, streamed as Server-Sent Events:
+    `distortions` once they are detected, a `reframe` per generated reframe,
+    then `done` with the complete response. A failure, including a safety
+    trigger, ends the stream with an `error` event carrying the status code
+    and detail `/analyze` would have responded with.
+    """
+    ai_client = get_ai_client()
+    return StreamingResponse(
+        _analysis_events(ai_client, request, user_id="1"),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/analyze/jobs/{job_id}", response_model=CBTAnalysisJob)
+async def read_analysis_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_JOB_WAIT_SECONDS, description="Seconds to hold the request until the job finishes")
+):
+    """
+    A queued analysis. With `wait`, the response is held until the job has
+    finished or `wait` seconds have passed, so clients can long-poll instead
+    of polling in a loop. A connection is held only for each status read,
+    never while waiting.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        async with get_async_pool().connection() as db:
+            job = await get_ai_job_async(db, user_id="1", job_id=job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Analysis job not found")
+        remaining = deadline - time.monotonic()
+        if job["status"] in (SUCCEEDED, FAILED) or remaining <= 0:
+            return job
+        await get_analysis_workers().wait(job_id, remaining)
@@ -1,124 +1,260 @@
 import json
-import csv
-import io
-from fastapi import APIRouter, Depends, HTTPException, Response
-from app.db.session import get_db
-from app.repositories.mood import get_mood_entries
-from app.repositories.cbt import get_cbt_logs
+import os
+import uuid
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from app.api.conditional import not_modified_or_tag
+from app.db.session import get_async_db, get_async_pool
+from app.repositories.data_jobs import (
+    EXPORT,
+    IMPORT,
+    SUCCEEDED,
+    create_job_async,
+    get_job_async,
+    get_job_by_key_async
+)
+from app.schemas.data import DataJob, ImportSummary
+from app.services.data_jobs import export_artifact_media_type, export_artifact_name, get_job_runner, job_file_path, spool_upload
+from app.services.columnar import COLUMNAR_TABLES
+from app.services.exporter import COMPRESSIONS, EXPORT_FORMATS, export_filename, export_media_type, open_export, render_export
+from app.services.importer import (
+    EXPORT_KEYS,
+    IMPORT_BATCH_SIZE,
+    MAX_IMPORT_BATCH_SIZE,
+    PARSERS,
+    ImportFormatError,
+    ImportProgress,
+    check_records,
+    import_records,
+    import_records_atomically
+)
 from pydantic import BaseModel
 
 router = APIRouter()
 
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+def _import_format(request: Request, format: Optional[str]) -> str:
+    if format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        format = "ndjson" if content_type in NDJSON_CONTENT_TYPES else "json"
+    if format not in PARSERS:
+        raise HTTPException(status_code=400, detail="Unsupported format")
+    return format
+
 class ImportRequest(BaseModel):
     format: str
     content: str
 
+def _check_export_args(format: str, table: Optional[str], compression: Optional[str] = None) -> None:
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported format")
+    if EXPORT_FORMATS[format].columnar:
+        if table not in COLUMNAR_TABLES:
+            raise HTTPException(status_code=400, detail=f"Columnar exports need table={' or '.join(COLUMNAR_TABLES)}")
+        if compression is not None:
+            raise HTTPException(status_code=400, detail="Columnar exports are already compressed")
+    elif compression is not None and compression not in COMPRESSIONS:
+        raise HTTPException(status_code=400, detail="Unsupported compression")
+
 @router.get("/export")
-def export_data(format: str = "json", db = Depends(get_db)):
+async def export_data(
+    request: Request,
+    response: Response,
+    format: str = "json",
+    table: Optional[str] = Query(None, description="moods or cbt_logs; required for arrow and parquet"),
+    compression: Optional[str] = Query(None, description="gzip, for json, csv and md"),
+    since: Optional[int] = Query(None, description="Only entries with timestamp >= since (ms)"),
+    until: Optional[int] = Query(None, description="Only entries with timestamp < until (ms)"),
+    cursor: Optional[int] = Query(None, ge=0, description="highWaterMark of a previous export; only rows changed after it"),
+    db = Depends(get_async_db)
+):
+    """
+    Export data, optionally bounded and incremental. The manifest's
+    `highWaterMark` is also sent as `X-Export-High-Water-Mark`; pass it as
+    `cursor` next time to export only the changes since this export.
+    """
     user_id = "1"
-    moods = get_mood_entries(db, user_id)
-    cbt_logs = get_cbt_logs(db, user_id)
+    _check_export_args(format, table, compression)
+    not_modified = await not_modified_or_tag(request, response, db, user_id)
+    if not_modified:
+        return not_modified
 
-    if format == "json":
-        data = {
-            "moodEntries": moods,
-            "cbtLogs": cbt_logs
+    manifest, moods, cbt_logs = await open_export(db, user_id, format, since, until, cursor)
+    # The body is produced after this handler (and its `db` dependency) has
+    # returned; the row iterators check out pooled connections per chunk
+    return StreamingResponse(
+        render_export(format, moods, cbt_logs, table, compression, manifest),
+        media_type=export_media_type(format, compression),
+        headers={
+            **response.headers,
+            "Content-Disposition": f"attachment; filename={export_filename(format, table, compression)}",
+            "X-Export-High-Water-Mark": str(manifest["highWaterMark"]),
         }
-        return Response(
-            content=json.dumps(data, indent=2),
-            media_type="application/json",
-            headers={"Content-Disposition": "attachment; filename=mindfultrack_export.json"}
-        )
-    
-    elif format == "csv":
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        writer.writerow(["--- MOOD ENTRIES ---"])
-        writer.writerow(["ID", "Timestamp", "Rating", "Emotions", "Note", "Trigger", "Behavior"])
-        for m in moods:
-            writer.writerow([
-                m["id"], m["timestamp"], m["rating"], 
-                ", ".join(m["emotions"]), m.get("note", ""), 
-                m.get("trigger", ""), m.get("behavior", "")
-            ])
-        
-        writer.writerow([])
-        writer.writerow(["--- CBT LOGS ---"])
-        writer.writerow(["ID", "Timestamp", "Situation", "Automatic Thoughts", "Distortions", "Rational Response", "Mood Before", "Mood After", "Behavioral Link"])
-        for log in cbt_logs:
-            writer.writerow([
-                log["id"], log["timestamp"], log["situation"], 
-                log["automatic_thoughts"], ", ".join(log["distortions"]), 
-                log["rational_response"], log["mood_before"], 
-                log.get("mood_after", ""), log.get("behavioral_link", "")
-            ])
-            
-        return Response(
-            content=output.getvalue(),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=mindfultrack_export.csv"}
-        )
-
-    elif format == "md":
-        output = io.StringIO()
-        output.write("# MindfulTrack Export\n\n")
-        
-        output.write("## Mood Entries\n\n")
-        for m in moods:
-            output.write(f"### {m['timestamp']} - Rating: {m['rating']}\n")
-            output.write(f"**Emotions:** {', '.join(m['emotions'])}\n\n")
-            if m.get("note"):
-                output.write(f"> {m.get('note')}\n\n")
-            if m.get("trigger"):
-                output.write(f"*Trigger:* {m.get('trigger')}\n")
-            if m.get("behavior"):
-                output.write(f"*Behavior:* {m.get('behavior')}\n")
-            output.write("\n---\n\n")
-            
-        output.write("## CBT Logs\n\n")
-        for log in cbt_logs:
-            output.write(f"### Situation: {log['situation']}\n")
-            output.write(f"**Thoughts:** {log['automatic_thoughts']}\n")
-            output.write(f"**Distortions:** {', '.join(log['distortions'])}\n")
-            output.write(f"**Reframed:** {log['rational_response']}\n")
-            output.write("\n---\n\n")
-            
-        return Response(
-            content=output.getvalue(),
-            media_type="text/markdown",
-            headers={"Content-Disposition": "attachment; filename=mindfultrack_export.md"}
-        )
+    )
 
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported format")
+@router.post("/import", response_model=ImportSummary)
+async def import_data(req: ImportRequest, db = Depends(get_async_db)):
+    """
+    Import an export embedded as a string. Prefer /import/stream for large archives.
 
-@router.post("/import")
-def import_data(req: ImportRequest, db = Depends(get_db)):
+    All or nothing: if any record is invalid, 400 reports how many and what is
+    wrong with the first few, and nothing is imported.
+    """
     if req.format != "json":
         raise HTTPException(status_code=400, detail="Only JSON import is supported in this version")
-    
+
     try:
         data = json.loads(req.content)
-        user_id = "1"
-        cursor = db.cursor()
-        
-        if "moodEntries" in data:
-            for m in data["moodEntries"]:
-                ai_analysis = m.get("ai_analysis")
-                cursor.execute(
-                    "INSERT OR IGNORE INTO mood_entries (id, rating, emotions, note, trigger, behavior, timestamp, user_id, ai_analysis) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (m["id"], m["rating"], json.dumps(m["emotions"]), m.get("note"), m.get("trigger"), m.get("behavior"), m["timestamp"], user_id, json.dumps(ai_analysis) if ai_analysis else None)
-                )
-        
-        if "cbtLogs" in data:
-            for log in data["cbtLogs"]:
-                cursor.execute(
-                    "INSERT OR IGNORE INTO cbt_logs (id, timestamp, situation, automatic_thoughts, distortions, rational_response, mood_before, mood_after, behavioral_link, user_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (log["id"], log["timestamp"], log["situation"], log["automatic_thoughts"], json.dumps(log["distortions"]), log["rational_response"], log["mood_before"], log.get("mood_after"), log.get("behavioral_link"), user_id)
-                )
-        
-        db.commit()
-        return {"message": "Data imported successfully"}
+        if not isinstance(data, dict):
+            raise ValueError("Expected a JSON object")
+        records = [(entity, record) for key, entity in EXPORT_KEYS.items() for record in data.get(key, [])]
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+    checked = check_records("1", records)
+    if checked.invalid:
+        raise HTTPException(status_code=400, detail={
+            "message": f"{checked.invalid} invalid records, nothing was imported",
+            "invalid": checked.invalid,
+            "errors": checked.errors,
+        })
+    try:
+        progress = await import_records_atomically(db, "1", records)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return progress.summary()
+
+@router.post("/import/stream", response_model=ImportSummary)
+async def import_data_stream(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson or json; defaults from Content-Type"),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=MAX_IMPORT_BATCH_SIZE)
+):
+    """
+    Import a streamed upload without buffering it: NDJSON (one object per line
+    with a `type` of "mood" or "cbt") or the JSON document written by /export.
+    A pooled connection is only taken to write each batch.
+    """
+    format = _import_format(request, format)
+
+    progress = ImportProgress()
+    try:
+        await import_records(get_async_pool().connection, "1", PARSERS[format](request.stream()), batch_size, progress)
+    except ImportFormatError as e:
+        # Batches committed before the error are kept; report how far we got
+        raise HTTPException(status_code=400, detail={"message": str(e), "progress": progress.summary()})
+    return progress.summary()
+
+
+# --- Background jobs ---
+
+def _job_response(request: Request, job: dict) -> dict:
+    download_url = None
+    if job["kind"] == EXPORT and job["status"] == SUCCEEDED:
+        download_url = str(request.url_for("download_export_job", job_id=job["id"]).path)
+    return {**job, "download_url": download_url}
+
+@router.post("/exports", response_model=DataJob, status_code=202)
+async def create_export_job(
+    request: Request,
+    response: Response,
+    format: str = "json",
+    table: Optional[str] = Query(None, description="moods or cbt_logs; required for arrow and parquet"),
+    since: Optional[int] = Query(None, description="Only entries with timestamp >= since (ms)"),
+    until: Optional[int] = Query(None, description="Only entries with timestamp < until (ms)"),
+    cursor: Optional[int] = Query(None, ge=0, description="highWaterMark of a previous export; only rows changed after it"),
+    idempotency_key: Optional[str] = Header(None),
+    db = Depends(get_async_db)
+):
+    """
+    Queue an export that is rendered in the background into an artifact on
+    disk: gzip for the text formats, a single table for the columnar ones.
+    The finished job's `progress` is the export manifest. Repeating the
+    request with the same `Idempotency-Key` returns the same job.
+    """
+    _check_export_args(format, table)
+    params = {"table": table, "since": since, "until": until, "cursor": cursor}
+    job = await create_job_async(db, "1", EXPORT, format, params, idempotency_key=idempotency_key)
+    if job.pop("created"):
+        get_job_runner().submit(job["id"])
+    else:
+        response.status_code = 200
+    response.headers["Location"] = str(request.url_for("read_export_job", job_id=job["id"]).path)
+    return _job_response(request, job)
+
+@router.get("/exports/{job_id}", response_model=DataJob)
+async def read_export_job(request: Request, job_id: str, db = Depends(get_async_db)):
+    job = await get_job_async(db, "1", job_id, EXPORT)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return _job_response(request, job)
+
+@router.get("/exports/{job_id}/download")
+async def download_export_job(job_id: str, db = Depends(get_async_db)):
+    """
+    The finished artifact. Served from disk with `Accept-Ranges: bytes`, so an
+    interrupted download can be resumed with `Range` (and `If-Range`).
+    """
+    job = await get_job_async(db, "1", job_id, EXPORT)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job["status"] != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+    if not job["file_path"] or not os.path.exists(job["file_path"]):
+        raise HTTPException(status_code=410, detail="Export artifact has expired")
+    return FileResponse(job["file_path"], media_type=export_artifact_media_type(job), filename=export_artifact_name(job))
+
+@router.post("/imports", response_model=DataJob, status_code=202)
+async def create_import_job(
+    request: Request,
+    response: Response,
+    format: Optional[str] = Query(None, description="ndjson or json; defaults from Content-Type"),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=MAX_IMPORT_BATCH_SIZE),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """
+    Spool an upload to disk and import it in the background. A retried upload
+    with the same `Idempotency-Key` is not read again; the original job is
+    returned. Re-running a job never duplicates rows, since ids are unique.
+
+    No connection is held while the body arrives: the job is only queued once
+    the upload is on disk, so an upload that breaks off leaves no job behind.
+    """
+    format = _import_format(request, format)
+    if idempotency_key is not None:
+        async with get_async_pool().connection() as db:
+            job = await get_job_by_key_async(db, "1", IMPORT, idempotency_key)
+        if job is not None:
+            response.status_code = 200
+            return _job_response(request, job)
+
+    path = job_file_path(uuid.uuid4().hex, "upload")
+    try:
+        size = await spool_upload(request.stream(), path)
+        async with get_async_pool().connection() as db:
+            job = await create_job_async(
+                db, "1", IMPORT, format, {"batch_size": batch_size},
+                idempotency_key=idempotency_key, file_path=path, size_bytes=size
+            )
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    if not job.pop("created"):
+        # A concurrent request with the same key won the insert
+        os.remove(path)
+        response.status_code = 200
+        return _job_response(request, job)
+
+    get_job_runner().submit(job["id"])
+    response.headers["Location"] = str(request.url_for("read_import_job", job_id=job["id"]).path)
+    return _job_response(request, job)
+
+@router.get("/imports/{job_id}", response_model=DataJob)
+async def read_import_job(request: Request, job_id: str, db = Depends(get_async_db)):
+    job = await get_job_async(db, "1", job_id, IMPORT)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return _job_response(request, job)
@@ -1,21 +1,70 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from app.db.session import get_db
+from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from app.api.conditional import not_modified_or_tag
+from app.api.serialization import FAST_SERIALIZATION, cached_json_page
+from app.db.session import get_async_db
 from app.schemas.mood import MoodPublic, MoodCreate
-from app.repositories.mood import get_mood_entries, create_mood_entry, delete_mood_entry
+from app.schemas.bulk import BulkCreateResponse
+from app.repositories.mood import (
+    get_mood_page_async,
+    create_mood_entry_async,
+    create_mood_entries_bulk_async,
+    delete_mood_entry_async
+)
+from app.repositories.bulk import MAX_BULK_ITEMS
+from app.repositories.pagination import MAX_PAGE_SIZE
 
 router = APIRouter()
 
 @router.get("/", response_model=List[MoodPublic])
-def read_moods(db = Depends(get_db)):
-    return get_mood_entries(db, user_id="1")
+async def read_moods(
+    request: Request,
+    response: Response,
+    since: Optional[int] = Query(None, description="Only entries with timestamp >= since"),
+    until: Optional[int] = Query(None, description="Only entries with timestamp < until"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db = Depends(get_async_db)
+):
+    not_modified = await not_modified_or_tag(request, response, db, user_id="1")
+    if not_modified:
+        return not_modified
+
+    async def load_page(cached: bool = True):
+        return await get_mood_page_async(db, user_id="1", since=since, until=until, limit=limit, cursor=cursor, cached=cached)
+
+    try:
+        if FAST_SERIALIZATION:
+            # Caches the rendered JSON, so the decoded page is not cached as well
+            body, next_cursor = await cached_json_page(
+                db, "1", ("mood_entries.json", since, until, limit, cursor), load_page, MoodPublic
+            )
+        else:
+            page = await load_page()
+            body, next_cursor = None, page.next_cursor
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if body is None:
+        return page.items
+    # Rows come from our own schema, so skip the response_model re-validation
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
 
 @router.post("/", response_model=MoodPublic)
-async def create_mood(mood_in: MoodCreate, db = Depends(get_db)):
-    return await create_mood_entry(db, user_id="1", mood_in=mood_in)
+async def create_mood(mood_in: MoodCreate, db = Depends(get_async_db)):
+    return await create_mood_entry_async(db, user_id="1", mood_in=mood_in)
+
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_moods_bulk(
+    moods_in: List[MoodCreate] = Body(..., max_length=MAX_BULK_ITEMS),
+    db = Depends(get_async_db)
+):
+    return (await create_mood_entries_bulk_async(db, user_id="1", moods_in=moods_in))._asdict()
 
 @router.delete("/{mood_id}")
-def remove_mood(mood_id: str, db = Depends(get_db)):
-    if not delete_mood_entry(db, user_id="1", mood_id=mood_id):
+async def remove_mood(mood_id: str, db = Depends(get_async_db)):
+    if not await delete_mood_entry_async(db, user_id="1", mood_id=mood_id):
         raise HTTPException(status_code=404, detail="Mood entry not found")
     return {"status": "success"}
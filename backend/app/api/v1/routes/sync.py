@@ -0,0 +1,47 @@
+# backend/app/api/v1/routes/sync.py
+
+from fastapi import APIRouter, Depends, Query
+from app.db.session import get_async_db
+from app.schemas.sync import SyncResponse
+from app.repositories.changes import MOOD, CBT, DELETE, get_changes_since_async
+from app.repositories.mood import get_moods_by_id_async
+from app.repositories.cbt import get_cbt_logs_by_id_async
+
+router = APIRouter()
+
+MAX_SYNC_CHANGES = 1000
+
+@router.get("", response_model=SyncResponse)
+async def sync_changes(
+    since: int = Query(0, ge=0, description="Cursor returned by the previous sync; 0 for a full sync"),
+    limit: int = Query(MAX_SYNC_CHANGES, ge=1, le=MAX_SYNC_CHANGES),
+    db = Depends(get_async_db)
+):
+    user_id = "1"
+    changes, has_more = await get_changes_since_async(db, user_id, since, limit)
+
+    # Collapse to the latest operation per row; the order within a batch doesn't matter
+    latest = {}
+    for change in changes:
+        latest[(change["entity"], change["entity_id"])] = change["op"]
+
+    upserts = {MOOD: [], CBT: []}
+    deleted = {MOOD: [], CBT: []}
+    for (entity, entity_id), op in latest.items():
+        (deleted if op == DELETE else upserts)[entity].append(entity_id)
+
+    moods = await get_moods_by_id_async(db, user_id, upserts[MOOD])
+    cbt_logs = await get_cbt_logs_by_id_async(db, user_id, upserts[CBT])
+
+    # A row deleted after this batch was read is gone already; its tombstone
+    # arrives in a later batch, so report it as deleted now to stay consistent
+    deleted[MOOD] += sorted(set(upserts[MOOD]) - {m["id"] for m in moods})
+    deleted[CBT] += sorted(set(upserts[CBT]) - {log["id"] for log in cbt_logs})
+
+    return {
+        "cursor": changes[-1]["seq"] if changes else since,
+        "has_more": has_more,
+        "moods": moods,
+        "cbt_logs": cbt_logs,
+        "deleted": {"moods": deleted[MOOD], "cbt_logs": deleted[CBT]},
+    }
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from app.db.session import get_db
+from app.db.session import get_async_db, execute_write_async
+from app.db.writer import Statement
 
 router = APIRouter()
 
@@ -9,22 +10,19 @@ class UserUpdate(BaseModel):
     email: str
 
 @router.get("/me")
-def read_user_me(db = Depends(get_db)):
+async def read_user_me(db = Depends(get_async_db)):
     user_id = "1"
-    cursor = db.cursor()
-    cursor.execute("SELECT id, name, email FROM users WHERE id = ?", (user_id,))
-    row = cursor.fetchone()
+    async with db.execute("SELECT id, name, email FROM users WHERE id = ?", (user_id,)) as cursor:
+        row = await cursor.fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="User not found")
     return dict(row)
 
 @router.put("/me")
-def update_user_me(user_in: UserUpdate, db = Depends(get_db)):
+async def update_user_me(user_in: UserUpdate, db = Depends(get_async_db)):
     user_id = "1"
-    cursor = db.cursor()
-    cursor.execute(
+    await execute_write_async(db, [Statement(
         "UPDATE users SET name = ?, email = ? WHERE id = ?",
         (user_in.name, user_in.email, user_id)
-    )
-    db.commit()
+    )])
     return {"id": user_id, **user_in.model_dump()}
@@ -7,7 +7,8 @@ Uses Pydantic Settings for type-safe configuration with validation.
 """
 
 from functools import lru_cache
-from pydantic import Field
+from typing import Literal
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -19,9 +20,46 @@ class AIConfig(BaseSettings):
         gemini_api_key: Google Gemini API key
         gemini_model: Model name to use for Gemini (default: gemini-1.5-flash)
         gemini_temperature: Temperature for model generation (0.0-1.0)
-        ai_timeout: Timeout in seconds for AI requests
+        ai_timeout: Timeout in seconds for one model call; shorter when less
+            of the analysis deadline is left
         ai_max_retries: Maximum number of retries for failed requests
+        ai_expected_call_seconds: Latency assumed for a model call when
+            deciding whether a retry still fits the deadline, until
+            `ai_latency_min_samples` calls were measured
+        ai_latency_min_samples: Calls measured before their p95 is trusted
+        ai_max_concurrency: Maximum number of Gemini calls in flight per process
+        ai_hedge_enabled: Whether a slow Gemini call gets a second, identical
+            call and the first answer wins
+        ai_hedge_percentile: Percentile of recent call latency after which
+            a call is hedged
+        ai_hedge_max_rate: Largest share of calls that may be hedged
+        ai_hedge_min_samples: Calls measured before hedging starts
         enable_gemini: Whether to use Gemini (true) or fall back to TextBlob (false)
+        ai_analysis_strategy: How CBT analysis calls the model: "sequential"
+            (detect, then reframe), "parallel" (both at once, reframing from a
+            local distortion guess) or "combined" (one prompt for both)
+        ai_requests_per_minute: Gemini request quota admission control keeps to
+        ai_tokens_per_minute: Gemini token quota admission control keeps to
+        ai_worker_processes: Processes sharing those quotas; admission
+            control is per process, so each one keeps to its share. Defaults
+            to `WEB_CONCURRENCY`, uvicorn's worker count, if that is set
+        ai_tokens_per_call: Token estimate per model call (prompt and answer)
+        ai_admission_max_wait_seconds: Analyses that would wait longer for
+            quota are rejected with 429 instead of queued
+        ai_admission_max_queued_per_user: Waiting analyses allowed per user
+        ai_breaker_window_seconds: Rolling window the circuit breaker judges
+        ai_breaker_min_calls: Calls needed in the window before it can open
+        ai_breaker_failure_rate: Share of failed or slow calls that opens it
+        ai_breaker_slow_call_seconds: Calls at least this slow count as failed
+        ai_breaker_open_seconds: How long it stays open before probing
+        ai_breaker_fallback: While open, answer with a local "heuristic"
+            analysis marked degraded, or "fail" fast with 503
+        ai_cache_enabled: Whether CBT analysis results are cached
+        ai_cache_ttl_seconds: How long a cached analysis stays valid
+        ai_cache_max_bytes: Size budget of the SQLite cache tier
+        ai_cache_memory_entries: Entries kept in the in-memory LRU tier
+        ai_cache_max_temperature: Above this temperature outputs are meant to
+            vary, so the cache is bypassed
     """
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -34,7 +72,34 @@ class AIConfig(BaseSettings):
     gemini_temperature: float = Field(default=0.7, ge=0.0, le=1.0)
     ai_timeout: int = Field(default=10, gt=0, description="AI request timeout in seconds")
     ai_max_retries: int = Field(default=2, ge=0, description="Max retry attempts for AI requests")
+    ai_expected_call_seconds: float = Field(default=2.0, gt=0.0)
+    ai_latency_min_samples: int = Field(default=20, ge=1)
+    ai_max_concurrency: int = Field(default=8, gt=0, description="Max concurrent Gemini calls per process")
+    ai_hedge_enabled: bool = False
+    ai_hedge_percentile: float = Field(default=95.0, gt=0.0, lt=100.0)
+    ai_hedge_max_rate: float = Field(default=0.05, gt=0.0, le=1.0)
+    ai_hedge_min_samples: int = Field(default=50, ge=1)
     enable_gemini: bool = True
+    ai_analysis_strategy: Literal["sequential", "parallel", "combined"] = "sequential"
+    ai_requests_per_minute: int = Field(default=600, gt=0)
+    ai_tokens_per_minute: int = Field(default=1_000_000, gt=0)
+    ai_worker_processes: int = Field(
+        default=1, gt=0, validation_alias=AliasChoices("ai_worker_processes", "web_concurrency")
+    )
+    ai_tokens_per_call: int = Field(default=1500, gt=0)
+    ai_admission_max_wait_seconds: float = Field(default=5.0, ge=0.0)
+    ai_admission_max_queued_per_user: int = Field(default=4, ge=0)
+    ai_breaker_window_seconds: float = Field(default=60.0, gt=0.0)
+    ai_breaker_min_calls: int = Field(default=10, gt=0)
+    ai_breaker_failure_rate: float = Field(default=0.5, gt=0.0, le=1.0)
+    ai_breaker_slow_call_seconds: float = Field(default=8.0, gt=0.0)
+    ai_breaker_open_seconds: float = Field(default=30.0, gt=0.0)
+    ai_breaker_fallback: Literal["heuristic", "fail"] = "heuristic"
+    ai_cache_enabled: bool = True
+    ai_cache_ttl_seconds: int = Field(default=7 * 24 * 3600, gt=0)
+    ai_cache_max_bytes: int = Field(default=50 * 1024 * 1024, ge=0)
+    ai_cache_memory_entries: int = Field(default=256, ge=0)
+    ai_cache_max_temperature: float = Field(default=0.7, ge=0.0, le=1.0)
 
 
 @lru_cache()
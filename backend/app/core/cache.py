@@ -0,0 +1,79 @@
+# backend/app/core/cache.py
+"""
+Small thread-safe LRU cache.
+
+Entries are evicted least-recently-used first once `max_entries` is reached.
+Hits, misses and evictions are counted in the metrics registry under `name`.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+from app.core.metrics import metrics
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Size-bounded mapping with least-recently-used eviction."""
+
+    def __init__(self, max_entries: int = 256, name: str = "cache"):
+        if max_entries < 0:
+            raise ValueError("max_entries must not be negative")
+        self.max_entries = max_entries
+        self.name = name
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+        if value is _MISSING:
+            metrics.incr(f"{self.name}.misses")
+            return default
+        metrics.incr(f"{self.name}.hits")
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_entries == 0:
+            return
+        evicted = 0
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            metrics.incr(f"{self.name}.evictions", evicted)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key satisfies `predicate`; returns how many were dropped."""
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        hits = metrics.counter(f"{self.name}.hits")
+        misses = metrics.counter(f"{self.name}.misses")
+        lookups = hits + misses
+        return {
+            "max_entries": self.max_entries,
+            "entries": len(self),
+            "hits": hits,
+            "misses": misses,
+            "evictions": metrics.counter(f"{self.name}.evictions"),
+            "hit_ratio": round(hits / lookups, 3) if lookups else None,
+        }
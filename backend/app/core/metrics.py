@@ -0,0 +1,125 @@
+# backend/app/core/metrics.py
+"""
+In-process metrics registry.
+
+Counters, gauges and latency histograms are kept in memory per worker process
+and exposed as a JSON snapshot on `/metrics`. Subsystems that already track
+their own state (e.g. the connection pool) can register a collector callback
+that is evaluated lazily whenever a snapshot is taken.
+"""
+
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+class Histogram:
+    """Latency histogram over a sliding window of recent samples."""
+
+    def __init__(self, window: int = 1024):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._samples.append(value)
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Return the p-th percentile (0-100) of the sample window, or None if empty."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def values(self) -> List[float]:
+        """Copy of the sample window."""
+        with self._lock:
+            return list(self._samples)
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "max": round(self.max, 3),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of named counters, gauges and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._collectors: Dict[str, Callable[[], dict]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self._gauges[name] = value
+
+    def histogram(self, name: str) -> Histogram:
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram()
+            return hist
+
+    def observe(self, name: str, value: float) -> None:
+        self.histogram(name).observe(value)
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def register_collector(self, name: str, collector: Callable[[], dict]) -> None:
+        """Register a callback whose dict output is included in every snapshot."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = dict(self._histograms)
+            collectors = dict(self._collectors)
+
+        collected = {}
+        for name, collector in collectors.items():
+            try:
+                collected[name] = collector()
+            except Exception as e:
+                collected[name] = {"error": str(e)}
+
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": {name: hist.snapshot() for name, hist in histograms.items()},
+            **collected,
+        }
+
+    def reset(self) -> None:
+        """Drop all recorded values (collectors are kept). Intended for tests."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,231 @@
+# backend/app/db/async_pool.py
+"""
+Bounded pool of `aiosqlite` connections for async request handlers.
+
+The async counterpart of `ConnectionPool`: connections are configured once
+when opened and handed out exclusively, but waiting for a free connection
+suspends the coroutine instead of blocking a thread. Waiters are plain
+futures woken through their own loop, so one pool can serve several event
+loops (e.g. the test client and uvicorn) without binding to either.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+import aiosqlite
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.db.pool import DEFAULT_PRAGMAS, PoolClosedError, PoolTimeoutError
+
+logger = get_logger(__name__)
+
+
+class AsyncConnectionPool:
+    """Pool of `aiosqlite` connections to a single database file."""
+
+    def __init__(
+        self,
+        database_path: str,
+        max_size: int = 5,
+        timeout: float = 30.0,
+        pragmas: Optional[Dict[str, Any]] = None,
+        health_check_interval: float = 30.0,
+        read_only: bool = False,
+        name: str = "db.async_pool"
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.database_path = database_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.health_check_interval = health_check_interval
+        self.read_only = read_only
+        self.name = name
+
+        # Guards the bookkeeping below; never held across an await
+        self._lock = threading.Lock()
+        self._idle: List[Tuple[aiosqlite.Connection, float]] = []
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._checkouts = 0
+        self._waits = 0
+
+    async def _connect(self) -> aiosqlite.Connection:
+        if self.read_only:
+            conn = aiosqlite.connect(f"file:{self.database_path}?mode=ro", uri=True)
+        else:
+            conn = aiosqlite.connect(self.database_path)
+        # aiosqlite runs each connection on its own thread; don't let an
+        # unreleased connection keep the interpreter alive at exit
+        conn.daemon = True
+        await conn
+        conn.row_factory = aiosqlite.Row
+        for pragma, value in self.pragmas.items():
+            await conn.execute(f"PRAGMA {pragma} = {value}")
+        logger.info("Opened pooled async database connection", extra={"pool": self.name})
+        return conn
+
+    async def _is_healthy(self, conn: aiosqlite.Connection) -> bool:
+        try:
+            async with conn.execute("SELECT 1") as cursor:
+                await cursor.fetchone()
+            return True
+        except (sqlite3.Error, ValueError):
+            return False
+
+    async def acquire(self, timeout: Optional[float] = None) -> aiosqlite.Connection:
+        """
+        Check a connection out of the pool, opening a new one if below capacity.
+
+        Raises:
+            PoolTimeoutError: if the pool stays exhausted for `timeout` seconds
+            PoolClosedError: if the pool has been closed
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        conn = None
+        last_used = time.monotonic()
+        waiter = None
+
+        with self._lock:
+            if self._closed:
+                raise PoolClosedError(f"Connection pool '{self.name}' is closed")
+            if self._idle:
+                conn, last_used = self._idle.pop()
+                self._in_use += 1
+            elif self._size < self.max_size:
+                self._size += 1
+                self._in_use += 1
+            else:
+                # `_hand_off` counts the connection as in use when it delivers one
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+                self._waits += 1
+            self._checkouts += 1
+
+        if waiter is not None:
+            try:
+                conn = await asyncio.wait_for(waiter, timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                if waiter.done() and not waiter.cancelled() and waiter.result() is not None:
+                    # Delivered just as we gave up: pass it on rather than leak it
+                    with self._lock:
+                        self._in_use -= 1
+                    self._hand_off(waiter.result())
+                if isinstance(e, asyncio.TimeoutError):
+                    metrics.incr(f"{self.name}.timeouts")
+                    raise PoolTimeoutError(
+                        f"Timed out after {timeout}s waiting for a connection from '{self.name}'"
+                    )
+                raise
+            if conn is None:
+                raise PoolClosedError(f"Connection pool '{self.name}' is closed")
+
+        try:
+            if conn is None:
+                conn = await self._connect()
+            elif time.monotonic() - last_used > self.health_check_interval and not await self._is_healthy(conn):
+                logger.warning("Discarding unhealthy pooled connection", extra={"pool": self.name})
+                metrics.incr(f"{self.name}.health_check_failures")
+                await self._discard(conn)
+                conn = await self._connect()
+        except BaseException:
+            with self._lock:
+                self._size -= 1
+                self._in_use -= 1
+            raise
+
+        metrics.observe(f"{self.name}.wait_ms", (time.perf_counter() - start) * 1000)
+        return conn
+
+    async def release(self, conn: aiosqlite.Connection) -> None:
+        """Return a connection to the pool, rolling back any open transaction."""
+        healthy = True
+        try:
+            if conn.in_transaction:
+                await conn.rollback()
+        except (sqlite3.Error, ValueError):
+            healthy = False
+
+        with self._lock:
+            self._in_use -= 1
+        if healthy and not self._closed:
+            self._hand_off(conn)
+        else:
+            with self._lock:
+                self._size -= 1
+            await self._discard(conn)
+
+    def _hand_off(self, conn: aiosqlite.Connection) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    self._in_use += 1
+                    waiter.get_loop().call_soon_threadsafe(self._deliver, waiter, conn)
+                    return
+            self._idle.append((conn, time.monotonic()))
+
+    def _deliver(self, waiter: asyncio.Future, conn: aiosqlite.Connection) -> None:
+        if waiter.done():
+            # The waiter timed out or was cancelled after we picked it
+            with self._lock:
+                self._in_use -= 1
+            self._hand_off(conn)
+        else:
+            waiter.set_result(conn)
+
+    async def _discard(self, conn: aiosqlite.Connection) -> None:
+        try:
+            await conn.close()
+        except (sqlite3.Error, ValueError):
+            pass
+
+    @asynccontextmanager
+    async def connection(self, timeout: Optional[float] = None) -> AsyncIterator[aiosqlite.Connection]:
+        conn = await self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            await self.release(conn)
+
+    def stats(self) -> dict:
+        """Current pool occupancy and wait statistics, for sizing the pool."""
+        with self._lock:
+            size, in_use, idle = self._size, self._in_use, len(self._idle)
+            checkouts, waits = self._checkouts, self._waits
+        return {
+            "max_size": self.max_size,
+            "size": size,
+            "in_use": in_use,
+            "idle": idle,
+            "utilization": round(in_use / self.max_size, 3),
+            "checkouts": checkouts,
+            "waits": waits,
+            "wait_ms": metrics.histogram(f"{self.name}.wait_ms").snapshot(),
+        }
+
+    async def close(self) -> None:
+        """Close idle connections, fail pending waiters and refuse further checkouts."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            waiters, self._waiters = list(self._waiters), deque()
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.get_loop().call_soon_threadsafe(
+                    lambda w=waiter: w.done() or w.set_result(None)
+                )
+        for conn, _ in idle:
+            await self._discard(conn)
@@ -0,0 +1,225 @@
+# backend/app/db/pool.py
+"""
+Bounded SQLite connection pool.
+
+Connections are opened lazily up to `max_size`, configured once (row factory
+and PRAGMAs) when they are created, and handed out exclusively to one holder
+at a time. Idle connections are health-checked before reuse so a connection
+broken by e.g. a deleted database file is replaced transparently.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+
+def open_connection(
+    database_path: str,
+    pragmas: Dict[str, Any],
+    read_only: bool = False,
+    isolation_level: Optional[str] = ""
+) -> sqlite3.Connection:
+    """Open a connection with the row factory and PRAGMAs every caller expects."""
+    if read_only:
+        conn = sqlite3.connect(
+            f"file:{database_path}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            isolation_level=isolation_level
+        )
+    else:
+        conn = sqlite3.connect(
+            database_path, check_same_thread=False, isolation_level=isolation_level
+        )
+    conn.row_factory = sqlite3.Row
+    for pragma, value in pragmas.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+    return conn
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the pool timeout."""
+    pass
+
+
+class PoolClosedError(Exception):
+    """Raised when acquiring from a pool that has been closed."""
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of `sqlite3` connections to a single database file."""
+
+    def __init__(
+        self,
+        database_path: str,
+        max_size: int = 5,
+        timeout: float = 30.0,
+        pragmas: Optional[Dict[str, Any]] = None,
+        health_check_interval: float = 30.0,
+        read_only: bool = False,
+        name: str = "db.pool"
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.database_path = database_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.health_check_interval = health_check_interval
+        self.read_only = read_only
+        self.name = name
+
+        self._cond = threading.Condition()
+        # Most recently released connection last, so reuse is LIFO and hot pages stay warm
+        self._idle: List[Tuple[sqlite3.Connection, float]] = []
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._checkouts = 0
+        self._waits = 0
+
+        directory = os.path.dirname(database_path)
+        if directory and not read_only:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = open_connection(self.database_path, self.pragmas, read_only=self.read_only)
+        logger.info("Opened pooled database connection", extra={"pool": self.name})
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def acquire(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """
+        Check a connection out of the pool, opening a new one if below capacity.
+
+        Raises:
+            PoolTimeoutError: if the pool stays exhausted for `timeout` seconds
+            PoolClosedError: if the pool has been closed
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        deadline = start + timeout
+        conn = None
+        last_used = 0.0
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolClosedError(f"Connection pool '{self.name}' is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    metrics.incr(f"{self.name}.timeouts")
+                    raise PoolTimeoutError(
+                        f"Timed out after {timeout}s waiting for a connection from '{self.name}'"
+                    )
+                waited = True
+                self._cond.wait(remaining)
+            self._in_use += 1
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+
+        try:
+            if conn is None:
+                conn = self._connect()
+            elif time.monotonic() - last_used > self.health_check_interval and not self._is_healthy(conn):
+                logger.warning("Discarding unhealthy pooled connection", extra={"pool": self.name})
+                metrics.incr(f"{self.name}.health_check_failures")
+                self._discard(conn)
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        metrics.observe(f"{self.name}.wait_ms", (time.perf_counter() - start) * 1000)
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool, rolling back any open transaction."""
+        healthy = True
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy and not self._closed:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+        if conn is not None:
+            self._discard(conn)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> dict:
+        """Current pool occupancy and wait statistics, for sizing the pool."""
+        with self._cond:
+            size, in_use, idle = self._size, self._in_use, len(self._idle)
+            checkouts, waits = self._checkouts, self._waits
+        return {
+            "max_size": self.max_size,
+            "size": size,
+            "in_use": in_use,
+            "idle": idle,
+            "utilization": round(in_use / self.max_size, 3),
+            "checkouts": checkouts,
+            "waits": waits,
+            "wait_ms": metrics.histogram(f"{self.name}.wait_ms").snapshot(),
+        }
+
+    def close(self) -> None:
+        """Close idle connections and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
@@ -1,13 +1,260 @@
-import sqlite3
+import asyncio
 import os
+import sqlite3
+import threading
+from contextlib import closing
+from sqlite3 import Connection
+from typing import List, Optional, Sequence
+import aiosqlite
+from app.core.metrics import metrics
+from app.db.async_pool import AsyncConnectionPool
+from app.db.pool import ConnectionPool, DEFAULT_PRAGMAS, open_connection
+from app.db.writer import Statement, WriteQueue, apply_statements
 
 DATABASE_PATH = os.getenv("DATABASE_PATH", "data/mood-tracker.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
 
-def init_db():
-    # Ensure the directory exists
-    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-    conn = sqlite3.connect(DATABASE_PATH)
+# "rollback" keeps SQLite's default journal and lets every pooled connection write.
+# "wal" enables write-ahead logging: reads come from a read-only pool and all
+# writes are serialised through a single writer connection.
+DB_STORAGE_MODE = os.getenv("DB_STORAGE_MODE", "rollback").lower()
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", "16384"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+WAL_PRAGMAS = {
+    **DEFAULT_PRAGMAS,
+    "synchronous": "NORMAL",
+    "cache_size": -DB_CACHE_SIZE_KB,
+    "mmap_size": DB_MMAP_SIZE,
+}
+
+_pool: Optional[ConnectionPool] = None
+_async_pool: Optional[AsyncConnectionPool] = None
+_write_queue: Optional[WriteQueue] = None
+_pool_lock = threading.Lock()
+
+def is_wal_mode() -> bool:
+    return DB_STORAGE_MODE == "wal"
+
+def get_write_queue() -> Optional[WriteQueue]:
+    """Return the single-writer queue in WAL mode, or None in rollback mode."""
+    global _write_queue
+    if not is_wal_mode():
+        return None
+    if _write_queue is None:
+        with _pool_lock:
+            if _write_queue is None:
+                _write_queue = WriteQueue(
+                    DATABASE_PATH,
+                    pragmas={**WAL_PRAGMAS, "journal_mode": "WAL"}
+                )
+                metrics.register_collector("db_writer", _write_queue.stats)
+    return _write_queue
+
+def get_pool() -> ConnectionPool:
+    """
+    Return the process-wide connection pool, creating it on first use.
+
+    In WAL mode the pool hands out read-only connections; use `execute_write`
+    for anything that modifies the database.
+    """
+    global _pool
+    if _pool is None:
+        # The writer creates the file and switches it to WAL before readers open it
+        get_write_queue()
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    DATABASE_PATH,
+                    max_size=DB_POOL_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    pragmas=WAL_PRAGMAS if is_wal_mode() else DEFAULT_PRAGMAS,
+                    read_only=is_wal_mode(),
+                    name="db.read_pool" if is_wal_mode() else "db.pool"
+                )
+                metrics.register_collector("db_pool", _pool.stats)
+    return _pool
+
+def get_async_pool() -> AsyncConnectionPool:
+    """Return the process-wide `aiosqlite` pool used by async request handlers."""
+    global _async_pool
+    if _async_pool is None:
+        get_write_queue()
+        with _pool_lock:
+            if _async_pool is None:
+                _async_pool = AsyncConnectionPool(
+                    DATABASE_PATH,
+                    max_size=DB_POOL_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    pragmas=WAL_PRAGMAS if is_wal_mode() else DEFAULT_PRAGMAS,
+                    read_only=is_wal_mode(),
+                    name="db.async_read_pool" if is_wal_mode() else "db.async_pool"
+                )
+                metrics.register_collector("db_async_pool", _async_pool.stats)
+    return _async_pool
+
+async def close_async_db():
+    """Close the process-wide async pool; the next `get_async_pool()` opens a fresh one."""
+    global _async_pool
+    with _pool_lock:
+        pool, _async_pool = _async_pool, None
+    if pool is not None:
+        await pool.close()
+
+def close_db():
+    """Drain the writer and close the pool; the next call to `get_pool()` starts afresh."""
+    global _pool, _write_queue
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+        if _write_queue is not None:
+            _write_queue.close()
+            _write_queue = None
+
+def execute_write(db: Connection, statements: Sequence[Statement]) -> List[int]:
+    """
+    Apply `statements` atomically and return their row counts.
+
+    In WAL mode the statements are handed to the single writer connection and
+    `db` (a read-only connection) is not touched; otherwise they run and commit
+    on `db` itself.
+    """
+    write_queue = get_write_queue()
+    if write_queue is not None:
+        return write_queue.execute(statements)
+    try:
+        rowcounts = apply_statements(db, statements)
+        db.commit()
+    except sqlite3.Error:
+        db.rollback()
+        raise
+    return rowcounts
+
+async def execute_write_async(db: aiosqlite.Connection, statements: Sequence[Statement]) -> List[int]:
+    """Async counterpart of `execute_write`; never blocks the event loop."""
+    write_queue = get_write_queue()
+    if write_queue is not None:
+        return await asyncio.wrap_future(
+            write_queue.submit(lambda conn: apply_statements(conn, statements))
+        )
+    rowcounts = []
     try:
+        for statement in statements:
+            if statement.many:
+                cursor = await db.executemany(statement.sql, statement.params)
+            else:
+                cursor = await db.execute(statement.sql, statement.params)
+            rowcounts.append(cursor.rowcount)
+            await cursor.close()
+        await db.commit()
+    except sqlite3.Error:
+        await db.rollback()
+        raise
+    return rowcounts
+
+# Idempotent schema additions mirrored from `migrations/deploy/`. They run on every
+# start so databases created by `init_db` (without Sqitch) catch up as well.
+SCHEMA_UPGRADES = """
+    -- add_list_indexes: keyset pagination over (timestamp, id) per user
+    CREATE INDEX IF NOT EXISTS idx_mood_entries_user_timestamp_id
+        ON mood_entries(user_id, timestamp DESC, id);
+    CREATE INDEX IF NOT EXISTS idx_cbt_logs_user_timestamp_id
+        ON cbt_logs(user_id, timestamp DESC, id);
+
+    -- add_change_log: change feed and tombstones for delta sync
+    CREATE TABLE IF NOT EXISTS change_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        entity TEXT NOT NULL,
+        entity_id TEXT NOT NULL,
+        op TEXT NOT NULL,
+        changed_at INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_change_log_user_seq ON change_log(user_id, seq);
+    INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+        SELECT user_id, 'mood', id, 'upsert', timestamp FROM mood_entries
+        WHERE NOT EXISTS (SELECT 1 FROM change_log WHERE entity = 'mood');
+    INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+        SELECT user_id, 'cbt', id, 'upsert', timestamp FROM cbt_logs
+        WHERE NOT EXISTS (SELECT 1 FROM change_log WHERE entity = 'cbt');
+
+    -- add_data_jobs: background export/import jobs
+    CREATE TABLE IF NOT EXISTS data_jobs (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        format TEXT NOT NULL,
+        params TEXT,
+        idempotency_key TEXT,
+        file_path TEXT,
+        size_bytes INTEGER,
+        progress TEXT,
+        error TEXT,
+        created_at INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL,
+        finished_at INTEGER
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_data_jobs_idempotency
+        ON data_jobs(user_id, kind, idempotency_key);
+    CREATE INDEX IF NOT EXISTS idx_data_jobs_status ON data_jobs(status);
+
+    -- add_analysis_cache: content-addressed CBT analysis results
+    CREATE TABLE IF NOT EXISTS analysis_cache (
+        key TEXT PRIMARY KEY,
+        response TEXT NOT NULL,
+        prompt_version TEXT,
+        size_bytes INTEGER NOT NULL,
+        created_at INTEGER NOT NULL,
+        expires_at INTEGER NOT NULL,
+        last_hit_at INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_analysis_cache_expires_at ON analysis_cache(expires_at);
+    CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_hit_at ON analysis_cache(last_hit_at);
+
+    -- add_ai_jobs: durable queue for asynchronous CBT analysis
+    CREATE TABLE IF NOT EXISTS ai_jobs (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        request TEXT,
+        result TEXT,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        lease_owner TEXT,
+        lease_expires_at INTEGER,
+        created_at INTEGER NOT NULL,
+        started_at INTEGER,
+        finished_at INTEGER,
+        updated_at INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_ai_jobs_status_created_at ON ai_jobs(status, created_at);
+"""
+
+# Columns added to existing tables by later migrations. `ADD COLUMN` has no
+# `IF NOT EXISTS`, so `init_db` adds each one only when it is missing.
+SCHEMA_COLUMN_UPGRADES = [
+    # add_data_job_leases: the runner holding a running data job, and until when
+    ("data_jobs", "lease_owner", "TEXT"),
+    ("data_jobs", "lease_expires_at", "INTEGER"),
+]
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    for table, column, definition in SCHEMA_COLUMN_UPGRADES:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def init_db():
+    # Schema setup runs on its own connection before any pool or writer exists
+    directory = os.path.dirname(DATABASE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with closing(open_connection(DATABASE_PATH, DEFAULT_PRAGMAS)) as conn:
+        if is_wal_mode():
+            conn.execute("PRAGMA journal_mode = WAL")
         # Simple check if users table exists
         cursor = conn.cursor()
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
@@ -53,15 +300,22 @@ def init_db():
             """)
             conn.commit()
             print("Database initialized successfully.")
-    finally:
-        conn.close()
+        conn.executescript(SCHEMA_UPGRADES)
+        _add_missing_columns(conn)
+        conn.commit()
 
 def get_db():
-    # Ensure the directory exists
-    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-    conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+async def get_async_db():
+    pool = get_async_pool()
+    conn = await pool.acquire()
     try:
         yield conn
     finally:
-        conn.close()
+        await pool.release(conn)
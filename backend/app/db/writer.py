@@ -0,0 +1,172 @@
+# backend/app/db/writer.py
+"""
+Single-writer queue for SQLite in WAL mode.
+
+SQLite allows exactly one writer at a time. Instead of letting request threads
+race for the write lock (and fail with `database is locked` under bursts), all
+writes are expressed as `Statement`s or callables and funnelled to one
+dedicated connection owned by a background thread. Jobs that queue up while a
+transaction is in flight are group-committed together; each job runs inside
+its own SAVEPOINT so a failing job does not take its batch-mates down with it.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, TypeVar
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.db.pool import open_connection
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_STOP = object()
+
+
+class Statement(NamedTuple):
+    """A single parameterised write. With `many=True`, `params` is a sequence of rows."""
+    sql: str
+    params: Sequence[Any] = ()
+    many: bool = False
+
+
+def apply_statements(conn: sqlite3.Connection, statements: Sequence[Statement]) -> List[int]:
+    """Execute statements in order on `conn` and return their row counts. Does not commit."""
+    rowcounts = []
+    for statement in statements:
+        if statement.many:
+            cursor = conn.executemany(statement.sql, statement.params)
+        else:
+            cursor = conn.execute(statement.sql, statement.params)
+        rowcounts.append(cursor.rowcount)
+    return rowcounts
+
+
+class WriteQueue:
+    """Background thread that owns the only writable connection to the database."""
+
+    def __init__(
+        self,
+        database_path: str,
+        pragmas: Dict[str, Any],
+        max_batch: int = 64,
+        name: str = "db.writer"
+    ):
+        self.database_path = database_path
+        self.pragmas = pragmas
+        self.max_batch = max_batch
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._ready = threading.Event()
+        self._startup_error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._startup_error is not None:
+            raise self._startup_error
+
+    def submit(self, work: Callable[[sqlite3.Connection], T]) -> "Future[T]":
+        """
+        Queue `work` to run on the writer connection inside a transaction.
+
+        `work` must not commit or roll back itself; the queue does that.
+        """
+        if not self._thread.is_alive():
+            raise RuntimeError(f"Write queue '{self.name}' is stopped")
+        future: Future = Future()
+        self._queue.put((future, work, time.perf_counter()))
+        return future
+
+    def run(self, work: Callable[[sqlite3.Connection], T], timeout: Optional[float] = None) -> T:
+        return self.submit(work).result(timeout)
+
+    def execute(self, statements: Sequence[Statement], timeout: Optional[float] = None) -> List[int]:
+        return self.run(lambda conn: apply_statements(conn, statements), timeout)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_wait_ms": metrics.histogram(f"{self.name}.queue_wait_ms").snapshot(),
+            "batch_size": metrics.histogram(f"{self.name}.batch_size").snapshot(),
+            "commit_ms": metrics.histogram(f"{self.name}.commit_ms").snapshot(),
+        }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Finish queued writes, then stop the writer thread and close its connection."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            # Autocommit mode: transactions are opened and closed explicitly below
+            conn = open_connection(self.database_path, self.pragmas, isolation_level=None)
+        except BaseException as e:
+            self._startup_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        logger.info("Database writer started", extra={"writer": self.name})
+
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if _STOP in batch:
+                    stopping = True
+                    batch = [item for item in batch if item is not _STOP]
+                if batch:
+                    self._process(conn, batch)
+        finally:
+            conn.close()
+            logger.info("Database writer stopped", extra={"writer": self.name})
+
+    def _process(self, conn: sqlite3.Connection, batch: list) -> None:
+        now = time.perf_counter()
+        metrics.observe(f"{self.name}.batch_size", len(batch))
+        completed = []
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            for future, _, _ in batch:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+            return
+
+        for future, work, enqueued_at in batch:
+            metrics.observe(f"{self.name}.queue_wait_ms", (now - enqueued_at) * 1000)
+            if not future.set_running_or_notify_cancel():
+                continue
+            conn.execute("SAVEPOINT write_job")
+            try:
+                result = work(conn)
+                conn.execute("RELEASE SAVEPOINT write_job")
+                completed.append((future, result))
+            except BaseException as e:
+                conn.execute("ROLLBACK TO SAVEPOINT write_job")
+                conn.execute("RELEASE SAVEPOINT write_job")
+                future.set_exception(e)
+
+        commit_start = time.perf_counter()
+        try:
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.error("Database writer commit failed", extra={"error": str(e)})
+            conn.execute("ROLLBACK")
+            for future, _ in completed:
+                future.set_exception(e)
+            return
+        metrics.observe(f"{self.name}.commit_ms", (time.perf_counter() - commit_start) * 1000)
+
+        for future, result in completed:
+            future.set_result(result)
@@ -3,10 +3,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import nltk
 
-from app.api.v1.routes import moods, cbt_logs, data, users
+from app.api.v1.routes import moods, cbt_logs, data, users, sync
 from app.core.logging import setup_logging
 from app.api.middleware import CorrelationIdMiddleware
-from app.db.session import init_db
+from app.core.metrics import metrics
+from app.db.session import init_db, close_db, close_async_db
+from app.services.ai_client import init_ai_client
+from app.services.ai_jobs import get_analysis_workers
+from app.services.circuit_breaker import circuit_state
+from app.services.data_jobs import get_job_runner
 
 load_dotenv()
 setup_logging()
@@ -30,6 +35,24 @@ async def startup_event():
     except Exception as e:
         print(f"Error downloading NLTK corpora: {e}")
 
+    # Build the shared AI client and open its connections before the first request
+    await init_ai_client()
+
+    # Pick up export/import jobs a previous process left unfinished
+    await get_job_runner().resume()
+    # Drain the asynchronous analysis queue, including jobs queued before a restart
+    get_analysis_workers().start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Stop background jobs, drain queued writes and release pooled database connections.
+    """
+    await get_job_runner().shutdown()
+    await get_analysis_workers().shutdown()
+    await close_async_db()
+    close_db()
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +60,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Correlation-ID", "X-Next-Cursor", "ETag", "X-Export-High-Water-Mark"],
 )
 
 # API Routes
@@ -44,11 +68,20 @@ app.include_router(moods.router, prefix="/api/v1/moods", tags=["moods"])
 app.include_router(cbt_logs.router, prefix="/api/v1/cbt-logs", tags=["cbt-logs"])
 app.include_router(data.router, prefix="/api/v1/data", tags=["data"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
+app.include_router(sync.router, prefix="/api/v1/sync", tags=["sync"])
 
 @app.get("/health")
 @app.head("/health")
 async def health_check():
-    return {"status": "healthy", "service": "mindful-track-api"}
+    return {
+        "status": "healthy",
+        "service": "mindful-track-api",
+        "ai": {"circuit": circuit_state()}
+    }
+
+@app.get("/metrics")
+async def read_metrics():
+    return metrics.snapshot()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,151 @@
+# backend/app/repositories/ai_jobs.py
+"""
+Persistence for the asynchronous analysis queue (`ai_jobs`).
+
+Workers in any process take a job with `claim_ai_job_async`, a single UPDATE
+that leases the oldest claimable row to an owner token, so two workers
+sharing the database never run the same job. A lease that expires, because
+its worker died, makes the job claimable again.
+"""
+
+import json
+import time
+import uuid
+from typing import Optional
+import aiosqlite
+from app.db.session import execute_write_async
+from app.db.writer import Statement
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _decode_ai_job_row(row) -> dict:
+    return {
+        **dict(row),
+        "request": json.loads(row["request"]) if row["request"] else None,
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error": json.loads(row["error"]) if row["error"] else None,
+    }
+
+
+async def enqueue_ai_job_async(db: aiosqlite.Connection, user_id: str, request: dict) -> dict:
+    job_id = uuid.uuid4().hex
+    now = _now_ms()
+    await execute_write_async(db, [Statement(
+        """
+        INSERT INTO ai_jobs (id, user_id, status, request, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (job_id, user_id, QUEUED, json.dumps(request), now, now)
+    )])
+    logger.info("AI job queued", extra={"job_id": job_id})
+    return await get_ai_job_async(db, user_id, job_id)
+
+
+async def get_ai_job_async(db: aiosqlite.Connection, user_id: str, job_id: str) -> Optional[dict]:
+    async with db.execute("SELECT * FROM ai_jobs WHERE id = ? AND user_id = ?", (job_id, user_id)) as cursor:
+        row = await cursor.fetchone()
+    return _decode_ai_job_row(row) if row else None
+
+
+async def claim_ai_job_async(db: aiosqlite.Connection, owner: str, lease_ms: int, max_attempts: int) -> Optional[dict]:
+    """
+    Lease the oldest queued job, or one whose lease has expired, to `owner`.
+    Jobs whose lease expired `max_attempts` times are failed instead of being
+    run again. Returns the claimed job, or None when there is nothing to do.
+    """
+    now = _now_ms()
+    token = f"{owner}:{uuid.uuid4().hex}"
+    error = json.dumps({"status_code": 503, "detail": "Analysis service unavailable"})
+    _, claimed = await execute_write_async(db, [
+        Statement(
+            """
+            UPDATE ai_jobs SET status = ?, error = ?, request = NULL, lease_owner = NULL,
+                finished_at = ?, updated_at = ?
+            WHERE status = ? AND lease_expires_at < ? AND attempts >= ?
+            """,
+            (FAILED, error, now, now, RUNNING, now, max_attempts)
+        ),
+        Statement(
+            """
+            UPDATE ai_jobs SET status = ?, lease_owner = ?, lease_expires_at = ?,
+                attempts = attempts + 1, started_at = ?, updated_at = ?
+            WHERE id = (
+                SELECT id FROM ai_jobs
+                WHERE status = ? OR (status = ? AND lease_expires_at < ?)
+                ORDER BY created_at LIMIT 1
+            )
+            """,
+            (RUNNING, token, now + lease_ms, now, now, QUEUED, RUNNING, now)
+        ),
+    ])
+    if not claimed:
+        return None
+    async with db.execute("SELECT * FROM ai_jobs WHERE lease_owner = ?", (token,)) as cursor:
+        row = await cursor.fetchone()
+    return _decode_ai_job_row(row) if row else None
+
+
+async def finish_ai_job_async(
+    db: aiosqlite.Connection,
+    job: dict,
+    status: str,
+    result: Optional[dict] = None,
+    error: Optional[dict] = None
+) -> bool:
+    """
+    Record the outcome of a claimed job and drop its request text. Returns
+    False, writing nothing, if the lease was lost to another worker meanwhile.
+    """
+    now = _now_ms()
+    (updated,) = await execute_write_async(db, [Statement(
+        """
+        UPDATE ai_jobs SET status = ?, result = ?, error = ?, request = NULL, lease_owner = NULL,
+            finished_at = ?, updated_at = ?
+        WHERE id = ? AND lease_owner = ?
+        """,
+        (
+            status,
+            json.dumps(result) if result is not None else None,
+            json.dumps(error) if error is not None else None,
+            now, now, job["id"], job["lease_owner"]
+        )
+    )])
+    return bool(updated)
+
+
+async def release_ai_job_async(db: aiosqlite.Connection, job: dict) -> bool:
+    """Put a claimed job back in the queue without counting the attempt."""
+    (updated,) = await execute_write_async(db, [Statement(
+        """
+        UPDATE ai_jobs SET status = ?, lease_owner = NULL, lease_expires_at = NULL,
+            attempts = attempts - 1, started_at = NULL, updated_at = ?
+        WHERE id = ? AND lease_owner = ?
+        """,
+        (QUEUED, _now_ms(), job["id"], job["lease_owner"])
+    )])
+    return bool(updated)
+
+
+async def count_queued_ai_jobs_async(db: aiosqlite.Connection) -> int:
+    async with db.execute("SELECT COUNT(*) FROM ai_jobs WHERE status = ?", (QUEUED,)) as cursor:
+        (count,) = await cursor.fetchone()
+    return count
+
+
+async def delete_finished_ai_jobs_async(db: aiosqlite.Connection, finished_before: int) -> int:
+    (deleted,) = await execute_write_async(db, [Statement(
+        "DELETE FROM ai_jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+        (finished_before,)
+    )])
+    return deleted
@@ -0,0 +1,121 @@
+# backend/app/repositories/bulk.py
+"""
+Helpers shared by the bulk create repositories.
+
+A bulk request is split into rows that are new and rows whose id already
+exists, either in the table or earlier in the same batch. Only the new rows
+are written, all in a single transaction.
+"""
+
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, List, NamedTuple, Sequence, Set, Tuple, TypeVar
+import aiosqlite
+from app.db.session import execute_write_async
+from app.db.writer import Statement
+from app.repositories.changes import UPSERT, change_many_statement
+from app.repositories.list_cache import invalidate_user
+
+CREATED = "created"
+DUPLICATE = "duplicate"
+
+# Stay well below SQLite's bound-parameter limit
+_ID_CHUNK = 500
+
+# What an imported field may hold when it is bound as a column value as is
+_SCALARS = (str, int, float)
+
+MAX_BULK_ITEMS = 1000
+
+T = TypeVar("T")
+
+
+class BulkResult(NamedTuple):
+    created: int
+    duplicates: int
+    results: List[dict]
+
+
+async def existing_ids_async(db: aiosqlite.Connection, table: str, ids: Sequence[str]) -> Set[str]:
+    """Ids from `ids` already present in `table`, for any user (ids are primary keys)."""
+    found: Set[str] = set()
+    unique = list(dict.fromkeys(ids))
+    for start in range(0, len(unique), _ID_CHUNK):
+        chunk = unique[start:start + _ID_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        async with db.execute(f"SELECT id FROM {table} WHERE id IN ({placeholders})", chunk) as cursor:
+            found.update(row["id"] for row in await cursor.fetchall())
+    return found
+
+
+def partition_new(
+    items: Sequence[T],
+    existing: Set[str],
+    id_of: Callable[[T], str] = attrgetter("id")
+) -> Tuple[List[T], BulkResult]:
+    """Split `items` into those to insert and a per-item result list in request order."""
+    seen = set(existing)
+    new, results = [], []
+    for item in items:
+        item_id = id_of(item)
+        if item_id in seen:
+            results.append({"id": item_id, "status": DUPLICATE})
+        else:
+            seen.add(item_id)
+            new.append(item)
+            results.append({"id": item_id, "status": CREATED})
+    return new, BulkResult(len(new), len(items) - len(new), results)
+
+
+def check_import_fields(record: dict, required: Sequence[str], scalars: Sequence[str]) -> None:
+    """
+    Raise KeyError if a `required` field is missing, and ValueError if one is
+    null or if a `scalars` field holds a list or an object.
+    """
+    for field in required:
+        if record[field] is None:
+            raise ValueError(f"'{field}' must not be null")
+    for field in scalars:
+        value = record.get(field)
+        if value is not None and not isinstance(value, _SCALARS):
+            raise ValueError(f"'{field}' must be a string or a number")
+
+
+async def new_rows_statements_async(
+    db: aiosqlite.Connection,
+    user_id: str,
+    table: str,
+    entity: str,
+    insert_or_ignore_sql: str,
+    rows: Sequence[Tuple[str, Tuple[Any, ...]]]
+) -> Tuple[List[Statement], BulkResult]:
+    """
+    The statements inserting the `(id, params)` rows whose id is not taken
+    yet, with their change_log entries; the caller writes them.
+    """
+    existing = await existing_ids_async(db, table, [row_id for row_id, _ in rows])
+    new, result = partition_new(rows, existing, id_of=itemgetter(0))
+    if not new:
+        return [], result
+    return [
+        Statement(insert_or_ignore_sql, [params for _, params in new], many=True),
+        change_many_statement(user_id, entity, [row_id for row_id, _ in new], UPSERT)
+    ], result
+
+
+async def insert_new_rows_async(
+    db: aiosqlite.Connection,
+    user_id: str,
+    table: str,
+    entity: str,
+    insert_or_ignore_sql: str,
+    rows: Sequence[Tuple[str, Tuple[Any, ...]]]
+) -> BulkResult:
+    """
+    Insert the `(id, params)` rows whose id is not taken yet, with their
+    change_log entries, in one transaction.
+    """
+    statements, result = await new_rows_statements_async(db, user_id, table, entity, insert_or_ignore_sql, rows)
+    if statements:
+        await execute_write_async(db, statements)
+        invalidate_user(user_id)
+    return result
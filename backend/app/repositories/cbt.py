@@ -1,73 +1,79 @@
 import json
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
 from sqlite3 import Connection
+import aiosqlite
+from app.db.session import execute_write, execute_write_async, get_async_pool
+from app.db.writer import Statement
+from app.repositories.changes import CBT, UPSERT, DELETE, change_statement, changed_rows_clause
+from app.repositories.bulk import BulkResult, check_import_fields, insert_new_rows_async, new_rows_statements_async
+from app.repositories.list_cache import cached_list, invalidate_user
+from app.repositories.pagination import Page, build_list_query, iter_chunks_async, to_page
 from app.schemas.cbt import CBTLogPublic, CBTLogCreate
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
-def get_cbt_logs(db: Connection, user_id: str) -> List[dict]:
-    logger.info("Fetching CBT logs", extra={"user_id": user_id})
-    cursor = db.cursor()
-    cursor.execute(
-        "SELECT * FROM cbt_logs WHERE user_id = ? ORDER BY timestamp DESC",
-        (user_id,)
+# SQL and row mapping shared by the sync (scripts) and async (API) variants below
+
+CBT_LOG_EXISTS_SQL = "SELECT id FROM cbt_logs WHERE id = ? AND user_id = ?"
+
+CBT_IMPORT_REQUIRED = (
+    "id", "timestamp", "situation", "automatic_thoughts", "distortions", "rational_response", "mood_before"
+)
+CBT_IMPORT_SCALARS = (
+    "id", "timestamp", "situation", "automatic_thoughts", "rational_response", "mood_before", "mood_after",
+    "behavioral_link"
+)
+
+def _decode_cbt_row(row) -> dict:
+    return {
+        **dict(row),
+        "distortions": json.loads(row["distortions"]),
+        "automatic_thoughts": row["automatic_thoughts"],
+        "rational_response": row["rational_response"],
+        "mood_before": row["mood_before"],
+        "mood_after": row["mood_after"],
+        "behavioral_link": row["behavioral_link"]
+    }
+
+CBT_INSERT_SQL = """
+    INSERT INTO cbt_logs (
+        id, timestamp, situation, automatic_thoughts, distortions,
+        rational_response, mood_before, mood_after, behavioral_link, user_id
     )
-    rows = cursor.fetchall()
-    return [
-        {
-            **dict(row),
-            "distortions": json.loads(row["distortions"]),
-            "automatic_thoughts": row["automatic_thoughts"],
-            "rational_response": row["rational_response"],
-            "mood_before": row["mood_before"],
-            "mood_after": row["mood_after"],
-            "behavioral_link": row["behavioral_link"]
-        }
-        for row in rows
-    ]
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
-def create_cbt_log(db: Connection, user_id: str, log_in: CBTLogCreate) -> dict:
-    logger.info("Creating CBT log", extra={"user_id": user_id, "log_id": log_in.id})
-    cursor = db.cursor()
-    cursor.execute(
-        """
-        INSERT INTO cbt_logs (
-            id, timestamp, situation, automatic_thoughts, distortions, 
-            rational_response, mood_before, mood_after, behavioral_link, user_id
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            log_in.id,
-            log_in.timestamp,
-            log_in.situation,
-            log_in.automatic_thoughts,
-            json.dumps(log_in.distortions),
-            log_in.rational_response,
-            log_in.mood_before,
-            log_in.mood_after,
-            log_in.behavioral_link,
-            user_id
-        )
+CBT_INSERT_OR_IGNORE_SQL = CBT_INSERT_SQL.replace("INSERT INTO", "INSERT OR IGNORE INTO", 1)
+
+def _cbt_params(user_id: str, log_in: CBTLogCreate) -> tuple:
+    return (
+        log_in.id,
+        log_in.timestamp,
+        log_in.situation,
+        log_in.automatic_thoughts,
+        json.dumps(log_in.distortions),
+        log_in.rational_response,
+        log_in.mood_before,
+        log_in.mood_after,
+        log_in.behavioral_link,
+        user_id
     )
-    db.commit()
-    logger.info("CBT log created successfully", extra={"log_id": log_in.id})
-    return {**log_in.model_dump(), "user_id": user_id}
 
-def update_cbt_log(db: Connection, user_id: str, log_in: CBTLogPublic) -> bool:
-    logger.info("Updating CBT log", extra={"user_id": user_id, "log_id": log_in.id})
-    cursor = db.cursor()
-    cursor.execute(
+def _insert_cbt_statement(user_id: str, log_in: CBTLogCreate) -> Statement:
+    return Statement(CBT_INSERT_SQL, _cbt_params(user_id, log_in))
+
+def _update_cbt_statement(user_id: str, log_in: CBTLogPublic) -> Statement:
+    return Statement(
         """
-        UPDATE cbt_logs 
-        SET 
-            situation = ?, 
-            automatic_thoughts = ?, 
-            distortions = ?, 
-            rational_response = ?, 
-            mood_before = ?, 
-            mood_after = ?, 
+        UPDATE cbt_logs
+        SET
+            situation = ?,
+            automatic_thoughts = ?,
+            distortions = ?,
+            rational_response = ?,
+            mood_before = ?,
+            mood_after = ?,
             behavioral_link = ?,
             timestamp = ?
         WHERE id = ? AND user_id = ?
@@ -85,26 +91,203 @@ def update_cbt_log(db: Connection, user_id: str, log_in: CBTLogPublic) -> bool:
             user_id
         )
     )
-    db.commit()
-    success = cursor.rowcount > 0
+
+def _delete_cbt_statement(user_id: str, log_id: str) -> Statement:
+    return Statement(
+        "DELETE FROM cbt_logs WHERE id = ? AND user_id = ?",
+        (log_id, user_id)
+    )
+
+def get_cbt_logs(db: Connection, user_id: str) -> List[dict]:
+    logger.info("Fetching CBT logs", extra={"user_id": user_id})
+    sql, params = build_list_query("cbt_logs", user_id)
+    cursor = db.cursor()
+    cursor.execute(sql, params)
+    return [_decode_cbt_row(row) for row in cursor.fetchall()]
+
+async def get_cbt_logs_async(db: aiosqlite.Connection, user_id: str) -> List[dict]:
+    logger.info("Fetching CBT logs", extra={"user_id": user_id})
+    sql, params = build_list_query("cbt_logs", user_id)
+
+    async def load():
+        async with db.execute(sql, params) as cursor:
+            rows = await cursor.fetchall()
+        return [_decode_cbt_row(row) for row in rows]
+
+    return await cached_list(db, user_id, ("cbt_logs", "all"), load)
+
+def iter_cbt_logs_async(
+    user_id: str,
+    chunk_size: int = 500,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    changes: Optional[Tuple[int, int]] = None
+) -> AsyncIterator[List[dict]]:
+    """
+    Stream a user's CBT logs, newest first, in decoded chunks. Bypasses the list cache.
+
+    `since`/`until` bound the entry timestamp; `changes` is a change-log seq
+    range `(after, upto]` and keeps only rows upserted within it.
+    """
+    where = changed_rows_clause(user_id, CBT, *changes) if changes else None
+    return iter_chunks_async(get_async_pool().connection, "cbt_logs", user_id, _decode_cbt_row, chunk_size, since, until, where)
+
+async def get_cbt_page_async(
+    db: aiosqlite.Connection,
+    user_id: str,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    cached: bool = True
+) -> Page:
+    """
+    Fetch one keyset page of CBT logs. Raises ValueError for a malformed cursor.
+    `cached=False` skips the list cache, for callers caching a rendering of
+    the page instead.
+    """
+    logger.info("Fetching CBT logs page", extra={"user_id": user_id, "limit": limit})
+    sql, params = build_list_query("cbt_logs", user_id, since, until, limit, cursor)
+
+    async def load():
+        async with db.execute(sql, params) as db_cursor:
+            rows = await db_cursor.fetchall()
+        return to_page(rows, limit, _decode_cbt_row)
+
+    if not cached:
+        return await load()
+    return await cached_list(db, user_id, ("cbt_logs", since, until, limit, cursor), load)
+
+async def get_cbt_logs_by_id_async(db: aiosqlite.Connection, user_id: str, log_ids: List[str]) -> List[dict]:
+    """Fetch the CBT logs with the given ids; ids that no longer exist are skipped."""
+    if not log_ids:
+        return []
+    placeholders = ", ".join("?" for _ in log_ids)
+    async with db.execute(
+        f"SELECT * FROM cbt_logs WHERE user_id = ? AND id IN ({placeholders})",
+        (user_id, *log_ids)
+    ) as cursor:
+        rows = await cursor.fetchall()
+    return [_decode_cbt_row(row) for row in rows]
+
+def create_cbt_log(db: Connection, user_id: str, log_in: CBTLogCreate) -> dict:
+    logger.info("Creating CBT log", extra={"user_id": user_id, "log_id": log_in.id})
+    execute_write(db, [
+        _insert_cbt_statement(user_id, log_in),
+        change_statement(user_id, CBT, log_in.id, UPSERT)
+    ])
+    invalidate_user(user_id)
+    logger.info("CBT log created successfully", extra={"log_id": log_in.id})
+    return {**log_in.model_dump(), "user_id": user_id}
+
+async def create_cbt_log_async(db: aiosqlite.Connection, user_id: str, log_in: CBTLogCreate) -> dict:
+    logger.info("Creating CBT log", extra={"user_id": user_id, "log_id": log_in.id})
+    await execute_write_async(db, [
+        _insert_cbt_statement(user_id, log_in),
+        change_statement(user_id, CBT, log_in.id, UPSERT)
+    ])
+    invalidate_user(user_id)
+    logger.info("CBT log created successfully", extra={"log_id": log_in.id})
+    return {**log_in.model_dump(), "user_id": user_id}
+
+async def create_cbt_logs_bulk_async(db: aiosqlite.Connection, user_id: str, logs_in: List[CBTLogCreate]) -> BulkResult:
+    """
+    Insert many CBT logs in one transaction. Ids that already exist, or repeat
+    earlier in the batch, are reported as duplicates and left untouched.
+    """
+    logger.info("Bulk creating CBT logs", extra={"user_id": user_id, "count": len(logs_in)})
+    result = await insert_new_rows_async(
+        db, user_id, "cbt_logs", CBT, CBT_INSERT_OR_IGNORE_SQL,
+        [(log_in.id, _cbt_params(user_id, log_in)) for log_in in logs_in]
+    )
+    logger.info("CBT logs bulk created", extra={"created_count": result.created, "duplicate_count": result.duplicates})
+    return result
+
+def cbt_import_row(user_id: str, record: dict) -> Tuple[str, tuple]:
+    """
+    Map one CBT log as written by /data/export to `(id, insert params)`.
+    Raises KeyError or ValueError if a required field is missing or a field
+    has the wrong shape.
+    """
+    check_import_fields(record, CBT_IMPORT_REQUIRED, CBT_IMPORT_SCALARS)
+    return record["id"], (
+        record["id"],
+        record["timestamp"],
+        record["situation"],
+        record["automatic_thoughts"],
+        json.dumps(record["distortions"]),
+        record["rational_response"],
+        record["mood_before"],
+        record.get("mood_after"),
+        record.get("behavioral_link"),
+        user_id
+    )
+
+async def import_cbt_logs_async(db: aiosqlite.Connection, user_id: str, rows: List[Tuple[str, tuple]]) -> BulkResult:
+    """Insert rows produced by `cbt_import_row`, skipping ids that already exist."""
+    return await insert_new_rows_async(db, user_id, "cbt_logs", CBT, CBT_INSERT_OR_IGNORE_SQL, rows)
+
+async def cbt_import_statements_async(
+    db: aiosqlite.Connection, user_id: str, rows: List[Tuple[str, tuple]]
+) -> Tuple[List[Statement], BulkResult]:
+    """Like `import_cbt_logs_async`, but returns the statements for the caller to write."""
+    return await new_rows_statements_async(db, user_id, "cbt_logs", CBT, CBT_INSERT_OR_IGNORE_SQL, rows)
+
+def update_cbt_log(db: Connection, user_id: str, log_in: CBTLogPublic) -> bool:
+    logger.info("Updating CBT log", extra={"user_id": user_id, "log_id": log_in.id})
+    updated, _ = execute_write(db, [
+        _update_cbt_statement(user_id, log_in),
+        change_statement(user_id, CBT, log_in.id, UPSERT)
+    ])
+    invalidate_user(user_id)
+    success = updated > 0
+    logger.info("CBT log update result", extra={"log_id": log_in.id, "success": success})
+    return success
+
+async def update_cbt_log_async(db: aiosqlite.Connection, user_id: str, log_in: CBTLogPublic) -> bool:
+    logger.info("Updating CBT log", extra={"user_id": user_id, "log_id": log_in.id})
+    updated, _ = await execute_write_async(db, [
+        _update_cbt_statement(user_id, log_in),
+        change_statement(user_id, CBT, log_in.id, UPSERT)
+    ])
+    invalidate_user(user_id)
+    success = updated > 0
     logger.info("CBT log update result", extra={"log_id": log_in.id, "success": success})
     return success
 
 def delete_cbt_log(db: Connection, user_id: str, log_id: str) -> bool:
     logger.info("Attempting to delete CBT log", extra={"user_id": user_id, "log_id": log_id})
     cursor = db.cursor()
-    
+
     # Check if it exists before deleting to handle the edge case gracefully
-    cursor.execute("SELECT id FROM cbt_logs WHERE id = ? AND user_id = ?", (log_id, user_id))
+    cursor.execute(CBT_LOG_EXISTS_SQL, (log_id, user_id))
     if not cursor.fetchone():
         logger.info("CBT log not found, considering delete successful (idempotent)", extra={"log_id": log_id})
         return True
 
-    cursor.execute(
-        "DELETE FROM cbt_logs WHERE id = ? AND user_id = ?",
-        (log_id, user_id)
-    )
-    db.commit()
-    success = cursor.rowcount > 0
+    deleted, _ = execute_write(db, [
+        _delete_cbt_statement(user_id, log_id),
+        change_statement(user_id, CBT, log_id, DELETE)
+    ])
+    invalidate_user(user_id)
+    success = deleted > 0
+    logger.info("CBT log deletion result", extra={"log_id": log_id, "success": success})
+    return success
+
+async def delete_cbt_log_async(db: aiosqlite.Connection, user_id: str, log_id: str) -> bool:
+    logger.info("Attempting to delete CBT log", extra={"user_id": user_id, "log_id": log_id})
+
+    async with db.execute(CBT_LOG_EXISTS_SQL, (log_id, user_id)) as cursor:
+        exists = await cursor.fetchone()
+    if not exists:
+        logger.info("CBT log not found, considering delete successful (idempotent)", extra={"log_id": log_id})
+        return True
+
+    deleted, _ = await execute_write_async(db, [
+        _delete_cbt_statement(user_id, log_id),
+        change_statement(user_id, CBT, log_id, DELETE)
+    ])
+    invalidate_user(user_id)
+    success = deleted > 0
     logger.info("CBT log deletion result", extra={"log_id": log_id, "success": success})
     return success
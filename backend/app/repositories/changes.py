@@ -0,0 +1,112 @@
+# backend/app/repositories/changes.py
+"""
+Change feed backing delta sync.
+
+Every write to `mood_entries` or `cbt_logs` appends a row to `change_log` in
+the same transaction, so `seq` is a monotonically increasing position in the
+user's history. Deletes are recorded as tombstones (`op = 'delete'`). Clients
+keep the last `seq` they saw and ask only for what happened after it.
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+import aiosqlite
+from app.db.writer import Statement
+
+MOOD = "mood"
+CBT = "cbt"
+UPSERT = "upsert"
+DELETE = "delete"
+
+# `changes()` is the row count of the write just before this statement, so a
+# no-op update or delete leaves no trace in the feed
+_CHANGE_IF_WRITTEN_SQL = """
+    INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+    SELECT ?, ?, ?, ?, ? WHERE changes() > 0
+"""
+
+_CHANGE_SQL = """
+    INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def change_statement(user_id: str, entity: str, entity_id: str, op: str) -> Statement:
+    """Record a change to one row. Must directly follow the statement that wrote it."""
+    return Statement(_CHANGE_IF_WRITTEN_SQL, (user_id, entity, entity_id, op, _now_ms()))
+
+
+def change_many_statement(user_id: str, entity: str, entity_ids: Iterable[str], op: str) -> Statement:
+    """Record the same change for a batch of rows, e.g. after a bulk import."""
+    changed_at = _now_ms()
+    return Statement(
+        _CHANGE_SQL,
+        [(user_id, entity, entity_id, op, changed_at) for entity_id in entity_ids],
+        many=True
+    )
+
+
+async def get_current_seq_async(db: aiosqlite.Connection, user_id: str) -> int:
+    async with db.execute("SELECT MAX(seq) FROM change_log WHERE user_id = ?", (user_id,)) as cursor:
+        (seq,) = await cursor.fetchone()
+    return seq or 0
+
+
+async def get_changes_since_async(
+    db: aiosqlite.Connection,
+    user_id: str,
+    since: int,
+    limit: int
+) -> Tuple[List[aiosqlite.Row], bool]:
+    """
+    Fetch up to `limit` change_log rows after `since`, oldest first.
+
+    Returns the rows and whether more changes remain after them.
+    """
+    async with db.execute(
+        """
+        SELECT seq, entity, entity_id, op FROM change_log
+        WHERE user_id = ? AND seq > ?
+        ORDER BY seq
+        LIMIT ?
+        """,
+        (user_id, since, limit + 1)
+    ) as cursor:
+        rows = await cursor.fetchall()
+    return rows[:limit], len(rows) > limit
+
+
+
+def changed_rows_clause(user_id: str, entity: str, after: int, upto: int) -> Tuple[str, List[Any]]:
+    """Condition for `build_list_query` matching rows upserted in the seq range `(after, upto]`."""
+    return (
+        """id IN (
+            SELECT entity_id FROM change_log
+            WHERE user_id = ? AND entity = ? AND op = ? AND seq > ? AND seq <= ?
+        )""",
+        [user_id, entity, UPSERT, after, upto]
+    )
+
+
+async def get_deleted_between_async(db: aiosqlite.Connection, user_id: str, after: int, upto: int) -> Dict[str, List[str]]:
+    """Ids per entity whose last change in `(after, upto]` was a delete."""
+    deleted: Dict[str, List[str]] = {MOOD: [], CBT: []}
+    async with db.execute(
+        """
+        SELECT entity, entity_id FROM change_log AS c
+        WHERE user_id = ? AND op = ? AND seq > ? AND seq <= ?
+          AND seq = (
+              SELECT MAX(seq) FROM change_log
+              WHERE user_id = c.user_id AND entity = c.entity AND entity_id = c.entity_id AND seq <= ?
+          )
+        ORDER BY seq
+        """,
+        (user_id, DELETE, after, upto, upto)
+    ) as cursor:
+        for row in await cursor.fetchall():
+            deleted[row["entity"]].append(row["entity_id"])
+    return deleted
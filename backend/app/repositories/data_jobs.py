@@ -0,0 +1,182 @@
+# backend/app/repositories/data_jobs.py
+"""
+Persistence for background export/import jobs (`data_jobs`).
+
+A runner takes a job with `claim_job_async`, which leases it to an owner
+token, and keeps renewing the lease while it works. Only the lease holder can
+finish the job, and a job whose lease expired, because its runner died, can be
+claimed again; so with several processes, or during a rolling restart, each
+attempt runs in exactly one place.
+"""
+
+import json
+import time
+import uuid
+from typing import List, Optional
+import aiosqlite
+from app.db.session import execute_write_async
+from app.db.writer import Statement
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+EXPORT = "export"
+IMPORT = "import"
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _decode_job_row(row) -> dict:
+    return {
+        **dict(row),
+        "params": json.loads(row["params"]) if row["params"] else {},
+        "progress": json.loads(row["progress"]) if row["progress"] else None,
+    }
+
+
+async def get_job_async(db: aiosqlite.Connection, user_id: str, job_id: str, kind: Optional[str] = None) -> Optional[dict]:
+    sql = "SELECT * FROM data_jobs WHERE id = ? AND user_id = ?"
+    params = [job_id, user_id]
+    if kind is not None:
+        sql += " AND kind = ?"
+        params.append(kind)
+    async with db.execute(sql, params) as cursor:
+        row = await cursor.fetchone()
+    return _decode_job_row(row) if row else None
+
+
+async def get_job_by_key_async(db: aiosqlite.Connection, user_id: str, kind: str, idempotency_key: str) -> Optional[dict]:
+    async with db.execute(
+        "SELECT * FROM data_jobs WHERE user_id = ? AND kind = ? AND idempotency_key = ?",
+        (user_id, kind, idempotency_key)
+    ) as cursor:
+        row = await cursor.fetchone()
+    return _decode_job_row(row) if row else None
+
+
+async def create_job_async(
+    db: aiosqlite.Connection,
+    user_id: str,
+    kind: str,
+    format: str,
+    params: Optional[dict] = None,
+    idempotency_key: Optional[str] = None,
+    file_path: Optional[str] = None,
+    size_bytes: Optional[int] = None
+) -> dict:
+    """
+    Queue a new job. With an `idempotency_key` that was already used for this
+    user and kind, the existing job is returned instead and nothing is queued;
+    check `created` on the result to tell the two apart.
+    """
+    job_id = uuid.uuid4().hex
+    now = _now_ms()
+    (inserted,) = await execute_write_async(db, [Statement(
+        """
+        INSERT OR IGNORE INTO data_jobs
+            (id, user_id, kind, status, format, params, idempotency_key, file_path, size_bytes, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (job_id, user_id, kind, QUEUED, format, json.dumps(params or {}), idempotency_key, file_path, size_bytes, now, now)
+    )])
+    if inserted:
+        logger.info("Data job queued", extra={"job_id": job_id, "kind": kind, "format": format})
+        return {**await get_job_async(db, user_id, job_id), "created": True}
+    return {**await get_job_by_key_async(db, user_id, kind, idempotency_key), "created": False}
+
+
+async def update_job_async(db: aiosqlite.Connection, job_id: str, **fields) -> None:
+    """Set the given columns; `progress`/`params` are JSON-encoded and `updated_at` is bumped."""
+    for key in ("progress", "params"):
+        if key in fields and fields[key] is not None:
+            fields[key] = json.dumps(fields[key])
+    if fields.get("status") in (SUCCEEDED, FAILED):
+        fields["finished_at"] = _now_ms()
+    fields["updated_at"] = _now_ms()
+    assignments = ", ".join(f"{column} = ?" for column in fields)
+    await execute_write_async(db, [Statement(
+        f"UPDATE data_jobs SET {assignments} WHERE id = ?",
+        (*fields.values(), job_id)
+    )])
+
+
+async def get_runnable_job_ids_async(db: aiosqlite.Connection) -> List[str]:
+    """Ids of queued jobs and of running jobs whose lease expired, oldest first."""
+    async with db.execute(
+        """
+        SELECT id FROM data_jobs
+        WHERE status = ? OR (status = ? AND (lease_expires_at IS NULL OR lease_expires_at < ?))
+        ORDER BY created_at
+        """,
+        (QUEUED, RUNNING, _now_ms())
+    ) as cursor:
+        return [row["id"] for row in await cursor.fetchall()]
+
+
+async def claim_job_async(db: aiosqlite.Connection, job_id: str, owner: str, lease_ms: int) -> Optional[dict]:
+    """
+    Lease `job_id` to `owner` if it is queued, or running under an expired
+    lease. A single UPDATE decides, so of several runners trying the same job
+    only one gets it; the others receive None.
+    """
+    now = _now_ms()
+    token = f"{owner}:{uuid.uuid4().hex}"
+    (claimed,) = await execute_write_async(db, [Statement(
+        """
+        UPDATE data_jobs SET status = ?, lease_owner = ?, lease_expires_at = ?, error = NULL, updated_at = ?
+        WHERE id = ? AND (status = ? OR (status = ? AND (lease_expires_at IS NULL OR lease_expires_at < ?)))
+        """,
+        (RUNNING, token, now + lease_ms, now, job_id, QUEUED, RUNNING, now)
+    )])
+    if not claimed:
+        return None
+    async with db.execute("SELECT * FROM data_jobs WHERE id = ? AND lease_owner = ?", (job_id, token)) as cursor:
+        row = await cursor.fetchone()
+    return _decode_job_row(row) if row else None
+
+
+async def renew_job_lease_async(db: aiosqlite.Connection, job: dict, lease_ms: int) -> bool:
+    """Extend the lease on a claimed job; False if it was lost to another runner."""
+    now = _now_ms()
+    (updated,) = await execute_write_async(db, [Statement(
+        "UPDATE data_jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND lease_owner = ?",
+        (now + lease_ms, now, job["id"], job["lease_owner"])
+    )])
+    return bool(updated)
+
+
+async def finish_job_async(db: aiosqlite.Connection, job: dict, status: str, **fields) -> bool:
+    """
+    Record the outcome of a claimed job and drop its lease. Returns False,
+    writing nothing, if the lease was lost to another runner meanwhile.
+    """
+    if fields.get("progress") is not None:
+        fields["progress"] = json.dumps(fields["progress"])
+    now = _now_ms()
+    fields.update(status=status, lease_owner=None, lease_expires_at=None, finished_at=now, updated_at=now)
+    assignments = ", ".join(f"{column} = ?" for column in fields)
+    (updated,) = await execute_write_async(db, [Statement(
+        f"UPDATE data_jobs SET {assignments} WHERE id = ? AND lease_owner = ?",
+        (*fields.values(), job["id"], job["lease_owner"])
+    )])
+    return bool(updated)
+
+
+async def get_expired_jobs_async(db: aiosqlite.Connection, finished_before: int) -> List[dict]:
+    async with db.execute(
+        "SELECT * FROM data_jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+        (finished_before,)
+    ) as cursor:
+        return [_decode_job_row(row) for row in await cursor.fetchall()]
+
+
+async def delete_jobs_async(db: aiosqlite.Connection, job_ids: List[str]) -> None:
+    if job_ids:
+        await execute_write_async(db, [Statement("DELETE FROM data_jobs WHERE id = ?", [(job_id,) for job_id in job_ids], many=True)])
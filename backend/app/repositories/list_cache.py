@@ -0,0 +1,48 @@
+# backend/app/repositories/list_cache.py
+"""
+Per-user cache of decoded list results.
+
+Each entry is tagged with the user's data version (latest `change_log` seq)
+at the time it was loaded. A lookup re-reads the version, which is a single
+index probe, and treats a mismatch as a miss. Writes made by any process bump
+the version in the same transaction, so several uvicorn workers can each keep
+their own cache without serving stale lists. Local writes also call
+`invalidate_user` so memory is freed straight away.
+"""
+
+import os
+from typing import Any, Awaitable, Callable, Hashable
+import aiosqlite
+from app.core.cache import LRUCache
+from app.core.metrics import metrics
+from app.repositories.changes import get_current_seq_async
+
+LIST_CACHE_MAX_ENTRIES = int(os.getenv("LIST_CACHE_MAX_ENTRIES", "256"))
+
+list_cache = LRUCache(LIST_CACHE_MAX_ENTRIES, name="cache.lists")
+metrics.register_collector("list_cache", list_cache.stats)
+
+
+async def cached_list(
+    db: aiosqlite.Connection,
+    user_id: str,
+    key: Hashable,
+    load: Callable[[], Awaitable[Any]]
+) -> Any:
+    """
+    Return the cached result for `(user_id, key)` if still current, else `await load()`.
+
+    The version is read before loading, so a stored result is never older than
+    the version it is tagged with. Callers must treat results as read-only.
+    """
+    version = await get_current_seq_async(db, user_id)
+    entry = list_cache.get((user_id, key))
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    value = await load()
+    list_cache.set((user_id, key), (version, value))
+    return value
+
+
+def invalidate_user(user_id: str) -> None:
+    list_cache.invalidate(lambda key: key[0] == user_id)
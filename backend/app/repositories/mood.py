@@ -1,28 +1,148 @@
 import json
-from typing import List
+from typing import AsyncIterator, List, Optional, Tuple
 from sqlite3 import Connection
+import aiosqlite
+from app.db.session import execute_write, execute_write_async, get_async_pool
+from app.db.writer import Statement
+from app.repositories.changes import MOOD, UPSERT, DELETE, change_statement, change_many_statement, changed_rows_clause
+from app.repositories.bulk import (
+    BulkResult,
+    check_import_fields,
+    existing_ids_async,
+    insert_new_rows_async,
+    new_rows_statements_async,
+    partition_new
+)
+from app.repositories.list_cache import cached_list, invalidate_user
+from app.repositories.pagination import Page, build_list_query, iter_chunks_async, to_page
 from app.schemas.mood import MoodCreate
-from app.services.ai_client import analyze_mood_note
+from app.services.ai_client import analyze_mood_note, analyze_mood_notes
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# SQL and row mapping shared by the sync (scripts) and async (API) variants below
+
+MOOD_EXISTS_SQL = "SELECT id FROM mood_entries WHERE id = ? AND user_id = ?"
+
+MOOD_IMPORT_REQUIRED = ("id", "rating", "emotions", "timestamp")
+MOOD_IMPORT_SCALARS = ("id", "rating", "timestamp", "note", "trigger", "behavior")
+
+def _decode_mood_row(row) -> dict:
+    return {
+        **dict(row),
+        "emotions": json.loads(row["emotions"]),
+        "ai_analysis": json.loads(row["ai_analysis"]) if row["ai_analysis"] else None
+    }
+
+MOOD_INSERT_SQL = """
+    INSERT INTO mood_entries (id, rating, emotions, note, trigger, behavior, timestamp, user_id, ai_analysis)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+MOOD_INSERT_OR_IGNORE_SQL = MOOD_INSERT_SQL.replace("INSERT INTO", "INSERT OR IGNORE INTO", 1)
+
+def _mood_params(user_id: str, mood_in: MoodCreate, ai_analysis: Optional[dict]) -> tuple:
+    return (
+        mood_in.id,
+        mood_in.rating,
+        json.dumps(mood_in.emotions),
+        mood_in.note,
+        mood_in.trigger,
+        mood_in.behavior,
+        mood_in.timestamp,
+        user_id,
+        json.dumps(ai_analysis) if ai_analysis else None
+    )
+
+def _insert_mood_statement(user_id: str, mood_in: MoodCreate, ai_analysis: Optional[dict]) -> Statement:
+    return Statement(MOOD_INSERT_SQL, _mood_params(user_id, mood_in, ai_analysis))
+
+def _delete_mood_statement(user_id: str, mood_id: str) -> Statement:
+    return Statement(
+        "DELETE FROM mood_entries WHERE id = ? AND user_id = ?",
+        (mood_id, user_id)
+    )
+
+def _mood_public(user_id: str, mood_in: MoodCreate, ai_analysis: Optional[dict]) -> dict:
+    # Return a dict that matches the MoodPublic schema
+    return {
+        **mood_in.model_dump(),
+        "user_id": user_id,
+        "ai_analysis": ai_analysis
+    }
+
 def get_mood_entries(db: Connection, user_id: str) -> List[dict]:
     logger.info("Fetching mood entries", extra={"user_id": user_id})
+    sql, params = build_list_query("mood_entries", user_id)
     cursor = db.cursor()
-    cursor.execute(
-        "SELECT * FROM mood_entries WHERE user_id = ? ORDER BY timestamp DESC", 
-        (user_id,)
-    )
-    rows = cursor.fetchall()
-    return [
-        {
-            **dict(row),
-            "emotions": json.loads(row["emotions"]),
-            "ai_analysis": json.loads(row["ai_analysis"]) if row["ai_analysis"] else None
-        } 
-        for row in rows
-    ]
+    cursor.execute(sql, params)
+    return [_decode_mood_row(row) for row in cursor.fetchall()]
+
+async def get_mood_entries_async(db: aiosqlite.Connection, user_id: str) -> List[dict]:
+    logger.info("Fetching mood entries", extra={"user_id": user_id})
+    sql, params = build_list_query("mood_entries", user_id)
+
+    async def load():
+        async with db.execute(sql, params) as cursor:
+            rows = await cursor.fetchall()
+        return [_decode_mood_row(row) for row in rows]
+
+    return await cached_list(db, user_id, ("mood_entries", "all"), load)
+
+def iter_mood_entries_async(
+    user_id: str,
+    chunk_size: int = 500,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    changes: Optional[Tuple[int, int]] = None
+) -> AsyncIterator[List[dict]]:
+    """
+    Stream a user's mood entries, newest first, in decoded chunks. Bypasses the list cache.
+
+    `since`/`until` bound the entry timestamp; `changes` is a change-log seq
+    range `(after, upto]` and keeps only rows upserted within it.
+    """
+    where = changed_rows_clause(user_id, MOOD, *changes) if changes else None
+    return iter_chunks_async(get_async_pool().connection, "mood_entries", user_id, _decode_mood_row, chunk_size, since, until, where)
+
+async def get_mood_page_async(
+    db: aiosqlite.Connection,
+    user_id: str,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    cached: bool = True
+) -> Page:
+    """
+    Fetch one keyset page of mood entries. Raises ValueError for a malformed cursor.
+    `cached=False` skips the list cache, for callers caching a rendering of
+    the page instead.
+    """
+    logger.info("Fetching mood entries page", extra={"user_id": user_id, "limit": limit})
+    sql, params = build_list_query("mood_entries", user_id, since, until, limit, cursor)
+
+    async def load():
+        async with db.execute(sql, params) as db_cursor:
+            rows = await db_cursor.fetchall()
+        return to_page(rows, limit, _decode_mood_row)
+
+    if not cached:
+        return await load()
+    return await cached_list(db, user_id, ("mood_entries", since, until, limit, cursor), load)
+
+async def get_moods_by_id_async(db: aiosqlite.Connection, user_id: str, mood_ids: List[str]) -> List[dict]:
+    """Fetch the mood entries with the given ids; ids that no longer exist are skipped."""
+    if not mood_ids:
+        return []
+    placeholders = ", ".join("?" for _ in mood_ids)
+    async with db.execute(
+        f"SELECT * FROM mood_entries WHERE user_id = ? AND id IN ({placeholders})",
+        (user_id, *mood_ids)
+    ) as cursor:
+        rows = await cursor.fetchall()
+    return [_decode_mood_row(row) for row in rows]
 
 async def create_mood_entry(db: Connection, user_id: str, mood_in: MoodCreate) -> dict:
     logger.info("Creating mood entry", extra={"user_id": user_id, "mood_id": mood_in.id})
@@ -30,49 +150,119 @@ async def create_mood_entry(db: Connection, user_id: str, mood_in: MoodCreate) -
     if mood_in.note:
         ai_analysis = await analyze_mood_note(mood_in.note)
 
-    cursor = db.cursor()
-    cursor.execute(
-        """
-        INSERT INTO mood_entries (id, rating, emotions, note, trigger, behavior, timestamp, user_id, ai_analysis)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            mood_in.id,
-            mood_in.rating,
-            json.dumps(mood_in.emotions),
-            mood_in.note,
-            mood_in.trigger,
-            mood_in.behavior,
-            mood_in.timestamp,
-            user_id,
-            json.dumps(ai_analysis) if ai_analysis else None
-        )
-    )
-    db.commit()
-    
+    execute_write(db, [
+        _insert_mood_statement(user_id, mood_in, ai_analysis),
+        change_statement(user_id, MOOD, mood_in.id, UPSERT)
+    ])
+    invalidate_user(user_id)
+
     logger.info("Mood entry created successfully", extra={"mood_id": mood_in.id})
-    # Return a dict that matches the MoodPublic schema
-    return {
-        **mood_in.model_dump(), 
-        "user_id": user_id, 
-        "ai_analysis": ai_analysis
-    }
+    return _mood_public(user_id, mood_in, ai_analysis)
+
+async def create_mood_entry_async(db: aiosqlite.Connection, user_id: str, mood_in: MoodCreate) -> dict:
+    logger.info("Creating mood entry", extra={"user_id": user_id, "mood_id": mood_in.id})
+    ai_analysis = None
+    if mood_in.note:
+        ai_analysis = await analyze_mood_note(mood_in.note)
+
+    await execute_write_async(db, [
+        _insert_mood_statement(user_id, mood_in, ai_analysis),
+        change_statement(user_id, MOOD, mood_in.id, UPSERT)
+    ])
+    invalidate_user(user_id)
+
+    logger.info("Mood entry created successfully", extra={"mood_id": mood_in.id})
+    return _mood_public(user_id, mood_in, ai_analysis)
+
+async def create_mood_entries_bulk_async(db: aiosqlite.Connection, user_id: str, moods_in: List[MoodCreate]) -> BulkResult:
+    """
+    Insert many mood entries in one transaction. Ids that already exist, or
+    repeat earlier in the batch, are reported as duplicates and left untouched.
+    """
+    logger.info("Bulk creating mood entries", extra={"user_id": user_id, "count": len(moods_in)})
+    existing = await existing_ids_async(db, "mood_entries", [m.id for m in moods_in])
+    new, result = partition_new(moods_in, existing)
+    if not new:
+        return result
+
+    analyses = await analyze_mood_notes([mood_in.note for mood_in in new])
+    await execute_write_async(db, [
+        Statement(
+            # OR IGNORE: a concurrent insert of the same id must not fail the whole batch
+            MOOD_INSERT_OR_IGNORE_SQL,
+            [_mood_params(user_id, mood_in, analysis) for mood_in, analysis in zip(new, analyses)],
+            many=True
+        ),
+        change_many_statement(user_id, MOOD, [mood_in.id for mood_in in new], UPSERT)
+    ])
+    invalidate_user(user_id)
+
+    logger.info("Mood entries bulk created", extra={"created_count": result.created, "duplicate_count": result.duplicates})
+    return result
+
+def mood_import_row(user_id: str, record: dict) -> Tuple[str, tuple]:
+    """
+    Map one mood entry as written by /data/export to `(id, insert params)`.
+    The stored analysis is kept, so imports skip re-analysis. Raises KeyError
+    or ValueError if a required field is missing or a field has the wrong shape.
+    """
+    check_import_fields(record, MOOD_IMPORT_REQUIRED, MOOD_IMPORT_SCALARS)
+    ai_analysis = record.get("ai_analysis")
+    return record["id"], (
+        record["id"],
+        record["rating"],
+        json.dumps(record["emotions"]),
+        record.get("note"),
+        record.get("trigger"),
+        record.get("behavior"),
+        record["timestamp"],
+        user_id,
+        json.dumps(ai_analysis) if ai_analysis else None
+    )
+
+async def import_mood_entries_async(db: aiosqlite.Connection, user_id: str, rows: List[Tuple[str, tuple]]) -> BulkResult:
+    """Insert rows produced by `mood_import_row`, skipping ids that already exist."""
+    return await insert_new_rows_async(db, user_id, "mood_entries", MOOD, MOOD_INSERT_OR_IGNORE_SQL, rows)
+
+async def mood_import_statements_async(
+    db: aiosqlite.Connection, user_id: str, rows: List[Tuple[str, tuple]]
+) -> Tuple[List[Statement], BulkResult]:
+    """Like `import_mood_entries_async`, but returns the statements for the caller to write."""
+    return await new_rows_statements_async(db, user_id, "mood_entries", MOOD, MOOD_INSERT_OR_IGNORE_SQL, rows)
 
 def delete_mood_entry(db: Connection, user_id: str, mood_id: str) -> bool:
     logger.info("Attempting to delete mood entry", extra={"user_id": user_id, "mood_id": mood_id})
     cursor = db.cursor()
-    
+
     # Check if it exists before deleting to handle the edge case gracefully
-    cursor.execute("SELECT id FROM mood_entries WHERE id = ? AND user_id = ?", (mood_id, user_id))
+    cursor.execute(MOOD_EXISTS_SQL, (mood_id, user_id))
     if not cursor.fetchone():
         logger.info("Mood entry not found, considering delete successful (idempotent)", extra={"mood_id": mood_id})
         return True
 
-    cursor.execute(
-        "DELETE FROM mood_entries WHERE id = ? AND user_id = ?",
-        (mood_id, user_id)
-    )
-    db.commit()
-    success = cursor.rowcount > 0
+    deleted, _ = execute_write(db, [
+        _delete_mood_statement(user_id, mood_id),
+        change_statement(user_id, MOOD, mood_id, DELETE)
+    ])
+    invalidate_user(user_id)
+    success = deleted > 0
+    logger.info("Mood entry deletion result", extra={"mood_id": mood_id, "success": success})
+    return success
+
+async def delete_mood_entry_async(db: aiosqlite.Connection, user_id: str, mood_id: str) -> bool:
+    logger.info("Attempting to delete mood entry", extra={"user_id": user_id, "mood_id": mood_id})
+
+    async with db.execute(MOOD_EXISTS_SQL, (mood_id, user_id)) as cursor:
+        exists = await cursor.fetchone()
+    if not exists:
+        logger.info("Mood entry not found, considering delete successful (idempotent)", extra={"mood_id": mood_id})
+        return True
+
+    deleted, _ = await execute_write_async(db, [
+        _delete_mood_statement(user_id, mood_id),
+        change_statement(user_id, MOOD, mood_id, DELETE)
+    ])
+    invalidate_user(user_id)
+    success = deleted > 0
     logger.info("Mood entry deletion result", extra={"mood_id": mood_id, "success": success})
     return success
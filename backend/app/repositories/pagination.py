@@ -0,0 +1,117 @@
+# backend/app/repositories/pagination.py
+"""
+Keyset pagination helpers shared by the list repositories.
+
+Lists are ordered newest first by `(timestamp DESC, id ASC)`, which matches the
+`(user_id, timestamp DESC, id)` indexes, so a page is a bounded index range
+scan no matter how far back the cursor points. Cursors are opaque to clients:
+URL-safe base64 of the last row's `(timestamp, id)`.
+"""
+
+import base64
+import json
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, List, NamedTuple, Optional, Tuple
+
+MAX_PAGE_SIZE = 500
+
+
+class Page(NamedTuple):
+    items: List[dict]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(timestamp: int, row_id: str) -> str:
+    raw = json.dumps([timestamp, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    """Decode a cursor produced by `encode_cursor`. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(timestamp, int) or not isinstance(row_id, str):
+        raise ValueError("Invalid cursor")
+    return timestamp, row_id
+
+
+def build_list_query(
+    table: str,
+    user_id: str,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    where: Optional[Tuple[str, List[Any]]] = None
+) -> Tuple[str, List[Any]]:
+    """
+    Build the SELECT for one page of `table` for `user_id`.
+
+    `since` is inclusive and `until` exclusive. `where` is an extra condition
+    with its parameters. When `limit` is set one extra row is fetched so
+    `to_page` can tell whether another page exists.
+    """
+    clauses = ["user_id = ?"]
+    params: List[Any] = [user_id]
+    if where is not None:
+        clauses.append(where[0])
+        params.extend(where[1])
+    if since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("timestamp < ?")
+        params.append(until)
+    if cursor is not None:
+        after_timestamp, after_id = decode_cursor(cursor)
+        clauses.append("(timestamp < ? OR (timestamp = ? AND id > ?))")
+        params.extend([after_timestamp, after_timestamp, after_id])
+
+    sql = f"SELECT * FROM {table} WHERE {' AND '.join(clauses)} ORDER BY timestamp DESC, id ASC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+    return sql, params
+
+
+def to_page(rows: list, limit: Optional[int], decode) -> Page:
+    """Trim the look-ahead row fetched by `build_list_query` and derive the next cursor."""
+    if limit is None or len(rows) <= limit:
+        return Page([decode(row) for row in rows], None)
+    rows = rows[:limit]
+    last = rows[-1]
+    return Page([decode(row) for row in rows], encode_cursor(last["timestamp"], last["id"]))
+
+
+async def iter_chunks_async(
+    connection: Callable[[], AsyncContextManager],
+    table: str,
+    user_id: str,
+    decode,
+    chunk_size: int,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    where: Optional[Tuple[str, List[Any]]] = None
+) -> AsyncIterator[List[dict]]:
+    """
+    Walk a user's rows in list order, yielding decoded chunks. The bounds
+    and `where` are applied as in `build_list_query`.
+
+    Each chunk is its own keyset query on a connection checked out just for
+    that query, so a slow consumer (e.g. a download) holds neither a pooled
+    connection nor a read lock between chunks, and memory stays at one chunk.
+    """
+    cursor = None
+    while True:
+        sql, params = build_list_query(table, user_id, since, until, chunk_size, cursor, where)
+        async with connection() as conn:
+            async with conn.execute(sql, params) as db_cursor:
+                rows = await db_cursor.fetchall()
+        page = to_page(rows, chunk_size, decode)
+        if page.items:
+            yield page.items
+        if page.next_cursor is None:
+            return
+        cursor = page.next_cursor
@@ -0,0 +1,15 @@
+from typing import List, Literal
+from app.schemas.base import TunedBaseModel
+
+class BulkItemResult(TunedBaseModel):
+    id: str
+    status: Literal["created", "duplicate"]
+
+class BulkCreateResponse(TunedBaseModel):
+    """
+    Outcome of a bulk create. `results` follows the request order; duplicates
+    (ids that already exist or repeat within the batch) are left unchanged.
+    """
+    created: int
+    duplicates: int
+    results: List[BulkItemResult]
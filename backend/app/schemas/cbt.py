@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 from app.schemas.base import TunedBaseModel
 
 # --- Phase 2: AI Analysis & HITL Schemas ---
@@ -32,6 +32,30 @@ class CBTAnalysisResponse(TunedBaseModel):
     suggestions: List[DistortionSuggestion]
     reframes: List[RationalReframe]
     prompt_version: Optional[str] = None
+    degraded: bool = False # True for a local fallback while the AI service is unavailable
+
+class CBTAnalysisError(TunedBaseModel):
+    """
+    Why a queued analysis failed: the status code and detail the synchronous
+    endpoint would have responded with.
+    """
+    status_code: int
+    detail: Any
+    retry_after: Optional[int] = None # Seconds, for 429
+
+class CBTAnalysisJob(TunedBaseModel):
+    """
+    An analysis queued with `mode=async`. `result` is set once it has
+    succeeded and `error` once it has failed.
+    """
+    id: str
+    status: str # "queued", "running", "succeeded" or "failed"
+    result: Optional[CBTAnalysisResponse] = None
+    error: Optional[CBTAnalysisError] = None
+    attempts: int
+    created_at: int
+    started_at: Optional[int] = None
+    finished_at: Optional[int] = None
 
 # --- Core CBT Log Schemas ---
 
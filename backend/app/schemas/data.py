@@ -0,0 +1,38 @@
+from typing import List, Optional
+from app.schemas.base import TunedBaseModel
+
+class ImportCounts(TunedBaseModel):
+    created: int
+    duplicates: int
+
+class ImportSummary(TunedBaseModel):
+    """
+    Outcome of an import. Duplicates are ids that already existed and were left
+    unchanged; invalid records were skipped, and the first few are described
+    in `errors`. `message` says whether any were.
+    """
+    message: str
+    moods: ImportCounts
+    cbt_logs: ImportCounts
+    invalid: int
+    errors: List[str]
+    batches: int
+    elapsed_ms: float
+    rows_per_second: Optional[int] = None
+
+class DataJob(TunedBaseModel):
+    """
+    A background export or import. `download_url` is set once an export has
+    succeeded; imports report their counts in `progress` as batches commit.
+    """
+    id: str
+    kind: str
+    status: str
+    format: str
+    progress: Optional[dict] = None
+    error: Optional[str] = None
+    size_bytes: Optional[int] = None
+    created_at: int
+    updated_at: int
+    finished_at: Optional[int] = None
+    download_url: Optional[str] = None
@@ -0,0 +1,19 @@
+from typing import List
+from app.schemas.base import TunedBaseModel
+from app.schemas.mood import MoodPublic
+from app.schemas.cbt import CBTLogPublic
+
+class SyncDeleted(TunedBaseModel):
+    moods: List[str] = []
+    cbt_logs: List[str] = []
+
+class SyncResponse(TunedBaseModel):
+    """
+    Everything that changed after the client's last cursor. Rows are current
+    state (latest write wins); ids in `deleted` should be dropped locally.
+    """
+    cursor: int
+    has_more: bool
+    moods: List[MoodPublic] = []
+    cbt_logs: List[CBTLogPublic] = []
+    deleted: SyncDeleted = SyncDeleted()
@@ -0,0 +1,225 @@
+# backend/app/services/admission.py
+"""
+Admission control for Gemini analyses.
+
+Two token buckets mirror the provider quota: one for requests per minute and
+one for tokens per minute. An analysis reserves its model calls and an
+estimate of its tokens before it starts, so it either fits the quota or
+waits for it. It does not run into provider 429s halfway through.
+
+Waiting analyses are queued per user and admitted round-robin across users,
+so one user firing repeated analyses delays only their own requests. An
+analysis whose projected wait exceeds `max_wait_seconds`, or whose user
+already has `max_queued_per_user` waiting, is rejected at once with
+`AdmissionRejected`. Its `retry_after` becomes the 429's `Retry-After`.
+
+The buckets live in process memory. With several worker processes each one
+keeps to `1 / ai_worker_processes` of the quota, so together they stay
+within it.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Deque, NamedTuple, Optional
+from app.core.ai_config import get_ai_config
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Whose analysis is running; set by the analyze routes and the job workers
+current_user_id: ContextVar[str] = ContextVar("current_user_id", default="anonymous")
+
+
+class AdmissionRejected(Exception):
+    """Raised when an analysis cannot be admitted soon enough; retry after `retry_after` seconds."""
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"Analysis capacity exhausted, retry after {retry_after}s")
+
+
+class TokenBucket:
+    """Refills continuously at `rate` per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.available = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` is available, assuming nothing else is taken meanwhile."""
+        self._refill()
+        return max(0.0, (amount - self.available) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.available -= amount
+
+    def drain(self) -> None:
+        self._refill()
+        self.available = min(self.available, 0.0)
+
+
+class _Waiter(NamedTuple):
+    calls: int
+    tokens: int
+    future: asyncio.Future
+
+
+class AdmissionController:
+    """Request and token budgets, with a per-user round-robin queue in front of them."""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_wait_seconds: float,
+        max_queued_per_user: int
+    ):
+        self.requests = TokenBucket(requests_per_minute / 60, requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+        self.max_wait_seconds = max_wait_seconds
+        self.max_queued_per_user = max_queued_per_user
+        # Users with waiting analyses, in round-robin order
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def admit(self, user_id: str, calls: int, tokens: int) -> None:
+        """Wait until `calls` model calls and `tokens` tokens fit the budget, then take them."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Waiters and the dispatcher belong to the loop they were created on
+            self._loop = loop
+            self._queues.clear()
+            self._dispatcher = None
+
+        tokens = min(tokens, self.tokens.capacity)
+        if not self._queues and self._wait_for(calls, tokens) == 0:
+            self._take(calls, tokens)
+            return
+
+        queue = self._queues.get(user_id, ())
+        projected = self._projected_wait(user_id, calls, tokens)
+        if len(queue) >= self.max_queued_per_user or projected > self.max_wait_seconds:
+            metrics.incr("ai.admission.rejected")
+            retry_after = max(1, math.ceil(projected))
+            logger.warning("Analysis rejected by admission control", extra={"retry_after": retry_after})
+            raise AdmissionRejected(retry_after)
+
+        waiter = _Waiter(calls, tokens, loop.create_future())
+        self._queues.setdefault(user_id, deque()).append(waiter)
+        self._ensure_dispatcher()
+        start = time.perf_counter()
+        try:
+            await waiter.future
+        finally:
+            if waiter.future.cancelled() or not waiter.future.done():
+                # Cancelled while waiting; give up the place in the queue
+                self._remove(user_id, waiter)
+        metrics.observe("ai.admission.wait_ms", (time.perf_counter() - start) * 1000)
+
+    def try_take(self, calls: int, tokens: int) -> bool:
+        """Take budget for optional extra calls, only if it is there now and nobody is waiting for it."""
+        tokens = min(tokens, self.tokens.capacity)
+        if self._queues or self._wait_for(calls, tokens) > 0:
+            return False
+        self._take(calls, tokens)
+        return True
+
+    def drain(self) -> None:
+        """The provider is throttling us: spend the remaining budget so new work waits for a refill."""
+        self.requests.drain()
+        self.tokens.drain()
+        metrics.incr("ai.admission.drained")
+
+    def stats(self) -> dict:
+        return {
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "queued_users": len(self._queues),
+            "requests_available": round(self.requests.available, 2),
+            "tokens_available": round(self.tokens.available),
+            "admitted": metrics.counter("ai.admission.admitted"),
+            "rejected": metrics.counter("ai.admission.rejected"),
+            "wait_ms": metrics.histogram("ai.admission.wait_ms").snapshot(),
+        }
+
+    def _wait_for(self, calls: int, tokens: int) -> float:
+        return max(self.requests.time_until(calls), self.tokens.time_until(tokens))
+
+    def _take(self, calls: int, tokens: int) -> None:
+        self.requests.take(calls)
+        self.tokens.take(tokens)
+        metrics.incr("ai.admission.admitted")
+
+    def _projected_wait(self, user_id: str, calls: int, tokens: int) -> float:
+        """
+        Wait for a new analysis by `user_id`. Round-robin serves this user's
+        n-th waiting analysis after at most n from every other user, so only
+        those count towards the budget that must be refilled first.
+        """
+        position = len(self._queues.get(user_id, ())) + 1
+        ahead = [waiter for queue in self._queues.values() for waiter in list(queue)[:position]]
+        return self._wait_for(
+            calls + sum(waiter.calls for waiter in ahead),
+            tokens + sum(waiter.tokens for waiter in ahead)
+        )
+
+    def _remove(self, user_id: str, waiter: _Waiter) -> None:
+        queue = self._queues.get(user_id)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[user_id]
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = self._loop.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        while self._queues:
+            user_id, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            if waiter.future.done():
+                # Cancelled, and not yet removed by its own task
+                self._remove(user_id, waiter)
+                continue
+            wait = self._wait_for(waiter.calls, waiter.tokens)
+            if wait > 0:
+                # Re-check afterwards: the waiter may have been cancelled meanwhile
+                await asyncio.sleep(wait)
+                continue
+            queue.popleft()
+            self._take(waiter.calls, waiter.tokens)
+            waiter.future.set_result(None)
+            # Next user's turn
+            del self._queues[user_id]
+            if queue:
+                self._queues[user_id] = queue
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        config = get_ai_config()
+        # This process's share of the quota
+        _controller = AdmissionController(
+            config.ai_requests_per_minute / config.ai_worker_processes,
+            config.ai_tokens_per_minute / config.ai_worker_processes,
+            config.ai_admission_max_wait_seconds,
+            config.ai_admission_max_queued_per_user
+        )
+        metrics.register_collector("ai_admission", _controller.stats)
+    return _controller
@@ -1,11 +1,21 @@
 # backend/app/services/ai_client.py
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
 from textblob import TextBlob
 from app.schemas.cbt import CBTAnalysisRequest, CBTAnalysisResponse
 from app.core.logging import get_logger
 from app.core.ai_config import get_ai_config
+from app.core.metrics import metrics
+from app.services.admission import current_user_id, get_admission_controller
+from app.services.analysis_cache import analysis_key, get_analysis_cache, is_cacheable
+from app.services.analysis_stream import AnalysisEvent, response_events
+from app.services.circuit_breaker import CircuitOpen, Permit, get_circuit_breaker
+from app.services.heuristics import heuristic_analysis
+from app.services.single_flight import SingleFlight
 
 logger = get_logger(__name__)
 
@@ -22,6 +32,19 @@ class AIClientProtocol(ABC):
         """Analyze mood text for sentiment and keywords."""
         pass
 
+    async def analyze_moods(self, texts: List[Optional[str]]) -> List[Optional[dict]]:
+        """Analyze a batch of mood texts; results line up with `texts`."""
+        return [await self.analyze_mood(text) if text else None for text in texts]
+
+    async def analyze_cbt_stream(self, request: CBTAnalysisRequest) -> AsyncIterator[AnalysisEvent]:
+        """Analyze CBT entry, yielding results as they become available; by default all at the end."""
+        for event in response_events(await self.analyze_cbt(request)):
+            yield event
+
+    async def warm_up(self) -> None:
+        """Pay one-off setup costs (connections, lazy loading) before the first real request."""
+        pass
+
 class TextBlobClient(AIClientProtocol):
     """TextBlob-based AI client (Phase 1 implementation)."""
 
@@ -34,7 +57,24 @@ class TextBlobClient(AIClientProtocol):
         """Analyze mood note using TextBlob."""
         if not text:
             return None
+        return self._analyze_text(text)
+
+    async def analyze_moods(self, texts: List[Optional[str]]) -> List[Optional[dict]]:
+        """
+        Analyze a batch of mood notes in one pass on a worker thread, so a bulk
+        import neither blocks the event loop nor pays per-note dispatch.
+        """
+        logger.info("Analyzing mood notes", extra={"count": len(texts)})
+        return await asyncio.to_thread(
+            lambda: [self._analyze_text(text) if text else None for text in texts]
+        )
 
+    async def warm_up(self) -> None:
+        # The first analysis loads TextBlob's corpora and taggers
+        await asyncio.to_thread(self._analyze_text, "Warming up the mood analyzer.")
+
+    @staticmethod
+    def _analyze_text(text: str) -> Optional[dict]:
         logger.info("Analyzing mood note", extra={"text_length": len(text)})
 
         try:
@@ -57,7 +97,7 @@ class TextBlobClient(AIClientProtocol):
 
 # Import Gemini client when available
 try:
-    from app.services.gemini_client import GeminiClient
+    from app.services.gemini_client import GeminiClient, SafetyException
     _gemini_available = True
 except ImportError:
     _gemini_available = False
@@ -68,34 +108,196 @@ class GeminiAdapter(AIClientProtocol):
     
     def __init__(self):
         self.client = GeminiClient()
+        self.text_client = TextBlobClient()
+        self.flights = SingleFlight("ai.single_flight")
+        # Built with the client so /health can report it from the start
+        get_circuit_breaker()
+        metrics.register_collector("ai_single_flight", self.flights.stats)
 
     async def analyze_cbt(self, request: CBTAnalysisRequest) -> CBTAnalysisResponse:
-        return await self.client.analyze_cbt(request)
+        """
+        Analyze via Gemini, answering repeats of the same input from the
+        analysis cache. Identical analyses arriving while one is running
+        share its model calls. While the circuit breaker is open, a degraded
+        local analysis is returned instead (or CircuitOpen raised).
+        """
+        key = await self._cache_key(request)
+        if key is not None:
+            cached = await get_analysis_cache().get(key)
+            if cached is not None:
+                logger.info("CBT analysis served from cache", extra={"key_prefix": key[:12]})
+                return cached
+
+        flight_key = key if key is not None else await self._analysis_key(request)
+        return await self.flights.do(flight_key, lambda: self._analyze_uncached(request, key))
+
+    async def _analyze_uncached(self, request: CBTAnalysisRequest, key: Optional[str]) -> CBTAnalysisResponse:
+        permit = get_circuit_breaker().allow()
+        if permit is None:
+            return self._short_circuit(request)
+        async with self._model_call(request, self._model_calls(), permit):
+            response = await self.client.analyze_cbt(request)
+        if key is not None:
+            await get_analysis_cache().set(key, response)
+        return response
+
+    async def analyze_cbt_stream(self, request: CBTAnalysisRequest) -> AsyncIterator[AnalysisEvent]:
+        """Stream the analysis from Gemini; a cache hit or a degraded analysis is replayed at once."""
+        key = await self._cache_key(request)
+        cached = await get_analysis_cache().get(key) if key is not None else None
+        if cached is not None:
+            logger.info("CBT analysis served from cache", extra={"key_prefix": key[:12]})
+            for event in response_events(cached):
+                yield event
+            return
+
+        permit = get_circuit_breaker().allow()
+        if permit is None:
+            for event in response_events(self._short_circuit(request)):
+                yield event
+            return
+        # Streaming always detects, then reframes
+        async with self._model_call(request, 2, permit):
+            async for event in self.client.analyze_cbt_stream(request):
+                if event.event == "done" and key is not None:
+                    await get_analysis_cache().set(key, event.data)
+                yield event
+
+    @asynccontextmanager
+    async def _model_call(self, request: CBTAnalysisRequest, calls: int, permit: Permit):
+        """Admit an analysis the breaker allowed, and report its outcome and latency back to the breaker."""
+        breaker = get_circuit_breaker()
+        try:
+            await self._admit(request, calls)
+        except BaseException:
+            # The model was never called
+            breaker.release(permit)
+            raise
+        start = time.monotonic()
+        failed = False
+        try:
+            yield
+        except SafetyException:
+            # The model answered; the content was the problem
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # Cancellation, e.g. by the route timeout, only counts if it was slow
+            breaker.record(permit, time.monotonic() - start, failed)
+
+    def _short_circuit(self, request: CBTAnalysisRequest) -> CBTAnalysisResponse:
+        breaker = get_circuit_breaker()
+        if get_ai_config().ai_breaker_fallback == "fail":
+            raise CircuitOpen(breaker.retry_after())
+        metrics.incr("ai.circuit.degraded")
+        logger.warning("AI circuit open, serving a degraded analysis")
+        return heuristic_analysis(request)
+
+    def _model_calls(self) -> int:
+        return 1 if self.client.config.ai_analysis_strategy == "combined" else 2
+
+    async def _admit(self, request: CBTAnalysisRequest, calls: int) -> None:
+        """Reserve quota for an analysis's model calls; raises AdmissionRejected when there is none soon."""
+        config = get_ai_config()
+        prompt_tokens = (len(request.situation) + len(request.automatic_thought)) // 4
+        await get_admission_controller().admit(
+            current_user_id.get(), calls, calls * (config.ai_tokens_per_call + prompt_tokens)
+        )
+
+    async def _cache_key(self, request: CBTAnalysisRequest) -> Optional[str]:
+        """The analysis cache key, or None when the settings rule caching out."""
+        if not is_cacheable(self.client.config):
+            metrics.incr("cache.analysis.bypassed")
+            return None
+        return await self._analysis_key(request)
+
+    async def _analysis_key(self, request: CBTAnalysisRequest) -> str:
+        """Normalized input plus model and prompt fingerprint; equal keys mean interchangeable analyses."""
+        fingerprint = await self.client.analysis_fingerprint()
+        return analysis_key(request.situation, request.automatic_thought, fingerprint)
 
     async def analyze_mood(self, text: str) -> Optional[dict]:
         # Currently, we still use TextBlob for mood analysis as it's faster and sufficient.
         # We could implement a Gemini-based one here if needed.
-        tb_client = TextBlobClient()
-        return await tb_client.analyze_mood(text)
+        return await self.text_client.analyze_mood(text)
 
-def get_ai_client() -> AIClientProtocol:
+    async def analyze_moods(self, texts: List[Optional[str]]) -> List[Optional[dict]]:
+        return await self.text_client.analyze_moods(texts)
+
+    async def warm_up(self) -> None:
+        await asyncio.gather(self.client.warm_up(), self.text_client.warm_up())
+
+def create_ai_client() -> AIClientProtocol:
     """
-    Factory function to get the appropriate AI client.
+    Factory function to build the appropriate AI client.
 
     Returns:
         AIClientProtocol: The configured AI client
     """
     config = get_ai_config()
+    start = time.perf_counter()
 
     if config.enable_gemini and _gemini_available:
         logger.info("Using Gemini AI client")
-        return GeminiAdapter()
+        client = GeminiAdapter()
+    else:
+        logger.info("Using TextBlob AI client")
+        client = TextBlobClient()
+
+    metrics.set_gauge("ai.client.construct_ms", (time.perf_counter() - start) * 1000)
+    metrics.incr("ai.client.constructed")
+    return client
+
+_client: Optional[AIClientProtocol] = None
+
+def get_ai_client() -> AIClientProtocol:
+    """
+    The process-wide AI client. It is built once, normally by `init_ai_client`
+    at startup, and shared by every request so the SDK configuration, model
+    handle and its transport connections are reused.
+    """
+    global _client
+    if _client is None:
+        _client = create_ai_client()
+    return _client
+
+async def init_ai_client() -> Optional[AIClientProtocol]:
+    """
+    Build the shared client and warm it up. Failures are logged, not raised,
+    so the app starts regardless. A client that could not be built (e.g.
+    GEMINI_API_KEY is unset) is built again on first use; until then, only
+    analyses fail. Returns None in that case.
+    """
+    try:
+        client = get_ai_client()
+    except Exception as e:
+        logger.warning("AI client could not be built at startup", extra={"error": str(e)})
+        return None
+    start = time.perf_counter()
+    try:
+        await client.warm_up()
+    except Exception as e:
+        logger.warning("AI client warm-up failed", extra={"error": str(e)})
+        return client
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    metrics.set_gauge("ai.client.warm_up_ms", elapsed_ms)
+    logger.info("AI client warmed up", extra={"latency_ms": round(elapsed_ms, 1)})
+    return client
 
-    logger.info("Using TextBlob AI client")
-    return TextBlobClient()
+def reset_ai_client() -> None:
+    """Drop the shared client so the next `get_ai_client` builds a new one (e.g. after a config change)."""
+    global _client
+    _client = None
 
 # Legacy function for backward compatibility
 async def analyze_mood_note(text: str) -> dict:
     """Legacy function - use get_ai_client().analyze_mood() instead."""
     client = get_ai_client()
     return await client.analyze_mood(text)
+
+async def analyze_mood_notes(texts: List[Optional[str]]) -> List[Optional[dict]]:
+    """Batch counterpart of `analyze_mood_note`; empty notes yield None."""
+    client = get_ai_client()
+    return await client.analyze_moods(texts)
@@ -0,0 +1,228 @@
+# backend/app/services/ai_jobs.py
+"""
+Workers for asynchronous CBT analysis (`POST /cbt-logs/analyze?mode=async`).
+
+Queued analyses are rows in `ai_jobs`. Each process runs a pool of
+`AI_JOB_CONCURRENCY` workers that claim jobs with a lease, run them exactly
+as the synchronous endpoint would, and store the result or the error the
+endpoint would have returned. Because the queue lives in the database it
+survives restarts, and several uvicorn workers sharing one DB drain it
+together. A local enqueue wakes this process's workers at once; jobs queued
+by other processes are picked up within `AI_JOB_POLL_INTERVAL_SECONDS`.
+
+A job whose worker dies keeps its lease until `AI_JOB_LEASE_SECONDS` pass and
+is then claimed again, at most `AI_JOB_MAX_ATTEMPTS` times in total.
+"""
+
+import asyncio
+import os
+import socket
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from fastapi import status
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.db.session import get_async_pool
+from app.repositories.ai_jobs import (
+    FAILED,
+    SUCCEEDED,
+    claim_ai_job_async,
+    count_queued_ai_jobs_async,
+    delete_finished_ai_jobs_async,
+    finish_ai_job_async,
+    release_ai_job_async
+)
+from app.schemas.cbt import CBTAnalysisRequest, CBTAnalysisResponse
+from app.services.admission import AdmissionRejected, current_user_id
+from app.services.ai_client import get_ai_client
+from app.services.circuit_breaker import CircuitOpen
+from app.services.deadline import set_analysis_deadline
+from app.services.gemini_client import SafetyException
+
+logger = get_logger(__name__)
+
+AI_JOB_CONCURRENCY = int(os.getenv("AI_JOB_CONCURRENCY", "4"))
+AI_JOB_POLL_INTERVAL_SECONDS = float(os.getenv("AI_JOB_POLL_INTERVAL_SECONDS", "0.5"))
+AI_JOB_LEASE_SECONDS = float(os.getenv("AI_JOB_LEASE_SECONDS", "60"))
+AI_JOB_MAX_ATTEMPTS = int(os.getenv("AI_JOB_MAX_ATTEMPTS", "3"))
+AI_JOB_RETENTION_HOURS = float(os.getenv("AI_JOB_RETENTION_HOURS", "24"))
+
+ANALYZE_TIMEOUT_SECONDS = 10.0
+
+
+class AnalysisFailure(NamedTuple):
+    status_code: int
+    detail: Any
+    retry_after: Optional[int] = None
+
+
+def analysis_failure(e: Exception) -> AnalysisFailure:
+    """How a failed analysis is reported, synchronously or as a job."""
+    if isinstance(e, SafetyException):
+        # Fixed: avoid using 'message' in extra as it's reserved
+        logger.warning("Safety exception triggered", extra={"detail": e.message})
+        return AnalysisFailure(status.HTTP_451_UNAVAILABLE_FOR_LEGAL_REASONS, {
+            "message": e.message,
+            "trigger": "safety",
+            "crisis_resources": e.crisis_resources
+        })
+    if isinstance(e, AdmissionRejected):
+        return AnalysisFailure(
+            status.HTTP_429_TOO_MANY_REQUESTS,
+            f"Analysis is at capacity. Please retry in {e.retry_after} seconds.",
+            e.retry_after
+        )
+    if isinstance(e, CircuitOpen):
+        return AnalysisFailure(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            f"Analysis service unavailable. Please retry in {e.retry_after} seconds.",
+            e.retry_after
+        )
+    if isinstance(e, asyncio.TimeoutError):
+        logger.warning("AI analysis timed out")
+        return AnalysisFailure(status.HTTP_504_GATEWAY_TIMEOUT, "Analysis timed out. Please try again.")
+    logger.error("AI analysis failed", extra={"error": str(e)})
+    return AnalysisFailure(status.HTTP_503_SERVICE_UNAVAILABLE, "Analysis service unavailable")
+
+
+class AnalysisWorkers:
+    """A pool of queue workers on the running event loop."""
+
+    def __init__(self, concurrency: int = AI_JOB_CONCURRENCY):
+        self.concurrency = concurrency
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}
+
+    def start(self) -> None:
+        """Start the workers on the running loop unless they already run there."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._tasks = [loop.create_task(self._work(index)) for index in range(self.concurrency)]
+
+    def notify(self) -> None:
+        """Wake idle workers after a job was queued by this process."""
+        self.start()
+        self._wakeup.set()
+
+    async def wait(self, job_id: str, timeout: float) -> None:
+        """
+        Sleep until a worker here finishes `job_id`, or at most one poll
+        interval (the job may be running in another process), or `timeout`.
+        """
+        event = self._finished.setdefault(job_id, asyncio.Event())
+        self._waiters[job_id] = self._waiters.get(job_id, 0) + 1
+        try:
+            await asyncio.wait_for(event.wait(), min(timeout, AI_JOB_POLL_INTERVAL_SECONDS))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            # Polls of the same job share the event; the last one out drops it
+            self._waiters[job_id] -= 1
+            if not self._waiters[job_id]:
+                del self._waiters[job_id]
+                self._finished.pop(job_id, None)
+
+    async def shutdown(self) -> None:
+        """Stop the workers. A job cut short keeps its lease and is run again once it expires."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "workers": sum(1 for task in self._tasks if not task.done()),
+            "wait_ms": metrics.histogram("ai_jobs.wait_ms").snapshot(),
+            "run_ms": metrics.histogram("ai_jobs.run_ms").snapshot(),
+        }
+
+    async def _work(self, index: int) -> None:
+        if index == 0:
+            async with get_async_pool().connection() as db:
+                await self._prune(db)
+        while True:
+            try:
+                async with get_async_pool().connection() as db:
+                    job = await claim_ai_job_async(
+                        db, self.owner, int(AI_JOB_LEASE_SECONDS * 1000), AI_JOB_MAX_ATTEMPTS
+                    )
+                    metrics.set_gauge("ai_jobs.queue_depth", await count_queued_ai_jobs_async(db))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("AI job claim failed", extra={"error": str(e)})
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), AI_JOB_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            try:
+                await self._run(job)
+            except (AdmissionRejected, CircuitOpen) as e:
+                # No quota, or no healthy service, now; the queue is the place to wait, so put the job back
+                async with get_async_pool().connection() as db:
+                    await release_ai_job_async(db, job)
+                metrics.incr("ai_jobs.deferred")
+                await asyncio.sleep(e.retry_after)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The job keeps its lease and is retried once that expires
+                logger.error("AI job could not be recorded", extra={"job_id": job["id"], "error": str(e)})
+
+    async def _run(self, job: dict) -> None:
+        metrics.observe("ai_jobs.wait_ms", job["started_at"] - job["created_at"])
+        if job["attempts"] > 1:
+            metrics.incr("ai_jobs.reclaimed")
+        current_user_id.set(job["user_id"])
+        set_analysis_deadline(ANALYZE_TIMEOUT_SECONDS)
+        start = time.perf_counter()
+        try:
+            request = CBTAnalysisRequest.model_validate(job["request"])
+            result = await asyncio.wait_for(
+                get_ai_client().analyze_cbt(request),
+                timeout=ANALYZE_TIMEOUT_SECONDS
+            )
+            outcome = {"status": SUCCEEDED, "result": CBTAnalysisResponse.model_validate(result).model_dump()}
+        except (asyncio.CancelledError, AdmissionRejected, CircuitOpen):
+            raise
+        except Exception as e:
+            outcome = {"status": FAILED, "error": analysis_failure(e)._asdict()}
+
+        metrics.observe("ai_jobs.run_ms", (time.perf_counter() - start) * 1000)
+        metrics.incr(f"ai_jobs.{outcome['status']}")
+        async with get_async_pool().connection() as db:
+            if not await finish_ai_job_async(db, job, **outcome):
+                logger.warning("AI job lease lost before it finished", extra={"job_id": job["id"]})
+        event = self._finished.pop(job["id"], None)
+        if event is not None:
+            event.set()
+
+    async def _prune(self, db) -> None:
+        cutoff = int((time.time() - AI_JOB_RETENTION_HOURS * 3600) * 1000)
+        deleted = await delete_finished_ai_jobs_async(db, cutoff)
+        if deleted:
+            logger.info("Pruned finished AI jobs", extra={"count": deleted})
+
+
+_workers: Optional[AnalysisWorkers] = None
+
+
+def get_analysis_workers() -> AnalysisWorkers:
+    global _workers
+    if _workers is None:
+        _workers = AnalysisWorkers()
+        metrics.register_collector("ai_jobs", _workers.stats)
+    return _workers
@@ -0,0 +1,168 @@
+# backend/app/services/analysis_cache.py
+"""
+Content-addressed cache for CBT analysis results.
+
+Keys are a SHA-256 over the normalized situation and automatic thought plus
+a fingerprint of everything else that shapes the output: model, temperature,
+strategy and prompt templates. Re-running the same analysis, whether after
+an edit that changes nothing, a retry or a double click, therefore costs no
+model calls, and changing a prompt or model retires old entries naturally.
+
+There are two tiers: an in-memory LRU per process, and the `analysis_cache`
+table shared by every worker, which is kept under a TTL and a byte budget
+(least recently hit entries go first). Per ADR-003, neither the key nor the
+cached response is ever logged; log lines carry only a short key prefix.
+Cache failures are treated as misses and never fail an analysis.
+"""
+
+import hashlib
+import json
+import time
+import unicodedata
+from typing import Optional, Tuple
+from app.core.ai_config import AIConfig, get_ai_config
+from app.core.cache import LRUCache
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.db.session import execute_write_async, get_async_pool
+from app.db.writer import Statement
+from app.schemas.cbt import CBTAnalysisResponse
+
+logger = get_logger(__name__)
+
+# Run eviction after this many stores rather than on every one
+EVICT_EVERY = 64
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace so trivial edits map to the same key."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def analysis_key(situation: str, automatic_thought: str, fingerprint: str) -> str:
+    payload = json.dumps([normalize_text(situation), normalize_text(automatic_thought), fingerprint])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _now() -> int:
+    return int(time.time())
+
+
+class AnalysisCache:
+    """Two-tier (memory, SQLite) cache of `CBTAnalysisResponse` by content key."""
+
+    def __init__(self, ttl_seconds: int, max_bytes: int, memory_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        # Values are (expires_at, response)
+        self.memory = LRUCache(memory_entries, name="cache.analysis")
+        self._stores = 0
+
+    async def get(self, key: str) -> Optional[CBTAnalysisResponse]:
+        now = _now()
+        entry: Optional[Tuple[int, CBTAnalysisResponse]] = self.memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                return entry[1]
+            self.memory.invalidate(lambda k: k == key)
+
+        try:
+            async with get_async_pool().connection() as db:
+                async with db.execute(
+                    "SELECT response, expires_at FROM analysis_cache WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ) as cursor:
+                    row = await cursor.fetchone()
+                if row is None:
+                    metrics.incr("cache.analysis.db.misses")
+                    return None
+                await execute_write_async(db, [Statement(
+                    "UPDATE analysis_cache SET last_hit_at = ? WHERE key = ?", (now, key)
+                )])
+            response = CBTAnalysisResponse.model_validate(json.loads(row["response"]))
+        except Exception as e:
+            # Includes pool checkout timeouts and entries that no longer decode
+            logger.warning("Analysis cache read failed", extra={"key_prefix": key[:12], "error": str(e)})
+            metrics.incr("cache.analysis.errors")
+            return None
+
+        metrics.incr("cache.analysis.db.hits")
+        self.memory.set(key, (row["expires_at"], response))
+        return response
+
+    async def set(self, key: str, response: CBTAnalysisResponse) -> None:
+        now = _now()
+        expires_at = now + self.ttl_seconds
+        self.memory.set(key, (expires_at, response))
+        body = response.model_dump_json()
+        try:
+            async with get_async_pool().connection() as db:
+                await execute_write_async(db, [Statement(
+                    """
+                    INSERT OR REPLACE INTO analysis_cache
+                        (key, response, prompt_version, size_bytes, created_at, expires_at, last_hit_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (key, body, response.prompt_version, len(body.encode("utf-8")), now, expires_at, now)
+                )])
+                self._stores += 1
+                if self._stores % EVICT_EVERY == 0:
+                    await self.evict(db)
+        except Exception as e:
+            logger.warning("Analysis cache write failed", extra={"key_prefix": key[:12], "error": str(e)})
+            metrics.incr("cache.analysis.errors")
+
+    async def evict(self, db) -> int:
+        """Drop expired entries, then the least recently hit ones beyond `max_bytes`."""
+        expired, over_budget = await execute_write_async(db, [
+            Statement("DELETE FROM analysis_cache WHERE expires_at <= ?", (_now(),)),
+            Statement(
+                """
+                DELETE FROM analysis_cache WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size_bytes) OVER (ORDER BY last_hit_at DESC, key) AS running
+                        FROM analysis_cache
+                    ) WHERE running > ?
+                )
+                """,
+                (self.max_bytes,)
+            ),
+        ])
+        if expired or over_budget:
+            metrics.incr("cache.analysis.db.evictions", expired + over_budget)
+            logger.info("Analysis cache evicted", extra={"expired": expired, "over_budget": over_budget})
+        return expired + over_budget
+
+    def clear(self) -> None:
+        self.memory.clear()
+
+    def stats(self) -> dict:
+        db_hits = metrics.counter("cache.analysis.db.hits")
+        db_misses = metrics.counter("cache.analysis.db.misses")
+        return {
+            "memory": self.memory.stats(),
+            "db_hits": db_hits,
+            "db_misses": db_misses,
+            "db_evictions": metrics.counter("cache.analysis.db.evictions"),
+            "bypassed": metrics.counter("cache.analysis.bypassed"),
+            "errors": metrics.counter("cache.analysis.errors"),
+            "ttl_seconds": self.ttl_seconds,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def is_cacheable(config: AIConfig) -> bool:
+    """Caching only makes sense when the settings ask for reproducible output."""
+    return config.ai_cache_enabled and config.gemini_temperature <= config.ai_cache_max_temperature
+
+
+_cache: Optional[AnalysisCache] = None
+
+
+def get_analysis_cache() -> AnalysisCache:
+    global _cache
+    if _cache is None:
+        config = get_ai_config()
+        _cache = AnalysisCache(config.ai_cache_ttl_seconds, config.ai_cache_max_bytes, config.ai_cache_memory_entries)
+        metrics.register_collector("analysis_cache", _cache.stats)
+    return _cache
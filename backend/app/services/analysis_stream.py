@@ -0,0 +1,85 @@
+# backend/app/services/analysis_stream.py
+"""
+Streaming CBT analysis as Server-Sent Events.
+
+An analysis is streamed as a sequence of `AnalysisEvent`s:
+
+- `distortions`: `{"suggestions": [...], "promptVersion": ...}`, once detection returns
+- `reframe`: one `RationalReframe`, as soon as the model has produced it
+- `done`: the complete `CBTAnalysisResponse`, the same body the synchronous
+  endpoint returns
+- `error`: `{"statusCode", "detail"}` as the synchronous endpoint would have
+  responded, e.g. 451 with crisis resources; always the last event
+
+`ReframeStreamParser` pulls finished reframes out of the model's JSON while
+the rest of it is still being generated.
+"""
+
+import json
+import re
+from typing import Any, Iterator, List, NamedTuple, Optional
+from pydantic import TypeAdapter
+from app.schemas.cbt import CBTAnalysisResponse
+
+_JSON = TypeAdapter(Any)
+_SEPARATOR = re.compile(r"[\s,]*")
+
+
+class AnalysisEvent(NamedTuple):
+    event: str
+    data: Any
+
+
+def distortions_event(response: CBTAnalysisResponse) -> AnalysisEvent:
+    return AnalysisEvent("distortions", {"suggestions": response.suggestions, "promptVersion": response.prompt_version})
+
+
+def response_events(response: CBTAnalysisResponse) -> Iterator[AnalysisEvent]:
+    """The events for an analysis that is already complete."""
+    yield distortions_event(response)
+    for reframe in response.reframes:
+        yield AnalysisEvent("reframe", reframe)
+    yield AnalysisEvent("done", response)
+
+
+def sse_message(event: AnalysisEvent) -> bytes:
+    data = _JSON.dump_json(event.data, by_alias=True).decode("utf-8")
+    return f"event: {event.event}\ndata: {data}\n\n".encode("utf-8")
+
+
+class ReframeStreamParser:
+    """
+    Incrementally extract the objects of a top-level JSON array (`"reframes"`
+    by default) from a document that arrives in pieces. Each object is
+    returned by `feed` once its closing brace has arrived.
+    """
+
+    def __init__(self, key: str = "reframes"):
+        self.text = ""
+        self._start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+        self._decoder = json.JSONDecoder()
+        self._position: Optional[int] = None
+        self._closed = False
+
+    def feed(self, chunk: str) -> List[dict]:
+        self.text += chunk
+        items: List[dict] = []
+        if self._position is None:
+            match = self._start.search(self.text)
+            if match is None:
+                return items
+            self._position = match.end()
+        while not self._closed:
+            position = _SEPARATOR.match(self.text, self._position).end()
+            if position >= len(self.text):
+                break
+            if self.text[position] == "]":
+                self._closed = True
+                break
+            try:
+                item, self._position = self._decoder.raw_decode(self.text, position)
+            except json.JSONDecodeError:
+                # The object is still incomplete
+                break
+            items.append(item)
+        return items
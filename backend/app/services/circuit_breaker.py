@@ -0,0 +1,171 @@
+# backend/app/services/circuit_breaker.py
+"""
+Circuit breaker for the AI layer.
+
+Outcomes of model-backed analyses over the last `window_seconds` are kept.
+A call counts as bad if it failed, or if it took longer than
+`slow_call_seconds`; calls cut off by the route timeout fall into the second
+group. Once at least `min_calls` were seen and the share of bad ones reaches
+`failure_rate`, the breaker opens. While open, analyses skip the model
+entirely, so a struggling provider costs milliseconds instead of a timeout.
+
+After `open_seconds` the breaker half-opens and lets one probe call
+through. A good probe closes the breaker; a bad one opens it again.
+"""
+
+import math
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+from app.core.ai_config import get_ai_config
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling the model while the breaker is open."""
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"AI circuit open, retry after {retry_after}s")
+
+
+class Permit:
+    """Handed out by `CircuitBreaker.allow`; the call's outcome is reported with it."""
+    __slots__ = ("probe",)
+
+    def __init__(self, probe: bool):
+        self.probe = probe
+
+
+class CircuitBreaker:
+    """Rolling-window error and latency breaker with a single half-open probe."""
+
+    def __init__(
+        self,
+        window_seconds: float,
+        min_calls: int,
+        failure_rate: float,
+        slow_call_seconds: float,
+        open_seconds: float
+    ):
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        # (finished at, bad)
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        # The half-open probe in flight, if any
+        self._probe: Optional[Permit] = None
+
+    def allow(self) -> Optional[Permit]:
+        """
+        A permit to call the model now, or None while the breaker is open. In
+        half-open, the one permit handed out is the probe.
+        """
+        if self.state == CLOSED:
+            return Permit(probe=False)
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN and self._probe is None:
+            self._probe = Permit(probe=True)
+            return self._probe
+        metrics.incr("ai.circuit.short_circuited")
+        return None
+
+    def record(self, permit: Permit, elapsed_seconds: float, failed: bool) -> None:
+        """Record the outcome of a call made with `permit`."""
+        bad = failed or elapsed_seconds >= self.slow_call_seconds
+        if permit.probe:
+            if permit is not self._probe:
+                # A probe from an earlier half-open period
+                return
+            self._probe = None
+            if bad:
+                self._open()
+            else:
+                self._outcomes.clear()
+                self._set_state(CLOSED)
+            return
+        if self.state != CLOSED:
+            # Admitted before the breaker opened; the probe decides now
+            return
+
+        now = time.monotonic()
+        self._outcomes.append((now, bad))
+        self._prune(now)
+        if len(self._outcomes) >= self.min_calls and self._bad_rate() >= self.failure_rate:
+            self._open()
+
+    def release(self, permit: Permit) -> None:
+        """A permitted call ended without reaching the model; another call may probe."""
+        if permit is self._probe:
+            self._probe = None
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.open_seconds - (time.monotonic() - self._opened_at)))
+
+    def stats(self) -> dict:
+        self._prune(time.monotonic())
+        return {
+            "state": self.state,
+            "calls": len(self._outcomes),
+            "bad_rate": round(self._bad_rate(), 3),
+            "opened": metrics.counter("ai.circuit.opened"),
+            "short_circuited": metrics.counter("ai.circuit.short_circuited"),
+            "degraded": metrics.counter("ai.circuit.degraded"),
+        }
+
+    def _bad_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, bad in self._outcomes if bad) / len(self._outcomes)
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        metrics.incr("ai.circuit.opened")
+        self._set_state(OPEN)
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.warning("AI circuit state changed", extra={"from_state": self.state, "to_state": state})
+            self.state = state
+
+
+_breaker: Optional[CircuitBreaker] = None
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        config = get_ai_config()
+        _breaker = CircuitBreaker(
+            config.ai_breaker_window_seconds,
+            config.ai_breaker_min_calls,
+            config.ai_breaker_failure_rate,
+            config.ai_breaker_slow_call_seconds,
+            config.ai_breaker_open_seconds
+        )
+        metrics.register_collector("ai_circuit", _breaker.stats)
+    return _breaker
+
+
+def circuit_state() -> str:
+    """
+    The breaker's state, or "unavailable" if none was built (no Gemini
+    client). Never builds one, so it is safe for health checks without AI
+    configuration.
+    """
+    return _breaker.state if _breaker is not None else "unavailable"
@@ -0,0 +1,127 @@
+# backend/app/services/columnar.py
+"""
+Columnar exports: Arrow IPC stream and Parquet, one table per file.
+
+Each columnar export holds a single table, either `moods` or `cbt_logs`.
+Columns are typed: `timestamp` is a UTC millisecond timestamp, ratings are
+small integers, and list fields stay lists, so analytics tools load the file
+without any parsing. Row chunks are converted to record batches as they
+arrive, and the encoded bytes are yielded as soon as the writer produces
+them. Parquet buffers up to `PARQUET_ROW_GROUP_ROWS` rows per row group.
+
+pyarrow is an optional dependency (`pip install '.[columnar]'`). Without it
+`COLUMNAR_AVAILABLE` is False and the formats are not offered.
+"""
+
+from typing import AsyncIterator, Callable, Dict, List
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    COLUMNAR_AVAILABLE = True
+except ImportError:
+    COLUMNAR_AVAILABLE = False
+    logger.info("pyarrow not installed, columnar exports disabled")
+
+COLUMNAR_TABLES = ("moods", "cbt_logs")
+PARQUET_ROW_GROUP_ROWS = 64 * 1024
+COMPRESSION = "zstd"
+
+Chunks = AsyncIterator[List[dict]]
+
+
+def table_schema(table: str) -> "pa.Schema":
+    timestamp = pa.timestamp("ms", tz="UTC")
+    if table == "moods":
+        return pa.schema([
+            ("id", pa.string()),
+            ("user_id", pa.string()),
+            ("timestamp", timestamp),
+            ("rating", pa.int8()),
+            ("emotions", pa.list_(pa.string())),
+            ("note", pa.string()),
+            ("trigger", pa.string()),
+            ("behavior", pa.string()),
+            ("ai_analysis", pa.struct([
+                ("sentiment_score", pa.float64()),
+                ("subjectivity", pa.float64()),
+                ("keywords", pa.list_(pa.string())),
+            ])),
+        ])
+    return pa.schema([
+        ("id", pa.string()),
+        ("user_id", pa.string()),
+        ("timestamp", timestamp),
+        ("situation", pa.string()),
+        ("automatic_thoughts", pa.string()),
+        ("distortions", pa.list_(pa.string())),
+        ("rational_response", pa.string()),
+        ("mood_before", pa.int8()),
+        ("mood_after", pa.int8()),
+        ("behavioral_link", pa.string()),
+    ])
+
+
+class _Sink:
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    closed = False
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+async def render_arrow(table: str, chunks: Chunks) -> AsyncIterator[bytes]:
+    schema = table_schema(table)
+    sink = _Sink()
+    options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+    with pa.ipc.new_stream(pa.PythonFile(sink, mode="w"), schema, options=options) as writer:
+        async for chunk in chunks:
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+async def render_parquet(table: str, chunks: Chunks) -> AsyncIterator[bytes]:
+    schema = table_schema(table)
+    sink = _Sink()
+    pending: List[dict] = []
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression=COMPRESSION) as writer:
+        async for chunk in chunks:
+            pending.extend(chunk)
+            if len(pending) >= PARQUET_ROW_GROUP_ROWS:
+                writer.write_table(pa.Table.from_pylist(pending, schema=schema))
+                pending = []
+                yield sink.drain()
+        if pending:
+            writer.write_table(pa.Table.from_pylist(pending, schema=schema))
+    yield sink.drain()
+
+
+COLUMNAR_RENDERERS: Dict[str, Callable[[str, Chunks], AsyncIterator[bytes]]] = {
+    "arrow": render_arrow,
+    "parquet": render_parquet,
+}
@@ -0,0 +1,282 @@
+# backend/app/services/data_jobs.py
+"""
+Background runner for export and import jobs.
+
+Jobs are rows in `data_jobs`; the runner executes them as tasks on the event
+loop, at most `DATA_JOB_CONCURRENCY` at a time, so large archives never tie
+up a request. Exports are rendered by `app.services.exporter` into an
+artifact under `DATA_JOBS_DIR`, gzipped for the text formats; imports replay
+an upload that was spooled to the same directory. Both only take a pooled
+connection for the statements they run.
+
+A runner leases each job before running it and renews the lease while it
+works (see `app.repositories.data_jobs`), so with several processes a job runs
+in one of them only. `resume()` picks up queued jobs and those whose lease
+expired because their runner died, and from then on repeats that, together
+with deleting expired jobs and their files, every
+`DATA_JOB_MAINTENANCE_INTERVAL_SECONDS`. Re-running is safe: an export
+renders into a file of its own attempt and moves it into place atomically,
+and an import skips ids it already inserted.
+"""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import AsyncIterator, Dict, Optional, Set
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.db.session import get_async_pool
+from app.repositories.data_jobs import (
+    EXPORT,
+    FAILED,
+    SUCCEEDED,
+    claim_job_async,
+    delete_jobs_async,
+    finish_job_async,
+    get_expired_jobs_async,
+    get_runnable_job_ids_async,
+    renew_job_lease_async,
+    update_job_async
+)
+from app.services.exporter import EXPORT_FORMATS, export_filename, export_media_type, open_export, render_export
+from app.services.importer import IMPORT_BATCH_SIZE, PARSERS, ImportProgress, import_records
+
+logger = get_logger(__name__)
+
+DATA_JOBS_DIR = os.getenv("DATA_JOBS_DIR", "data/jobs")
+DATA_JOB_CONCURRENCY = int(os.getenv("DATA_JOB_CONCURRENCY", "2"))
+DATA_JOB_RETENTION_HOURS = float(os.getenv("DATA_JOB_RETENTION_HOURS", "24"))
+DATA_JOB_LEASE_SECONDS = float(os.getenv("DATA_JOB_LEASE_SECONDS", "60"))
+DATA_JOB_MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("DATA_JOB_MAINTENANCE_INTERVAL_SECONDS", "300"))
+
+FILE_CHUNK_BYTES = 64 * 1024
+
+
+def _artifact_compression(job: dict) -> Optional[str]:
+    # Columnar formats compress internally; text artifacts are gzipped
+    return None if EXPORT_FORMATS[job["format"]].columnar else "gzip"
+
+
+def export_artifact_name(job: dict) -> str:
+    return export_filename(job["format"], job["params"].get("table"), _artifact_compression(job))
+
+
+def export_artifact_media_type(job: dict) -> str:
+    return export_media_type(job["format"], _artifact_compression(job))
+
+
+def job_file_path(job_id: str, suffix: str) -> str:
+    return os.path.join(DATA_JOBS_DIR, f"{job_id}.{suffix}")
+
+
+async def spool_upload(chunks: AsyncIterator[bytes], path: str) -> int:
+    """Write an uploaded body to `path` chunk by chunk; returns its size."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    size = 0
+    with open(path, "wb") as f:
+        async for chunk in chunks:
+            await asyncio.to_thread(f.write, chunk)
+            size += len(chunk)
+    return size
+
+
+async def _read_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := await asyncio.to_thread(f.read, FILE_CHUNK_BYTES):
+            yield chunk
+
+
+class JobRunner:
+    """Schedules queued jobs onto the running event loop with bounded concurrency."""
+
+    def __init__(self, concurrency: int = DATA_JOB_CONCURRENCY):
+        self.concurrency = concurrency
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._maintenance: Optional[asyncio.Task] = None
+
+    def submit(self, job_id: str) -> None:
+        """Start `job_id` in the background unless it is already running here."""
+        if job_id in self._tasks:
+            return
+        loop = self._bind()
+        task = loop.create_task(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def resume(self) -> None:
+        """Prune expired jobs and start runnable ones, now and then periodically."""
+        await self._maintain()
+        loop = self._bind()
+        if self._maintenance is None or self._maintenance.done():
+            self._maintenance = loop.create_task(self._maintain_periodically())
+
+    async def join(self) -> None:
+        """Wait for every job currently scheduled in this process."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        """
+        Cancel in-flight jobs; they stay `running` in the database until their
+        lease expires, then the next runner to look picks them up again.
+        """
+        tasks: Set[asyncio.Task] = set(self._tasks.values())
+        if self._maintenance is not None:
+            tasks.add(self._maintenance)
+            self._maintenance = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "active": len(self._tasks),
+            "duration_ms": metrics.histogram("data_jobs.duration_ms").snapshot(),
+        }
+
+    def _bind(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Bind the concurrency limit to the loop the jobs actually run on
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._maintenance = None
+        return loop
+
+    async def _maintain(self) -> None:
+        async with get_async_pool().connection() as db:
+            await self._prune(db)
+            job_ids = [job_id for job_id in await get_runnable_job_ids_async(db) if job_id not in self._tasks]
+        for job_id in job_ids:
+            self.submit(job_id)
+        if job_ids:
+            logger.info("Resumed data jobs", extra={"count": len(job_ids)})
+
+    async def _maintain_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(DATA_JOB_MAINTENANCE_INTERVAL_SECONDS)
+            try:
+                await self._maintain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Data job maintenance failed", extra={"error": str(e)})
+
+    async def _run(self, job_id: str) -> None:
+        async with self._semaphore:
+            async with get_async_pool().connection() as db:
+                job = await claim_job_async(db, job_id, self.owner, int(DATA_JOB_LEASE_SECONDS * 1000))
+            if job is None:
+                # Finished, or being run by another runner
+                return
+
+            heartbeat = asyncio.create_task(self._heartbeat(job, asyncio.current_task()))
+            start = time.perf_counter()
+            try:
+                if job["kind"] == EXPORT:
+                    fields = await self._export(job)
+                else:
+                    fields = await self._import(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Data job failed", extra={"job_id": job_id, "error": str(e)})
+                metrics.incr(f"data_jobs.{job['kind']}.failed")
+                async with get_async_pool().connection() as db:
+                    await finish_job_async(db, job, FAILED, error=str(e))
+                return
+            finally:
+                heartbeat.cancel()
+
+            metrics.observe("data_jobs.duration_ms", (time.perf_counter() - start) * 1000)
+            metrics.incr(f"data_jobs.{job['kind']}.succeeded")
+            async with get_async_pool().connection() as db:
+                if not await finish_job_async(db, job, SUCCEEDED, **fields):
+                    logger.warning("Data job lease lost before finishing", extra={"job_id": job_id})
+                    return
+            logger.info("Data job finished", extra={"job_id": job_id, "kind": job["kind"]})
+
+    async def _heartbeat(self, job: dict, runner: asyncio.Task) -> None:
+        """Renew the lease while `runner` works on `job`; cancel it if the lease was lost."""
+        lease_ms = int(DATA_JOB_LEASE_SECONDS * 1000)
+        while True:
+            await asyncio.sleep(DATA_JOB_LEASE_SECONDS / 3)
+            try:
+                async with get_async_pool().connection() as db:
+                    renewed = await renew_job_lease_async(db, job, lease_ms)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The lease outlives a few missed renewals
+                logger.error("Data job lease renewal failed", extra={"job_id": job["id"], "error": str(e)})
+                continue
+            if not renewed:
+                logger.warning("Data job lease lost", extra={"job_id": job["id"]})
+                metrics.incr("data_jobs.lease_lost")
+                runner.cancel()
+                return
+
+    async def _export(self, job: dict) -> dict:
+        path = job_file_path(job["id"], export_artifact_name(job).split(".", 1)[1])
+        # Each attempt renders into its own file, so a stale runner never writes into another's
+        partial = f"{path}.{uuid.uuid4().hex}.partial"
+        os.makedirs(DATA_JOBS_DIR, exist_ok=True)
+        params = job["params"]
+        async with get_async_pool().connection() as db:
+            manifest, moods, cbt_logs = await open_export(
+                db, job["user_id"], job["format"], params.get("since"), params.get("until"), params.get("cursor")
+            )
+        chunks = render_export(job["format"], moods, cbt_logs, params.get("table"), _artifact_compression(job), manifest)
+        try:
+            with open(partial, "wb") as f:
+                async for piece in chunks:
+                    await asyncio.to_thread(f.write, piece)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return {"file_path": path, "size_bytes": os.path.getsize(path), "progress": manifest}
+
+    async def _import(self, job: dict) -> dict:
+        params = job["params"]
+        progress = ImportProgress()
+
+        async def report(progress: ImportProgress) -> None:
+            async with get_async_pool().connection() as db:
+                await update_job_async(db, job["id"], progress=progress.summary())
+
+        await import_records(
+            get_async_pool().connection,
+            job["user_id"],
+            PARSERS[job["format"]](_read_file(job["file_path"])),
+            params.get("batch_size") or IMPORT_BATCH_SIZE,
+            progress,
+            on_batch=report
+        )
+        # The upload is kept until the job expires so a failed job can be inspected
+        return {"progress": progress.summary()}
+
+    async def _prune(self, db) -> None:
+        cutoff = int((time.time() - DATA_JOB_RETENTION_HOURS * 3600) * 1000)
+        expired = await get_expired_jobs_async(db, cutoff)
+        for job in expired:
+            if job["file_path"] and os.path.exists(job["file_path"]):
+                os.remove(job["file_path"])
+        await delete_jobs_async(db, [job["id"] for job in expired])
+
+
+_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    global _runner
+    if _runner is None:
+        _runner = JobRunner()
+        metrics.register_collector("data_jobs", _runner.stats)
+    return _runner
@@ -0,0 +1,31 @@
+# backend/app/services/deadline.py
+"""
+Request deadlines for AI analyses.
+
+The analyze routes and the job workers set `analysis_deadline` to the
+`time.monotonic()` by which the analysis must be done; it then flows with the
+context into `GeminiClient`. There every model call's timeout is cut to the
+time left, and a retry is only started when its backoff plus a typical call
+still fit, so retries no longer run into the route's hard timeout halfway.
+Without a deadline (e.g. in scripts) only `ai_timeout` applies.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+# Monotonic time by which the current analysis must finish, if any
+analysis_deadline: ContextVar[Optional[float]] = ContextVar("analysis_deadline", default=None)
+
+
+def set_analysis_deadline(seconds: float) -> float:
+    """Give the current analysis `seconds` from now; returns the deadline."""
+    deadline = time.monotonic() + seconds
+    analysis_deadline.set(deadline)
+    return deadline
+
+
+def remaining_seconds() -> Optional[float]:
+    """Time left before the deadline (negative once passed), or None without one."""
+    deadline = analysis_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
@@ -0,0 +1,273 @@
+# backend/app/services/exporter.py
+"""
+Incremental renderers for data exports.
+
+Each renderer consumes mood entries and CBT logs as async iterators of row
+chunks and yields the export text piece by piece, so an export of any size
+can be streamed to the client (or written to a file) with memory bounded by
+one chunk. The output is identical to rendering the full lists at once.
+
+Every export is described by a manifest: the bounds it was taken with, the
+change-log high-water mark, row counts and, for incremental exports, the ids
+deleted since the previous one. Passing a manifest's `highWaterMark` back as
+`cursor` exports only what changed after it, so backups can be chained. The
+JSON format embeds the manifest as a trailing `manifest` key.
+
+The text formats can be gzip-compressed on the fly. The columnar formats
+(`app.services.columnar`, when pyarrow is installed) hold one table per file
+and compress internally, so gzip is not offered for them.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+import aiosqlite
+from app.repositories.cbt import iter_cbt_logs_async
+from app.repositories.changes import CBT, MOOD, get_current_seq_async, get_deleted_between_async
+from app.repositories.mood import iter_mood_entries_async
+from app.services.columnar import COLUMNAR_AVAILABLE, COLUMNAR_RENDERERS
+
+Chunks = AsyncIterator[List[dict]]
+
+
+class ExportFormat(NamedTuple):
+    media_type: str
+    extension: str
+    columnar: bool = False
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    "json": ExportFormat("application/json", "json"),
+    "csv": ExportFormat("text/csv", "csv"),
+    "md": ExportFormat("text/markdown", "md"),
+}
+
+if COLUMNAR_AVAILABLE:
+    EXPORT_FORMATS.update({
+        "arrow": ExportFormat("application/vnd.apache.arrow.stream", "arrows", columnar=True),
+        "parquet": ExportFormat("application/vnd.apache.parquet", "parquet", columnar=True),
+    })
+
+COMPRESSIONS = {"gzip": ("application/gzip", "gz")}
+
+
+def export_filename(format: str, table: Optional[str] = None, compression: Optional[str] = None) -> str:
+    name = f"mindfultrack_{table}" if EXPORT_FORMATS[format].columnar else "mindfultrack_export"
+    name += f".{EXPORT_FORMATS[format].extension}"
+    if compression:
+        name += f".{COMPRESSIONS[compression][1]}"
+    return name
+
+
+def export_media_type(format: str, compression: Optional[str] = None) -> str:
+    return COMPRESSIONS[compression][0] if compression else EXPORT_FORMATS[format].media_type
+
+
+# --- Manifest ---
+
+def new_manifest(
+    format: str,
+    high_water_mark: int,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    cursor: Optional[int] = None,
+    deleted: Optional[Dict[str, List[str]]] = None
+) -> dict:
+    deleted = deleted or {}
+    return {
+        "format": format,
+        "since": since,
+        "until": until,
+        "cursor": cursor,
+        "highWaterMark": high_water_mark,
+        "counts": {"moodEntries": 0, "cbtLogs": 0},
+        "deleted": {"moodEntries": deleted.get(MOOD, []), "cbtLogs": deleted.get(CBT, [])},
+    }
+
+
+async def open_export(
+    db: aiosqlite.Connection,
+    user_id: str,
+    format: str,
+    since: Optional[int] = None,
+    until: Optional[int] = None,
+    cursor: Optional[int] = None
+) -> Tuple[dict, Chunks, Chunks]:
+    """
+    Fix the high-water mark for an export and return its manifest with the
+    mood and CBT row streams it covers. With a `cursor` only rows upserted in
+    `(cursor, highWaterMark]` are exported, and rows deleted in that range are
+    listed in the manifest. `since`/`until` bound the entry timestamp.
+    """
+    high_water_mark = await get_current_seq_async(db, user_id)
+    changes, deleted = None, None
+    if cursor is not None:
+        changes = (cursor, high_water_mark)
+        deleted = await get_deleted_between_async(db, user_id, cursor, high_water_mark)
+    manifest = new_manifest(format, high_water_mark, since, until, cursor, deleted)
+    moods = iter_mood_entries_async(user_id, since=since, until=until, changes=changes)
+    cbt_logs = iter_cbt_logs_async(user_id, since=since, until=until, changes=changes)
+    return manifest, moods, cbt_logs
+
+
+async def _counted(chunks: Chunks, counts: Dict[str, int], key: str) -> Chunks:
+    async for chunk in chunks:
+        counts[key] += len(chunk)
+        yield chunk
+
+
+# --- JSON ---
+
+async def _json_array(key: str, chunks: Chunks) -> AsyncIterator[str]:
+    # Reproduces json.dumps(..., indent=2) for a list nested one level deep
+    yield f'  "{key}": ['
+    empty = True
+    async for chunk in chunks:
+        parts = []
+        for row in chunk:
+            parts.append(("\n    " if empty else ",\n    ") + json.dumps(row, indent=2).replace("\n", "\n    "))
+            empty = False
+        yield "".join(parts)
+    yield "]" if empty else "\n  ]"
+
+
+async def render_json(moods: Chunks, cbt_logs: Chunks, manifest: Optional[dict] = None) -> AsyncIterator[str]:
+    yield "{\n"
+    async for piece in _json_array("moodEntries", moods):
+        yield piece
+    yield ",\n"
+    async for piece in _json_array("cbtLogs", cbt_logs):
+        yield piece
+    if manifest is not None:
+        # Last, so the counts are final
+        yield ',\n  "manifest": ' + json.dumps(manifest, indent=2).replace("\n", "\n  ")
+    yield "\n}"
+
+
+# --- CSV ---
+
+def _csv_rows(rows: List[list]) -> str:
+    output = io.StringIO()
+    csv.writer(output).writerows(rows)
+    return output.getvalue()
+
+
+async def render_csv(moods: Chunks, cbt_logs: Chunks, manifest: Optional[dict] = None) -> AsyncIterator[str]:
+    yield _csv_rows([
+        ["--- MOOD ENTRIES ---"],
+        ["ID", "Timestamp", "Rating", "Emotions", "Note", "Trigger", "Behavior"],
+    ])
+    async for chunk in moods:
+        yield _csv_rows([
+            [
+                m["id"], m["timestamp"], m["rating"],
+                ", ".join(m["emotions"]), m.get("note", ""),
+                m.get("trigger", ""), m.get("behavior", "")
+            ]
+            for m in chunk
+        ])
+
+    yield _csv_rows([
+        [],
+        ["--- CBT LOGS ---"],
+        ["ID", "Timestamp", "Situation", "Automatic Thoughts", "Distortions", "Rational Response", "Mood Before", "Mood After", "Behavioral Link"],
+    ])
+    async for chunk in cbt_logs:
+        yield _csv_rows([
+            [
+                log["id"], log["timestamp"], log["situation"],
+                log["automatic_thoughts"], ", ".join(log["distortions"]),
+                log["rational_response"], log["mood_before"],
+                log.get("mood_after", ""), log.get("behavioral_link", "")
+            ]
+            for log in chunk
+        ])
+
+
+# --- Markdown ---
+
+def _md_mood(m: dict) -> str:
+    out = [
+        f"### {m['timestamp']} - Rating: {m['rating']}\n",
+        f"**Emotions:** {', '.join(m['emotions'])}\n\n",
+    ]
+    if m.get("note"):
+        out.append(f"> {m.get('note')}\n\n")
+    if m.get("trigger"):
+        out.append(f"*Trigger:* {m.get('trigger')}\n")
+    if m.get("behavior"):
+        out.append(f"*Behavior:* {m.get('behavior')}\n")
+    out.append("\n---\n\n")
+    return "".join(out)
+
+
+def _md_cbt_log(log: dict) -> str:
+    return (
+        f"### Situation: {log['situation']}\n"
+        f"**Thoughts:** {log['automatic_thoughts']}\n"
+        f"**Distortions:** {', '.join(log['distortions'])}\n"
+        f"**Reframed:** {log['rational_response']}\n"
+        "\n---\n\n"
+    )
+
+
+async def render_md(moods: Chunks, cbt_logs: Chunks, manifest: Optional[dict] = None) -> AsyncIterator[str]:
+    yield "# MindfulTrack Export\n\n"
+    yield "## Mood Entries\n\n"
+    async for chunk in moods:
+        yield "".join(_md_mood(m) for m in chunk)
+    yield "## CBT Logs\n\n"
+    async for chunk in cbt_logs:
+        yield "".join(_md_cbt_log(log) for log in chunk)
+
+
+# Only JSON has room for the manifest; the others ignore it
+RENDERERS: Dict[str, Callable[[Chunks, Chunks, Optional[dict]], AsyncIterator[str]]] = {
+    "json": render_json,
+    "csv": render_csv,
+    "md": render_md,
+}
+
+
+async def render_export(
+    format: str,
+    moods: Chunks,
+    cbt_logs: Chunks,
+    table: Optional[str] = None,
+    compression: Optional[str] = None,
+    manifest: Optional[dict] = None
+) -> AsyncIterator[bytes]:
+    """
+    Render `format` as byte chunks. Columnar formats export only `table`
+    ("moods" or "cbt_logs"); text formats are UTF-8 and may be gzip-compressed.
+    The `manifest` counts are filled in as rows are rendered.
+    """
+    if manifest is not None:
+        moods = _counted(moods, manifest["counts"], "moodEntries")
+        cbt_logs = _counted(cbt_logs, manifest["counts"], "cbtLogs")
+    if EXPORT_FORMATS[format].columnar:
+        pieces = COLUMNAR_RENDERERS[format](table, moods if table == "moods" else cbt_logs)
+    else:
+        pieces = _encode(RENDERERS[format](moods, cbt_logs, manifest))
+    if compression == "gzip":
+        pieces = gzip_chunks(pieces)
+    async for piece in pieces:
+        if piece:
+            yield piece
+
+
+async def _encode(pieces: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    async for piece in pieces:
+        yield piece.encode("utf-8")
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compress a byte stream into a single gzip member as it is produced."""
+    compressor = zlib.compressobj(wbits=31)
+    async for chunk in chunks:
+        # Compression is CPU-bound; keep it off the event loop
+        yield await asyncio.to_thread(compressor.compress, chunk)
+    yield compressor.flush()
@@ -1,11 +1,15 @@
 # backend/app/services/gemini_client.py
 
 import asyncio
+import hashlib
 import json
+import random
 import uuid
 import time
-from typing import List, Tuple, Dict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
 from google import generativeai as genai
+from google.api_core.exceptions import DeadlineExceeded, ResourceExhausted
 from google.generativeai.types import GenerationConfig, HarmCategory, HarmProbability
 from app.core.ai_config import get_ai_config
 from app.core.constants import COGNITIVE_DISTORTIONS
@@ -15,13 +19,27 @@ from app.schemas.cbt import (
     DistortionSuggestion,
     RationalReframe
 )
+from app.services.admission import get_admission_controller
+from app.services.analysis_stream import AnalysisEvent, ReframeStreamParser, distortions_event
+from app.services.deadline import remaining_seconds
+from app.services.heuristics import guess_distortions
 from app.services.safety_handler import SafetyHandler
 from app.services.prompt_manager import PromptManager
 from app.core.logging import get_logger
-from app.db.session import get_db
+from app.core.metrics import metrics
+from app.db.session import get_async_db, execute_write_async
+from app.db.writer import Statement
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+# Most hedges that may be sent back to back
+HEDGE_BURST = 5
+# Ways a model call ends without an answer whose latency is still worth recording
+CUT_OFF = (asyncio.CancelledError, asyncio.TimeoutError, DeadlineExceeded)
+# (distortions, reframes, prompt version)
+AnalysisResult = Tuple[List[DistortionSuggestion], List[RationalReframe], str]
+
 class GeminiClient:
     """Gemini AI client for cognitive distortion detection and rational reframing."""
 
@@ -33,11 +51,27 @@ class GeminiClient:
         self.model = genai.GenerativeModel(self.config.gemini_model)
         self.safety_handler = SafetyHandler()
         self.prompt_manager = PromptManager()
+        self._first_call_recorded = False
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        # Hedges that may be sent now; see `_hedge_delay`
+        self._hedge_budget = 0.0
+
+    async def warm_up(self) -> None:
+        """
+        Open the connection to Gemini with a token count, which is cheap and
+        generates nothing, so the first analysis doesn't pay connection setup.
+        """
+        await self.model.count_tokens_async("warm-up")
 
     async def analyze_cbt(self, request: CBTAnalysisRequest) -> CBTAnalysisResponse:
         """
         Perform full CBT analysis: distortion detection and rational reframing.
 
+        How the model is called depends on `ai_analysis_strategy`; latency and
+        outcome are recorded per strategy under `ai.analyze.<strategy>.*`.
+
         Args:
             request: CBT analysis request with situation and automatic thought
 
@@ -46,70 +80,247 @@ class GeminiClient:
         """
         start_time = time.time()
         request_id = str(uuid.uuid4())
-        latency_ms = 0
         prompt_version = "unknown"
-        success = False
+        strategy = self.config.ai_analysis_strategy
+        analyze = self._strategies.get(strategy, self._analyze_sequential)
+
+        try:
+            distortions, reframes, prompt_version = await analyze(request)
+        except Exception as e:
+            await self._record_outcome(request_id, strategy, start_time, prompt_version, e)
+            raise
+
+        response = CBTAnalysisResponse(
+            suggestions=distortions,
+            reframes=reframes,
+            prompt_version=prompt_version
+        )
+        # Log audit (PII-free) - Async fire and forget would be better but simple call for now
+        await self._record_outcome(request_id, strategy, start_time, prompt_version)
+        return response
+
+    async def analyze_cbt_stream(self, request: CBTAnalysisRequest) -> AsyncIterator[AnalysisEvent]:
+        """
+        Analyze step by step, yielding each result as it becomes available:
+        the distortions once detection returns, then every reframe as soon as
+        the streamed reframing response has produced it, then the complete
+        response (see `app.services.analysis_stream`).
+
+        Detection always runs first, whatever `ai_analysis_strategy` says, so
+        the first event arrives after a single round trip. Outcomes are
+        recorded under `ai.analyze.stream.*`.
+        """
+        start_time = time.time()
+        request_id = str(uuid.uuid4())
+        prompt_version = "unknown"
 
         try:
-            # 1. Detect distortions
-            distortions, version_id = await self._detect_distortions_with_retry(
+            distortions, prompt_version = await self._detect_distortions_with_retry(
                 request.situation,
                 request.automatic_thought
             )
-            prompt_version = version_id
+            response = CBTAnalysisResponse(suggestions=distortions, reframes=[], prompt_version=prompt_version)
+            yield distortions_event(response)
 
-            # 2. Generate reframes
-            distortion_names = [d.distortion for d in distortions]
-            reframes, _ = await self._generate_reframes_with_retry(
+            async for reframe in self._stream_reframes_with_retry(
                 request.situation,
                 request.automatic_thought,
-                distortion_names
-            )
+                [d.distortion for d in distortions]
+            ):
+                response.reframes.append(reframe)
+                yield AnalysisEvent("reframe", reframe)
+        except Exception as e:
+            await self._record_outcome(request_id, "stream", start_time, prompt_version, e)
+            raise
 
-            latency_ms = int((time.time() - start_time) * 1000)
-            success = True
+        await self._record_outcome(request_id, "stream", start_time, prompt_version)
+        yield AnalysisEvent("done", response)
 
-            response = CBTAnalysisResponse(
-                suggestions=distortions,
-                reframes=reframes,
-                prompt_version=prompt_version
+    async def _record_outcome(
+        self,
+        request_id: str,
+        strategy: str,
+        start_time: float,
+        prompt_version: str,
+        error: Optional[Exception] = None
+    ) -> None:
+        """Record latency and outcome of an analysis in metrics and the audit log."""
+        latency_ms = int((time.time() - start_time) * 1000)
+        if error is None:
+            outcome, safety_tier = "success", "negligible"
+        elif isinstance(error, SafetyException):
+            outcome, safety_tier = "safety", "high"
+        else:
+            outcome, safety_tier = "failure", "error"
+            logger.error(
+                "CBT analysis failed",
+                extra={"request_id": request_id, "error": str(error), "latency_ms": latency_ms, "strategy": strategy}
             )
+        self._record_strategy(strategy, latency_ms, outcome)
+        await self._log_audit(
+            request_id=request_id,
+            prompt_version_id=prompt_version,
+            safety_tier=safety_tier,
+            latency_ms=latency_ms,
+            success=error is None
+        )
 
-            # 3. Log audit (PII-free) - Async fire and forget would be better but simple call for now
-            self._log_audit(
-                request_id=request_id,
-                prompt_version_id=prompt_version,
-                safety_tier="negligible", # Will be updated if exceptions occur
-                latency_ms=latency_ms,
-                success=success
-            )
+    async def analysis_fingerprint(self) -> str:
+        """Everything besides the input that determines `analyze_cbt` output, for cache keys."""
+        strategy = self.config.ai_analysis_strategy
+        if strategy == "combined":
+            prompts = [await self.prompt_manager.get_combined_prompt()]
+        else:
+            prompts = [
+                await self.prompt_manager.get_distortion_prompt(),
+                await self.prompt_manager.get_reframing_prompt()
+            ]
+        digest = hashlib.sha256()
+        for template, version_id in prompts:
+            digest.update(f"{version_id}\0{template}\0".encode("utf-8"))
+        return json.dumps([self.config.gemini_model, self.config.gemini_temperature, strategy, digest.hexdigest()])
+
+    @property
+    def _strategies(self) -> Dict[str, Callable[[CBTAnalysisRequest], Awaitable[AnalysisResult]]]:
+        return {
+            "sequential": self._analyze_sequential,
+            "parallel": self._analyze_parallel,
+            "combined": self._analyze_combined,
+        }
+
+    @staticmethod
+    def _record_strategy(strategy: str, latency_ms: int, outcome: str) -> None:
+        metrics.observe(f"ai.analyze.{strategy}.latency_ms", latency_ms)
+        metrics.incr(f"ai.analyze.{strategy}.{outcome}")
+
+    async def _analyze_sequential(self, request: CBTAnalysisRequest) -> AnalysisResult:
+        """Detect distortions, then reframe with them: two round trips back to back."""
+        # 1. Detect distortions
+        distortions, version_id = await self._detect_distortions_with_retry(
+            request.situation,
+            request.automatic_thought
+        )
 
-            return response
+        # 2. Generate reframes
+        distortion_names = [d.distortion for d in distortions]
+        reframes, _ = await self._generate_reframes_with_retry(
+            request.situation,
+            request.automatic_thought,
+            distortion_names
+        )
+        return distortions, reframes, version_id
 
-        except SafetyException:
-            latency_ms = int((time.time() - start_time) * 1000)
-            self._log_audit(
-                request_id=request_id,
-                prompt_version_id=prompt_version,
-                safety_tier="high",
-                latency_ms=latency_ms,
-                success=False
-            )
-            raise
-        except Exception as e:
-            latency_ms = int((time.time() - start_time) * 1000)
-            logger.error(
-                "CBT analysis failed",
-                extra={"request_id": request_id, "error": str(e), "latency_ms": latency_ms}
-            )
-            self._log_audit(
-                request_id=request_id,
-                prompt_version_id=prompt_version,
-                safety_tier="error",
-                latency_ms=latency_ms,
-                success=False
-            )
+    async def _analyze_parallel(self, request: CBTAnalysisRequest) -> AnalysisResult:
+        """
+        Detect and reframe at the same time. Reframing cannot wait for the
+        detected distortions, so it is given a local keyword guess instead.
+        """
+        guessed = guess_distortions(request.automatic_thought)
+        detect = asyncio.ensure_future(
+            self._detect_distortions_with_retry(request.situation, request.automatic_thought)
+        )
+        reframe = asyncio.ensure_future(
+            self._generate_reframes_with_retry(request.situation, request.automatic_thought, guessed)
+        )
+        try:
+            (distortions, version_id), (reframes, _) = await asyncio.gather(detect, reframe)
+        except BaseException:
+            # One call failed (or we were cancelled); don't leave the other running
+            detect.cancel()
+            reframe.cancel()
+            await asyncio.gather(detect, reframe, return_exceptions=True)
             raise
+        return distortions, reframes, version_id
+
+    async def _analyze_combined(self, request: CBTAnalysisRequest) -> AnalysisResult:
+        """Detect and reframe with a single prompt and round trip."""
+        return await self._with_retry(
+            "Combined analysis",
+            self._detect_and_reframe,
+            request.situation,
+            request.automatic_thought
+        )
+
+    async def _with_retry(self, operation: str, call: Callable[..., Awaitable[T]], *args) -> T:
+        """
+        Run `call`, retrying transient failures with jittered exponential
+        backoff, but only while a retry can still finish before the analysis
+        deadline. The budget the phase used is recorded either way.
+        """
+        start = time.monotonic()
+        try:
+            for attempt in range(self.config.ai_max_retries + 1):
+                try:
+                    return await call(*args)
+                except (ParseException, SafetyException):
+                    # Don't retry on parsing or safety errors
+                    raise
+                except Exception as e:
+                    if isinstance(e, ResourceExhausted):
+                        # Provider 429: stop admitting new work until the budget refills
+                        get_admission_controller().drain()
+                    if attempt == self.config.ai_max_retries:
+                        raise
+                    delay = self._retry_delay(operation, attempt, e)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+        finally:
+            self._record_budget(operation, start)
+
+    def _retry_delay(self, operation: str, attempt: int, error: Exception) -> Optional[float]:
+        """
+        Backoff before the retry after `attempt`, with full jitter, shortened
+        if need be so a typical call still fits before the deadline. None if
+        even an immediate retry would not finish in time.
+        """
+        delay = random.uniform(0, 2 ** attempt)
+        remaining = remaining_seconds()
+        if remaining is not None:
+            slack = remaining - self._expected_call_seconds()
+            if slack < 0:
+                metrics.incr("ai.retry.abandoned")
+                logger.warning(
+                    f"{operation} failed, no time left to retry",
+                    extra={"attempt": attempt + 1, "error": str(error), "remaining_ms": round(remaining * 1000)}
+                )
+                return None
+            delay = min(delay, slack)
+        metrics.incr("ai.retry.attempts")
+        logger.warning(
+            f"{operation} failed, retrying",
+            extra={"attempt": attempt + 1, "error": str(error), "delay_ms": round(delay * 1000)}
+        )
+        return delay
+
+    def _expected_call_seconds(self) -> float:
+        """
+        Recent p95 latency of a model call. A cold process assumes
+        `ai_expected_call_seconds` until `ai_latency_min_samples` calls were
+        measured; assuming the whole `ai_timeout` would rule out every retry.
+        """
+        latency = metrics.histogram("ai.gemini.call_ms")
+        if latency.count < self.config.ai_latency_min_samples:
+            return self.config.ai_expected_call_seconds
+        return latency.percentile(95) / 1000
+
+    def _call_timeout(self) -> float:
+        """`ai_timeout`, cut to the time left before the analysis deadline."""
+        remaining = remaining_seconds()
+        if remaining is None:
+            return self.config.ai_timeout
+        if remaining <= 0:
+            raise asyncio.TimeoutError("Analysis deadline exceeded")
+        return min(self.config.ai_timeout, remaining)
+
+    @staticmethod
+    def _record_budget(operation: str, start: float) -> None:
+        """Record time a phase took, retries included, and what it left of the deadline."""
+        phase = operation.lower().replace(" ", "_")
+        metrics.observe(f"ai.budget.{phase}.used_ms", (time.monotonic() - start) * 1000)
+        remaining = remaining_seconds()
+        if remaining is not None:
+            metrics.observe(f"ai.budget.{phase}.left_ms", max(remaining, 0) * 1000)
 
     async def _detect_distortions_with_retry(
         self,
@@ -117,20 +328,7 @@ class GeminiClient:
         automatic_thought: str
     ) -> Tuple[List[DistortionSuggestion], str]:
         """Detect distortions with retry logic."""
-        for attempt in range(self.config.ai_max_retries + 1):
-            try:
-                return await self._detect_distortions(situation, automatic_thought)
-            except (ParseException, SafetyException):
-                # Don't retry on parsing or safety errors
-                raise
-            except Exception as e:
-                if attempt == self.config.ai_max_retries:
-                    raise
-                logger.warning(
-                    "Distortion detection failed, retrying",
-                    extra={"attempt": attempt + 1, "error": str(e)}
-                )
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
+        return await self._with_retry("Distortion detection", self._detect_distortions, situation, automatic_thought)
 
     async def _generate_reframes_with_retry(
         self,
@@ -139,76 +337,273 @@ class GeminiClient:
         distortions: List[str]
     ) -> Tuple[List[RationalReframe], str]:
         """Generate reframes with retry logic."""
-        for attempt in range(self.config.ai_max_retries + 1):
-            try:
-                return await self._generate_reframes(situation, automatic_thought, distortions)
-            except (ParseException, SafetyException):
-                raise
-            except Exception as e:
-                if attempt == self.config.ai_max_retries:
-                    raise
-                logger.warning(
-                    "Reframe generation failed, retrying",
-                    extra={"attempt": attempt + 1, "error": str(e)}
-                )
-                await asyncio.sleep(2 ** attempt)  # Exponential backoff
+        return await self._with_retry(
+            "Reframe generation", self._generate_reframes, situation, automatic_thought, distortions
+        )
 
-    async def _detect_distortions(
+    async def _stream_reframes_with_retry(
         self,
         situation: str,
-        automatic_thought: str
-    ) -> Tuple[List[DistortionSuggestion], str]:
-        """Detect cognitive distortions using Gemini."""
-        prompt_template, version_id = await self.prompt_manager.get_distortion_prompt()
-        prompt = prompt_template.format(
-            situation=situation,
-            automatic_thought=automatic_thought
-        )
+        automatic_thought: str,
+        distortions: List[str]
+    ) -> AsyncIterator[RationalReframe]:
+        """Stream reframes, retrying like `_with_retry` until the first one has been yielded."""
+        start = time.monotonic()
+        try:
+            for attempt in range(self.config.ai_max_retries + 1):
+                yielded = False
+                try:
+                    async for reframe in self._stream_reframes(situation, automatic_thought, distortions):
+                        yielded = True
+                        yield reframe
+                    return
+                except (ParseException, SafetyException):
+                    raise
+                except Exception as e:
+                    # Reframes already sent cannot be taken back, so only a clean start is retried
+                    if yielded or attempt == self.config.ai_max_retries:
+                        raise
+                    delay = self._retry_delay("Reframe streaming", attempt, e)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+        finally:
+            self._record_budget("Reframe streaming", start)
+
+    async def _generate_json(self, prompt: str) -> dict:
+        """Call Gemini for a JSON answer, enforcing the safety policy on the response."""
+        response = await self._generate(prompt)
+        self._check_safety(response)
+
+        try:
+            logger.debug("Gemini response content", extra={"content": response.text})
+            data = json.loads(response.text)
+            if not isinstance(data, dict):
+                raise TypeError("Expected a JSON object")
+            return data
+        except (json.JSONDecodeError, TypeError) as e:
+            logger.error("Failed to parse Gemini response", extra={"error": str(e), "content": response.text})
+            raise ParseException("Invalid AI response format")
+
+    async def _generate(self, prompt: str):
+        """
+        One model call. With hedging on, a call still running at the
+        `ai_hedge_percentile` of recent call latency gets a second, identical
+        call; the first to succeed is used and the other one is cancelled.
+        """
+        delay = self._hedge_delay()
+        if delay is None:
+            return await self._generate_once(prompt)
+
+        start = time.perf_counter()
+        calls = [asyncio.ensure_future(self._generate_once(prompt))]
+        try:
+            done, _ = await asyncio.wait(calls, timeout=delay)
+            if not done and self._take_hedge(prompt):
+                calls.append(asyncio.ensure_future(self._generate_once(prompt)))
+            return await self._first_success(calls, start)
+        finally:
+            for call in calls:
+                call.cancel()
+            await asyncio.gather(*calls, return_exceptions=True)
 
+    async def _generate_once(self, prompt: str):
+        async with self._call_slot():
+            start = time.perf_counter()
+            try:
+                response = await self.model.generate_content_async(
+                    prompt,
+                    generation_config=self._generation_config(),
+                    request_options={"timeout": self._call_timeout()}
+                )
+            except CUT_OFF:
+                self._record_call(start, censored=True)
+                raise
+            self._record_call(start)
+        return response
+
+    async def _first_success(self, calls: List[asyncio.Future], start: float):
+        """The first successful result among `calls`; if all fail, the first error."""
+        pending = set(calls)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for call in done:
+                if call.exception() is None:
+                    if call is not calls[0]:
+                        self._record_hedge_win(start)
+                    return call.result()
+                error = error or call.exception()
+        raise error
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds after which the coming call is hedged, or None when it won't be."""
+        if not self.config.ai_hedge_enabled:
+            return None
+        latency = metrics.histogram("ai.gemini.call_ms")
+        if latency.count < self.config.ai_hedge_min_samples:
+            return None
+        metrics.incr("ai.hedge.calls")
+        # Every call earns a fraction of a hedge, which caps the hedge rate with a small burst
+        self._hedge_budget = min(HEDGE_BURST, self._hedge_budget + self.config.ai_hedge_max_rate)
+        self._record_hedge_rate()
+        return latency.percentile(self.config.ai_hedge_percentile) / 1000
+
+    def _take_hedge(self, prompt: str) -> bool:
+        """Whether a hedge may be sent now; it must fit the hedge rate and the admission budget."""
+        tokens = self.config.ai_tokens_per_call + len(prompt) // 4
+        if self._hedge_budget < 1 or not get_admission_controller().try_take(1, tokens):
+            metrics.incr("ai.hedge.capped")
+            return False
+        self._hedge_budget -= 1
+        metrics.incr("ai.hedge.sent")
+        self._record_hedge_rate()
+        return True
+
+    @staticmethod
+    def _record_hedge_rate() -> None:
+        metrics.set_gauge("ai.hedge.rate", metrics.counter("ai.hedge.sent") / metrics.counter("ai.hedge.calls"))
+
+    @staticmethod
+    def _record_hedge_win(start: float) -> None:
+        """
+        Record a hedge that answered first. The cancelled call's latency is
+        unknown, so the gain is estimated as the median of recent calls that
+        ran at least as long, less the latency actually achieved.
+        """
+        metrics.incr("ai.hedge.won")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        slower = sorted(v for v in metrics.histogram("ai.gemini.call_ms").values() if v > elapsed_ms)
+        gain_ms = slower[len(slower) // 2] - elapsed_ms if slower else 0.0
+        metrics.observe("ai.hedge.gain_ms", gain_ms)
+
+    async def _generate_json_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream Gemini's JSON answer as text chunks, enforcing the safety policy on every chunk."""
+        # The slot is held until the stream ends or its consumer goes away
+        async with self._call_slot():
+            start = time.perf_counter()
+            try:
+                response = await self.model.generate_content_async(
+                    prompt,
+                    generation_config=self._generation_config(),
+                    stream=True,
+                    request_options={"timeout": self._call_timeout()}
+                )
+                async for chunk in response:
+                    if start is not None:
+                        # Time to first chunk
+                        self._record_call(start)
+                        start = None
+                    self._check_safety(chunk)
+                    yield chunk.text
+            except CUT_OFF:
+                if start is not None:
+                    self._record_call(start, censored=True)
+                raise
+
+    def _generation_config(self) -> GenerationConfig:
         # Configure generation for JSON output
-        generation_config = GenerationConfig(
+        return GenerationConfig(
             temperature=self.config.gemini_temperature,
             response_mime_type="application/json"
         )
 
-        # Run in thread pool to avoid blocking async loop if SDK is synchronous
-        response = await asyncio.to_thread(
-            self.model.generate_content,
-            prompt,
-            generation_config=generation_config
-        )
+    @asynccontextmanager
+    async def _call_slot(self) -> AsyncIterator[None]:
+        """
+        Wait for one of `ai_max_concurrency` model call slots. Calls are native
+        asyncio, so a cancelled analysis cancels its RPC and frees the slot;
+        nothing is left running on a thread.
+        """
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            # Bind the limit to the loop the calls actually run on
+            self._slots_loop = loop
+            self._slots = asyncio.Semaphore(self.config.ai_max_concurrency)
+        start = time.perf_counter()
+        async with self._slots:
+            metrics.observe("ai.gemini.slot_wait_ms", (time.perf_counter() - start) * 1000)
+            self._in_flight += 1
+            metrics.set_gauge("ai.gemini.in_flight", self._in_flight)
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+                metrics.set_gauge("ai.gemini.in_flight", self._in_flight)
 
-        # Check safety ratings
+    def _record_call(self, start: float, censored: bool = False) -> None:
+        """
+        Record the latency of a model call, and separately that of the first
+        one made. A `censored` call was cut off (timed out, or cancelled, e.g.
+        as a hedge's loser) before answering; it is recorded at the time it
+        ran, a lower bound on its latency. Leaving such calls out would make
+        the model look faster than it is, most of all to the hedge delay.
+        """
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        metrics.observe("ai.gemini.call_ms", elapsed_ms)
+        if censored:
+            metrics.incr("ai.gemini.call_censored")
+            return
+        if not self._first_call_recorded:
+            self._first_call_recorded = True
+            metrics.set_gauge("ai.client.first_call_ms", elapsed_ms)
+
+    def _check_safety(self, response) -> None:
         safety_ratings = self._extract_safety_ratings(response)
         safety_result = self.safety_handler.evaluate(safety_ratings)
 
         if safety_result.trigger_crisis:
             raise SafetyException(safety_result.message, safety_result.crisis_resources)
 
-        # Parse JSON response
+    @staticmethod
+    def _parse_distortions(data: dict) -> List[DistortionSuggestion]:
+        suggestions = []
+        for item in data.get("distortions", []):
+            distortion_name = item.get("distortion")
+            # Filter to ensure only predefined distortions are returned
+            if distortion_name in COGNITIVE_DISTORTIONS:
+                suggestions.append(DistortionSuggestion(
+                    distortion=distortion_name,
+                    reasoning=item.get("reasoning", "No reasoning provided")
+                ))
+            else:
+                logger.warning(
+                    "AI returned unknown distortion",
+                    extra={"unknown_distortion": distortion_name}
+                )
+        return suggestions
+
+    @staticmethod
+    def _parse_reframes(data: dict) -> List[RationalReframe]:
+        return [
+            RationalReframe(
+                perspective=item["perspective"],
+                content=item["content"]
+            )
+            for item in data.get("reframes", [])
+        ]
+
+    def _parse(self, data: dict, parser: Callable[[dict], T]) -> T:
         try:
-            logger.debug("Gemini response content", extra={"content": response.text})
-            data = json.loads(response.text)
-            suggestions = []
-            for item in data.get("distortions", []):
-                distortion_name = item.get("distortion")
-                # Filter to ensure only predefined distortions are returned
-                if distortion_name in COGNITIVE_DISTORTIONS:
-                    suggestions.append(DistortionSuggestion(
-                        distortion=distortion_name,
-                        reasoning=item.get("reasoning", "No reasoning provided")
-                    ))
-                else:
-                    logger.warning(
-                        "AI returned unknown distortion",
-                        extra={"unknown_distortion": distortion_name}
-                    )
-            
-            return suggestions, version_id
-        except (json.JSONDecodeError, KeyError, TypeError) as e:
-            logger.error("Failed to parse Gemini response", extra={"error": str(e), "content": response.text})
+            return parser(data)
+        except (KeyError, TypeError, AttributeError) as e:
+            logger.error("Failed to parse Gemini response", extra={"error": str(e), "content": json.dumps(data)})
             raise ParseException("Invalid AI response format")
 
+    async def _detect_distortions(
+        self,
+        situation: str,
+        automatic_thought: str
+    ) -> Tuple[List[DistortionSuggestion], str]:
+        """Detect cognitive distortions using Gemini."""
+        prompt_template, version_id = await self.prompt_manager.get_distortion_prompt()
+        prompt = prompt_template.format(
+            situation=situation,
+            automatic_thought=automatic_thought
+        )
+        data = await self._generate_json(prompt)
+        return self._parse(data, self._parse_distortions), version_id
+
     async def _generate_reframes(
         self,
         situation: str,
@@ -222,40 +617,43 @@ class GeminiClient:
             automatic_thought=automatic_thought,
             distortions=", ".join(distortions)
         )
+        data = await self._generate_json(prompt)
+        return self._parse(data, self._parse_reframes), version_id
 
-        generation_config = GenerationConfig(
-            temperature=self.config.gemini_temperature,
-            response_mime_type="application/json"
-        )
-
-        response = await asyncio.to_thread(
-            self.model.generate_content,
-            prompt,
-            generation_config=generation_config
+    async def _stream_reframes(
+        self,
+        situation: str,
+        automatic_thought: str,
+        distortions: List[str]
+    ) -> AsyncIterator[RationalReframe]:
+        """Generate rational reframes, yielding each one as soon as Gemini has written it out."""
+        prompt_template, _ = await self.prompt_manager.get_reframing_prompt()
+        prompt = prompt_template.format(
+            situation=situation,
+            automatic_thought=automatic_thought,
+            distortions=", ".join(distortions)
         )
-
-        # Check safety ratings
-        safety_ratings = self._extract_safety_ratings(response)
-        safety_result = self.safety_handler.evaluate(safety_ratings)
-
-        if safety_result.trigger_crisis:
-            raise SafetyException(safety_result.message, safety_result.crisis_resources)
-
-        # Parse JSON response
+        parser = ReframeStreamParser()
+        async for text in self._generate_json_stream(prompt):
+            for item in parser.feed(text):
+                for reframe in self._parse({"reframes": [item]}, self._parse_reframes):
+                    yield reframe
         try:
-            data = json.loads(response.text)
-            reframes = [
-                RationalReframe(
-                    perspective=item["perspective"],
-                    content=item["content"]
-                )
-                for item in data.get("reframes", [])
-            ]
-            return reframes, version_id
-        except (json.JSONDecodeError, KeyError, TypeError) as e:
-            logger.error("Failed to parse Gemini response", extra={"error": str(e), "content": response.text})
+            json.loads(parser.text)
+        except json.JSONDecodeError as e:
+            logger.error("Failed to parse Gemini response", extra={"error": str(e), "content": parser.text})
             raise ParseException("Invalid AI response format")
 
+    async def _detect_and_reframe(self, situation: str, automatic_thought: str) -> AnalysisResult:
+        """Detect distortions and generate reframes from one combined prompt."""
+        prompt_template, version_id = await self.prompt_manager.get_combined_prompt()
+        prompt = prompt_template.format(
+            situation=situation,
+            automatic_thought=automatic_thought
+        )
+        data = await self._generate_json(prompt)
+        return self._parse(data, self._parse_distortions), self._parse(data, self._parse_reframes), version_id
+
     def _extract_safety_ratings(self, response) -> Dict[HarmCategory, HarmProbability]:
         """Extract safety ratings from Gemini response."""
         safety_ratings = {}
@@ -268,7 +666,7 @@ class GeminiClient:
                 safety_ratings[rating.category] = rating.probability
         return safety_ratings
 
-    def _log_audit(
+    async def _log_audit(
         self,
         request_id: str,
         prompt_version_id: str,
@@ -277,11 +675,10 @@ class GeminiClient:
         success: bool
     ):
         """Log AI audit entry (PII-free)."""
-        db_gen = get_db()
+        db_gen = get_async_db()
         try:
-            db = next(db_gen)
-            cursor = db.cursor()
-            cursor.execute(
+            db = await anext(db_gen)
+            await execute_write_async(db, [Statement(
                 """
                 INSERT INTO ai_audit_logs (
                     id, request_id, prompt_version_id, safety_tier,
@@ -290,15 +687,14 @@ class GeminiClient:
                 VALUES (?, ?, ?, ?, ?, ?, ?)
                 """,
                 (str(uuid.uuid4()), request_id, prompt_version_id, safety_tier, latency_ms, 1 if success else 0, int(time.time()))
-            )
-            db.commit()
+            )])
             logger.info("AI audit log created", extra={"request_id": request_id, "latency_ms": latency_ms})
         except Exception as e:
             logger.error("Failed to create AI audit log", extra={"error": str(e)})
         finally:
             try:
-                next(db_gen)
-            except StopIteration:
+                await anext(db_gen)
+            except StopAsyncIteration:
                 pass
 
 
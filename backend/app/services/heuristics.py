@@ -0,0 +1,52 @@
+# backend/app/services/heuristics.py
+"""
+Cheap local guesses at cognitive distortions.
+
+Keyword patterns over the automatic thought, one per distortion they can
+reasonably signal. The guess is meant to give the model a starting point,
+for example when reframing speculatively before detection has finished. It
+is not a substitute for detection; `heuristic_analysis` only stands in for
+it, marked degraded, while the AI service is unavailable.
+"""
+
+import re
+from typing import List, Tuple
+from app.schemas.cbt import CBTAnalysisRequest, CBTAnalysisResponse, DistortionSuggestion
+
+# (distortion, pattern); order follows COGNITIVE_DISTORTIONS
+_PATTERNS: List[Tuple[str, re.Pattern]] = [
+    ("All-or-Nothing Thinking", re.compile(r"\b(completely|totally|perfect(ly)?|ruined|total (failure|disaster)|nothing ever|everything)\b")),
+    ("Overgeneralization", re.compile(r"\b(always|never|every ?time|everyone|no ?one|nobody)\b")),
+    ("Disqualifying the Positive", re.compile(r"\b(just (luck|lucky)|doesn'?t count|only because|anyone could)\b")),
+    ("Mind Reading", re.compile(r"\b(they|he|she|everyone|people) (think|thinks|must think|probably think|will think)\b")),
+    ("Fortune Telling", re.compile(r"\b(will|going to|gonna) (fail|go wrong|hate|leave|be (a )?disaster)\b")),
+    ("Magnification/Minimization", re.compile(r"\b(terrible|awful|horrible|catastroph\w*|unbearable|the worst)\b")),
+    ("Emotional Reasoning", re.compile(r"\bi feel (like )?(a |an )?\w+,? so\b|\bi feel it,? so\b")),
+    ("Should Statements", re.compile(r"\b(should|shouldn'?t|must|mustn'?t|ought to|have to)\b")),
+    ("Labeling", re.compile(r"\bi'?m (such )?(a|an) (failure|loser|idiot|fraud|mess|burden)\b|\bi am (a|an) (failure|loser|idiot|fraud|mess|burden)\b")),
+    ("Personalization", re.compile(r"\b(my fault|because of me|i caused|i ruined|blame myself)\b")),
+    ("Control Fallacies", re.compile(r"\b(can'?t help it|no control|nothing i can do|out of my hands)\b")),
+    ("Fallacy of Fairness", re.compile(r"\b(not fair|unfair|i deserve)\b")),
+]
+
+
+def guess_distortions(text: str) -> List[str]:
+    """Distortions whose keywords appear in `text`, in COGNITIVE_DISTORTIONS order."""
+    lowered = text.lower()
+    return [name for name, pattern in _PATTERNS if pattern.search(lowered)]
+
+
+def heuristic_analysis(request: CBTAnalysisRequest) -> CBTAnalysisResponse:
+    """A degraded analysis from keyword guesses alone, without reframes."""
+    return CBTAnalysisResponse(
+        suggestions=[
+            DistortionSuggestion(
+                distortion=name,
+                reasoning="The thought uses wording common to this distortion. Detailed analysis is temporarily unavailable."
+            )
+            for name in guess_distortions(request.automatic_thought)
+        ],
+        reframes=[],
+        prompt_version="heuristic",
+        degraded=True
+    )
@@ -0,0 +1,342 @@
+# backend/app/services/importer.py
+"""
+Streaming data import.
+
+Uploads are parsed incrementally from the request body, as NDJSON or as the
+`{"moodEntries": [...], "cbtLogs": [...]}` shape written by /data/export, so
+only the current record and the pending batch are ever held in memory.
+Records are inserted in batches of `batch_size`, one transaction and one
+`executemany` per batch. Ids that already exist are counted as duplicates,
+and records that are malformed are counted as invalid and skipped.
+"""
+
+import codecs
+import json
+import os
+import time
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import aiosqlite
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+from app.db.session import execute_write_async
+from app.repositories.cbt import cbt_import_row, cbt_import_statements_async, import_cbt_logs_async
+from app.repositories.changes import CBT, MOOD
+from app.repositories.list_cache import invalidate_user
+from app.repositories.mood import import_mood_entries_async, mood_import_row, mood_import_statements_async
+
+logger = get_logger(__name__)
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+MAX_IMPORT_BATCH_SIZE = 10_000
+# Largest single record the parser will buffer before giving up
+MAX_RECORD_CHARS = 1024 * 1024
+MAX_REPORTED_ERRORS = 20
+
+# Export keys (JSON shape) and `type` values (NDJSON) for each entity
+EXPORT_KEYS = {"moodEntries": MOOD, "cbtLogs": CBT}
+NDJSON_TYPES = {"mood": MOOD, "moodEntry": MOOD, "cbt": CBT, "cbtLog": CBT}
+
+Record = Tuple[Optional[str], Any]
+
+
+class ImportFormatError(ValueError):
+    """The upload is not well-formed enough to keep reading."""
+
+
+# --- Parsers ---
+
+class _TextStream:
+    """UTF-8 text buffer over an async byte stream, refilled on demand."""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    async def more(self) -> bool:
+        """Append the next chunk; False once the stream is exhausted."""
+        if self.eof:
+            return False
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self.eof = True
+            tail = self._decoder.decode(b"", final=True)
+            self.buf = self.buf[self.pos:] + tail
+            self.pos = 0
+            return bool(tail)
+        self.buf = self.buf[self.pos:] + self._decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """
+    Yield `(entity, record)` per NDJSON line. Each line is an object whose
+    `type` is "mood" or "cbt"; unparseable lines yield `(None, error message)`.
+    """
+    stream = _TextStream(chunks)
+    line_no = 0
+    while True:
+        newline = stream.buf.find("\n", stream.pos)
+        if newline < 0:
+            if not stream.eof:
+                if len(stream.buf) - stream.pos > MAX_RECORD_CHARS:
+                    raise ImportFormatError(f"Line {line_no + 1} exceeds {MAX_RECORD_CHARS} characters")
+                await stream.more()
+                continue
+            # Last line without a trailing newline
+            newline = len(stream.buf)
+            if stream.pos >= newline:
+                return
+        line = stream.buf[stream.pos:newline].strip()
+        stream.pos = newline + 1
+        line_no += 1
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield None, f"line {line_no}: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield None, f"line {line_no}: expected an object"
+            continue
+        entity = NDJSON_TYPES.get(record.get("type"))
+        if entity is None:
+            yield None, f"line {line_no}: unknown type {record.get('type')!r}"
+            continue
+        yield entity, record
+
+
+class _JSONReader:
+    """Just enough of an incremental JSON reader to walk the export document."""
+
+    _WHITESPACE = " \t\r\n"
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self.stream = _TextStream(chunks)
+        self._decoder = json.JSONDecoder()
+
+    async def peek(self) -> Optional[str]:
+        stream = self.stream
+        while True:
+            while stream.pos < len(stream.buf) and stream.buf[stream.pos] in self._WHITESPACE:
+                stream.pos += 1
+            if stream.pos < len(stream.buf):
+                return stream.buf[stream.pos]
+            if not await stream.more():
+                return None
+
+    async def expect(self, allowed: str) -> str:
+        char = await self.peek()
+        if char is None or char not in allowed:
+            found = "end of input" if char is None else repr(char)
+            raise ImportFormatError(f"Expected one of {allowed!r}, found {found}")
+        self.stream.pos += 1
+        return char
+
+    async def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed."""
+        await self.peek()
+        stream = self.stream
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(stream.buf, stream.pos)
+                # A value that runs to the end of the buffer (e.g. a number) may continue
+                if end < len(stream.buf) or stream.eof:
+                    stream.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if stream.eof:
+                    raise ImportFormatError(f"Invalid JSON: {e.msg}")
+            if len(stream.buf) - stream.pos > MAX_RECORD_CHARS:
+                raise ImportFormatError(f"Record exceeds {MAX_RECORD_CHARS} characters")
+            await stream.more()
+
+
+async def iter_export_json(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Yield `(entity, record)` for each element of the export's moodEntries and cbtLogs arrays."""
+    reader = _JSONReader(chunks)
+    await reader.expect("{")
+    if await reader.peek() == "}":
+        reader.stream.pos += 1
+    else:
+        while True:
+            key = await reader.value()
+            if not isinstance(key, str):
+                raise ImportFormatError("Expected an object key")
+            await reader.expect(":")
+            entity = EXPORT_KEYS.get(key)
+            if entity is None:
+                # Unknown top-level keys are skipped (their values must still fit in a record)
+                await reader.value()
+            else:
+                await reader.expect("[")
+                if await reader.peek() == "]":
+                    reader.stream.pos += 1
+                else:
+                    while True:
+                        yield entity, await reader.value()
+                        if await reader.expect(",]") == "]":
+                            break
+            if await reader.expect(",}") == "}":
+                break
+    if await reader.peek() is not None:
+        raise ImportFormatError("Unexpected data after the end of the document")
+
+
+PARSERS: Dict[str, Callable[[AsyncIterator[bytes]], AsyncIterator[Record]]] = {
+    "ndjson": iter_ndjson,
+    "json": iter_export_json,
+}
+
+
+# --- Batched insert ---
+
+class ImportProgress:
+    """Running counts for one import; `summary()` is what the API reports."""
+
+    def __init__(self):
+        self.created = {MOOD: 0, CBT: 0}
+        self.duplicates = {MOOD: 0, CBT: 0}
+        self.invalid = 0
+        self.errors: List[str] = []
+        self.batches = 0
+        self.started = time.perf_counter()
+
+    @property
+    def processed(self) -> int:
+        return sum(self.created.values()) + sum(self.duplicates.values()) + self.invalid
+
+    def record_error(self, message: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        if self.invalid:
+            message = f"Data imported; {self.invalid} invalid records were skipped"
+        else:
+            message = "Data imported successfully"
+        return {
+            "message": message,
+            "moods": {"created": self.created[MOOD], "duplicates": self.duplicates[MOOD]},
+            "cbt_logs": {"created": self.created[CBT], "duplicates": self.duplicates[CBT]},
+            "invalid": self.invalid,
+            "errors": self.errors,
+            "batches": self.batches,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "rows_per_second": round(self.processed / elapsed) if elapsed > 0 else None,
+        }
+
+
+_ROW_BUILDERS = {MOOD: mood_import_row, CBT: cbt_import_row}
+_BATCH_WRITERS = {MOOD: import_mood_entries_async, CBT: import_cbt_logs_async}
+_BATCH_STATEMENTS = {MOOD: mood_import_statements_async, CBT: cbt_import_statements_async}
+
+
+def _build_row(user_id: str, index: int, record: Record, progress: ImportProgress) -> Optional[Tuple[str, tuple]]:
+    """The row to insert for the `index`-th record, or None once it was counted as invalid."""
+    entity, value = record
+    if entity is None:
+        progress.record_error(value)
+        return None
+    try:
+        if not isinstance(value, dict):
+            raise ValueError("expected an object")
+        return _ROW_BUILDERS[entity](user_id, value)
+    except (KeyError, ValueError, TypeError) as e:
+        detail = f"missing field {e}" if isinstance(e, KeyError) else str(e)
+        progress.record_error(f"record {index}: {detail}")
+        return None
+
+
+def check_records(user_id: str, records: Iterable[Record]) -> ImportProgress:
+    """Count and describe the invalid records among `records` without writing anything."""
+    progress = ImportProgress()
+    for index, record in enumerate(records, 1):
+        _build_row(user_id, index, record, progress)
+    return progress
+
+
+async def import_records(
+    connection: Callable[[], AsyncContextManager],
+    user_id: str,
+    records: AsyncIterator[Record],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    progress: Optional[ImportProgress] = None,
+    on_batch: Optional[Callable[[ImportProgress], Awaitable[None]]] = None
+) -> ImportProgress:
+    """
+    Insert parsed records in batches of `batch_size` per entity. A connection
+    is taken from `connection()` for each batch only, not while parsing.
+
+    Committed batches stay committed if the stream later turns out to be
+    malformed; the `ImportFormatError` propagates with `progress` up to date.
+    """
+    progress = progress or ImportProgress()
+    pending: Dict[str, List[Tuple[str, tuple]]] = {MOOD: [], CBT: []}
+    index = 0
+
+    async def flush(entity: str) -> None:
+        rows, pending[entity] = pending[entity], []
+        if not rows:
+            return
+        start = time.perf_counter()
+        async with connection() as db:
+            result = await _BATCH_WRITERS[entity](db, user_id, rows)
+        metrics.observe("data.import.batch_ms", (time.perf_counter() - start) * 1000)
+        progress.created[entity] += result.created
+        progress.duplicates[entity] += result.duplicates
+        progress.batches += 1
+        logger.info("Import batch committed", extra={"entity": entity, "rows": len(rows), "processed": progress.processed})
+        if on_batch is not None:
+            await on_batch(progress)
+
+    async for entity, record in records:
+        index += 1
+        row = _build_row(user_id, index, (entity, record), progress)
+        if row is None:
+            continue
+        pending[entity].append(row)
+        if len(pending[entity]) >= batch_size:
+            await flush(entity)
+
+    for entity in (MOOD, CBT):
+        await flush(entity)
+    metrics.incr("data.import.rows", progress.processed)
+    return progress
+
+
+async def import_records_atomically(db: aiosqlite.Connection, user_id: str, records: List[Record]) -> ImportProgress:
+    """
+    Insert `records` of every entity in one transaction: all of them, or,
+    should any insert fail, none. Raises ValueError without writing anything
+    if a record is invalid; `check_records` tells which ones up front.
+    """
+    progress = ImportProgress()
+    pending: Dict[str, List[Tuple[str, tuple]]] = {MOOD: [], CBT: []}
+    for index, record in enumerate(records, 1):
+        row = _build_row(user_id, index, record, progress)
+        if row is not None:
+            pending[record[0]].append(row)
+    if progress.invalid:
+        raise ValueError(progress.errors[0])
+
+    statements = []
+    for entity, rows in pending.items():
+        if rows:
+            entity_statements, result = await _BATCH_STATEMENTS[entity](db, user_id, rows)
+            statements += entity_statements
+            progress.created[entity] += result.created
+            progress.duplicates[entity] += result.duplicates
+    if statements:
+        await execute_write_async(db, statements)
+        invalidate_user(user_id)
+        progress.batches = 1
+    metrics.incr("data.import.rows", progress.processed)
+    return progress
@@ -63,6 +63,47 @@ Return ONLY a valid JSON object with this structure:
     }}
   ]
 }}
+"""
+
+    DEFAULT_COMBINED_PROMPT = """
+You are a cognitive behavioral therapy assistant. Analyze the following automatic thought for cognitive distortions, then reframe it.
+
+Situation: {situation}
+Automatic Thought: {automatic_thought}
+
+First, identify which cognitive distortions (from the predefined list) are present in this thought.
+For each distortion detected, provide:
+1. The distortion name (must be exactly one of: {distortions})
+2. A brief reasoning explaining why this distortion applies
+
+Then, taking those distortions into account, generate exactly 3 rational reframes, each from a different perspective:
+1. Compassionate - A kind, understanding perspective
+2. Logical - A fact-based, analytical perspective
+3. Evidence-based - A perspective based on available evidence
+
+Return ONLY a valid JSON object with this structure:
+{{
+  "distortions": [
+    {{
+      "distortion": "exact distortion name",
+      "reasoning": "brief explanation"
+    }}
+  ],
+  "reframes": [
+    {{
+      "perspective": "Compassionate",
+      "content": "reframe content"
+    }},
+    {{
+      "perspective": "Logical",
+      "content": "reframe content"
+    }},
+    {{
+      "perspective": "Evidence-based",
+      "content": "reframe content"
+    }}
+  ]
+}}
 """
 
     def __init__(self):
@@ -142,6 +183,43 @@ Return ONLY a valid JSON object with this structure:
         logger.info("Using default reframing prompt template")
         return self._format_reframing_prompt(), "default"
 
+    async def get_combined_prompt(self, version: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Get the single-call detection and reframing prompt template.
+
+        Returns:
+            Tuple of (prompt_template, version_id)
+        """
+        if version:
+            db_gen = get_db()
+            try:
+                db = next(db_gen)
+                cursor = db.cursor()
+                cursor.execute(
+                    "SELECT id, template FROM prompt_versions WHERE version = ? AND prompt_type = ? AND is_active = 1",
+                    (version, "combined_analysis")
+                )
+                row = cursor.fetchone()
+                if row:
+                    template = row["template"]
+                    # Validate template has required placeholders
+                    if "{situation}" in template and "{automatic_thought}" in template:
+                        logger.info("Loaded combined prompt from DB", extra={"version": version})
+                        return template, row["id"]
+                    else:
+                        logger.error("DB combined prompt missing placeholders", extra={"version": version})
+            except Exception as e:
+                logger.error("Failed to load combined prompt from DB", extra={"error": str(e)})
+            finally:
+                try:
+                    next(db_gen)
+                except StopIteration:
+                    pass
+
+        # Use default template
+        logger.info("Using default combined prompt template")
+        return self._format_combined_prompt(), "default"
+
     def _format_distortion_prompt(self) -> str:
         """Format the default distortion prompt with distortions list."""
         distortions_str = '", "'.join(COGNITIVE_DISTORTIONS)
@@ -152,3 +230,8 @@ Return ONLY a valid JSON object with this structure:
         """Format the default reframing prompt."""
         # No placeholders to pre-format here, but returning for consistency
         return self.DEFAULT_REFRAMING_PROMPT
+
+    def _format_combined_prompt(self) -> str:
+        """Format the default combined prompt with distortions list."""
+        distortions_str = '", "'.join(COGNITIVE_DISTORTIONS)
+        return self.DEFAULT_COMBINED_PROMPT.replace("{distortions}", f'"{distortions_str}"')
@@ -0,0 +1,67 @@
+# backend/app/services/single_flight.py
+"""
+Single-flight: concurrent calls for the same key share one execution.
+
+The first caller for a key starts the work as a task; callers arriving while
+it runs wait for that task instead of starting their own, and every one of
+them receives its result or its exception. Each waiter can be cancelled on
+its own (e.g. by its request timing out) without affecting the others; the
+work itself is cancelled only once nobody is waiting for it any more.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.core.logging import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls by key; `name` prefixes its metrics."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `fn()`, or the call of it already in flight for `key`."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Tasks belong to the loop they were created on
+            self._loop = loop
+            self._flights = {}
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(loop.create_task(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+        else:
+            metrics.incr(f"{self.name}.coalesced")
+            logger.info("Call coalesced with one in flight", extra={"key_prefix": key[:12]})
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "coalesced": metrics.counter(f"{self.name}.coalesced"),
+        }
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
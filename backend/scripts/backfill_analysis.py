@@ -1,6 +1,7 @@
 import sqlite3
 import json
 import os
+import time
 from textblob import TextBlob
 
 # Add the parent directory to sys.path to potentially import from main if needed,
@@ -46,6 +47,12 @@ def backfill():
                     "UPDATE mood_entries SET ai_analysis = ? WHERE id = ?",
                     (json.dumps(analysis), entry_id)
                 )
+                # Surface the new analysis to delta-sync clients
+                cursor.execute(
+                    "INSERT INTO change_log (user_id, entity, entity_id, op, changed_at) "
+                    "SELECT user_id, 'mood', id, 'upsert', ? FROM mood_entries WHERE id = ?",
+                    (int(time.time() * 1000), entry_id)
+                )
                 updated_count += 1
         except Exception as e:
             print(f"Error analyzing entry {entry_id}: {e}")
@@ -0,0 +1,88 @@
+"""
+Compare export formats by size and by how fast a consumer can load them.
+
+    python scripts/bench_export.py [--rows 10000 100000] [--repeat 3]
+
+Every format is rendered through `app.services.exporter.render_export`. The
+columnar formats (arrow, parquet) need pyarrow and are skipped without it.
+Each format is then loaded the way a downstream pipeline would read it:
+json.loads, csv.reader, or pyarrow. The load time is the best of N runs.
+"""
+
+import argparse
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.exporter import EXPORT_FORMATS, render_export
+from scripts.bench_serialization import cbt_rows, mood_rows
+
+
+async def _chunks(rows, size=500):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def _render(format, moods, cbt_logs, table=None, compression=None):
+    pieces = render_export(format, _chunks(moods), _chunks(cbt_logs), table, compression)
+    return b"".join([piece async for piece in pieces])
+
+
+def _load(format, body):
+    if format == "json":
+        return json.loads(body)
+    if format == "csv":
+        return list(csv.reader(io.StringIO(body.decode())))
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if format == "arrow":
+        return pa.ipc.open_stream(body).read_all()
+    return pq.read_table(io.BytesIO(body))
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for n in args.rows:
+        moods, cbt_logs = mood_rows(n), cbt_rows(n)
+        print(f"\n{n} mood entries + {n} CBT logs")
+        print(f"{'format':<14}{'bytes':>14}{'load ms':>12}")
+        cases = [("json", None), ("json", "gzip"), ("csv", None), ("csv", "gzip")]
+        cases += [(format, None) for format in ("arrow", "parquet") if format in EXPORT_FORMATS]
+        for format, compression in cases:
+            if EXPORT_FORMATS[format].columnar:
+                # One file per table; report both together
+                bodies = [asyncio.run(_render(format, moods, cbt_logs, table)) for table in ("moods", "cbt_logs")]
+            else:
+                bodies = [asyncio.run(_render(format, moods, cbt_logs, compression=compression))]
+            size = sum(len(body) for body in bodies)
+
+            def load(format=format, compression=compression, bodies=bodies):
+                for body in bodies:
+                    _load(format, gzip.decompress(body) if compression else body)
+
+            label = f"{format}.gz" if compression else format
+            print(f"{label:<14}{size:>14,}{best_of(args.repeat, load) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compare the two ways list endpoints can serialize their rows.
+
+    python scripts/bench_serialization.py [--sizes 1000 10000 100000] [--repeat 3]
+
+"response_model" reproduces what FastAPI does for `response_model=List[...]`:
+validate every dict into the model, dump by alias, then json-encode.
+"fast" is `app.api.serialization.dump_json`, which renders the same bytes
+straight from the row dicts. Best-of-N wall time is reported per size.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from functools import partial
+from typing import List
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.serialization import dump_json
+from app.schemas.cbt import CBTLogPublic
+from app.schemas.mood import MoodPublic
+
+
+def mood_rows(n):
+    return [
+        {
+            "id": f"mood-{i}", "rating": i % 5 + 1, "emotions": ["calm", "tired"],
+            "note": "Long day at work but a good walk afterwards", "trigger": "work",
+            "behavior": "walk", "timestamp": 1_700_000_000_000 + i, "user_id": "1",
+            "ai_analysis": {"sentiment_score": 0.35, "subjectivity": 0.6, "keywords": ["long day", "good walk"]}
+        }
+        for i in range(n)
+    ]
+
+
+def cbt_rows(n):
+    return [
+        {
+            "id": f"cbt-{i}", "timestamp": 1_700_000_000_000 + i, "situation": "Presentation at work",
+            "automatic_thoughts": "Everyone will think I'm incompetent",
+            "distortions": ["Mind Reading", "Catastrophizing"],
+            "rational_response": "One presentation doesn't define my competence",
+            "mood_before": 2, "mood_after": 4, "behavioral_link": None, "user_id": "1"
+        }
+        for i in range(n)
+    ]
+
+
+def response_model_path(items, model):
+    adapter = TypeAdapter(List[model])
+    data = adapter.dump_python(adapter.validate_python(items), mode="json", by_alias=True)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'payload':<8} {'rows':>8} {'response_model ms':>18} {'fast ms':>9} {'speedup':>8}")
+    for name, make_rows, model in [("moods", mood_rows, MoodPublic), ("cbt", cbt_rows, CBTLogPublic)]:
+        for size in args.sizes:
+            rows = make_rows(size)
+            assert dump_json(rows, model) == response_model_path(rows, model)
+            slow = best_of(args.repeat, partial(response_model_path, rows, model))
+            fast = best_of(args.repeat, partial(dump_json, rows, model))
+            print(f"{name:<8} {size:>8} {slow:>18.1f} {fast:>9.1f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
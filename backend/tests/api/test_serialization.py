@@ -0,0 +1,55 @@
+# backend/tests/api/test_serialization.py
+
+import json
+from typing import List
+from pydantic import TypeAdapter
+from app.api.serialization import dump_json
+from app.schemas.cbt import CBTLogPublic
+from app.schemas.mood import MoodPublic
+
+
+def pydantic_path(items, model):
+    """What FastAPI does for a `response_model=List[model]` handler."""
+    adapter = TypeAdapter(List[model])
+    data = adapter.dump_python(adapter.validate_python(items), mode="json", by_alias=True)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+class TestDumpJson:
+    """The fast path must produce byte-identical output to the validating path."""
+
+    def test_moods_match_response_model(self):
+        """Test mood rows, with and without nested analysis, encode identically."""
+        rows = [
+            {
+                "id": "m1", "rating": 4, "emotions": ["calm", "happy"], "note": "café ☕",
+                "trigger": None, "behavior": "walk", "timestamp": 10, "user_id": "1",
+                "ai_analysis": {"sentiment_score": 0.5, "subjectivity": 0.1, "keywords": ["café"]}
+            },
+            {
+                "id": "m2", "rating": 1, "emotions": [], "note": None, "trigger": None,
+                "behavior": None, "timestamp": 5, "user_id": "1", "ai_analysis": None
+            },
+        ]
+        assert dump_json(rows, MoodPublic) == pydantic_path(rows, MoodPublic)
+
+    def test_cbt_logs_fill_defaults_and_nested_models(self):
+        """Test columns missing from a row get schema defaults and nested lists are aliased."""
+        rows = [
+            {
+                "id": "c1", "timestamp": 1, "situation": "s", "automatic_thoughts": "t",
+                "distortions": ["Labeling"], "rational_response": "r", "mood_before": 3,
+                "mood_after": None, "behavioral_link": None, "user_id": "1"
+            },
+            {
+                "id": "c2", "timestamp": 2, "situation": "s", "automatic_thoughts": "t",
+                "distortions": [], "rational_response": "r", "mood_before": 3, "mood_after": 5,
+                "behavioral_link": "b", "user_id": "1", "action_plan_status": "done",
+                "ai_analysis": {
+                    "suggestions": [{"distortion": "Labeling", "reasoning": "why", "confidence": 0.9}],
+                    "reframes": [{"perspective": "Logical", "content": "c"}],
+                    "prompt_version": "v1"
+                }
+            },
+        ]
+        assert dump_json(rows, CBTLogPublic) == pydantic_path(rows, CBTLogPublic)
@@ -0,0 +1,55 @@
+# backend/tests/conftest.py
+"""Fixtures and payload factories shared across the test modules."""
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.db import session
+from app.main import app
+from app.repositories.list_cache import list_cache
+
+
+def mood(mood_id: str, timestamp: int = 1, **fields) -> dict:
+    """A mood entry as the API accepts it; `fields` override or extend it."""
+    return {"id": mood_id, "rating": 3, "emotions": ["calm"], "timestamp": timestamp, **fields}
+
+
+def cbt_log(log_id: str, timestamp: int = 1, **fields) -> dict:
+    """A CBT log as the API accepts it; `fields` override or extend it."""
+    return {
+        "id": log_id,
+        "timestamp": timestamp,
+        "situation": "s",
+        "automaticThoughts": "t",
+        "distortions": ["Labeling"],
+        "rationalResponse": "r",
+        "moodBefore": 3,
+        **fields
+    }
+
+
+def cbt_log_record(log_id: str, timestamp: int = 1, **fields) -> dict:
+    """A CBT log as exports write it and imports read it, keyed by column name."""
+    return {
+        "id": log_id,
+        "timestamp": timestamp,
+        "situation": "s",
+        "automatic_thoughts": "t",
+        "distortions": ["Labeling"],
+        "rational_response": "r",
+        "mood_before": 3,
+        **fields
+    }
+
+
+@pytest.fixture
+async def async_client(tmp_path, monkeypatch):
+    """An async test client backed by a fresh database."""
+    monkeypatch.setattr(session, "DATABASE_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setattr(session, "_pool", None)
+    monkeypatch.setattr(session, "_async_pool", None)
+    list_cache.clear()
+    session.init_db()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    await session.close_async_db()
+    session.close_db()
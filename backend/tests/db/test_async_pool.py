@@ -0,0 +1,67 @@
+# backend/tests/db/test_async_pool.py
+
+import asyncio
+import pytest
+from app.db.async_pool import AsyncConnectionPool
+from app.db.pool import PoolTimeoutError, PoolClosedError
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+class TestAsyncConnectionPool:
+    """Tests for the aiosqlite connection pool."""
+
+    @pytest.fixture
+    async def pool(self, tmp_path):
+        pool = AsyncConnectionPool(str(tmp_path / "test.db"), max_size=1, timeout=0.2)
+        yield pool
+        await pool.close()
+
+    async def test_reuses_released_connection(self, pool):
+        """Test a released connection is handed out again."""
+        async with pool.connection() as first:
+            async with first.execute("PRAGMA busy_timeout") as cursor:
+                assert (await cursor.fetchone())[0] == 5000
+        async with pool.connection() as second:
+            assert second is first
+
+    async def test_waiter_receives_released_connection(self, pool):
+        """Test a coroutine waiting on an exhausted pool gets the next released connection."""
+        held = await pool.acquire()
+        waiter = asyncio.create_task(pool.acquire(timeout=2))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await pool.release(held)
+        assert await waiter is held
+        assert pool.stats()["in_use"] == 1
+        await pool.release(held)
+        assert pool.stats()["in_use"] == 0
+
+    async def test_exhausted_pool_times_out(self, pool):
+        """Test acquiring beyond max_size raises PoolTimeoutError after the timeout."""
+        held = await pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            await pool.acquire()
+        await pool.release(held)
+        assert pool.stats()["idle"] == 1
+
+    async def test_release_rolls_back_open_transaction(self, pool):
+        """Test uncommitted work does not leak to the next holder."""
+        async with pool.connection() as conn:
+            await conn.execute("CREATE TABLE t (x INTEGER)")
+            await conn.commit()
+            await conn.execute("INSERT INTO t VALUES (1)")
+        async with pool.connection() as conn:
+            async with conn.execute("SELECT COUNT(*) FROM t") as cursor:
+                assert (await cursor.fetchone())[0] == 0
+
+    async def test_closed_pool_rejects_acquire(self, pool):
+        """Test acquiring after close raises PoolClosedError."""
+        await pool.close()
+        with pytest.raises(PoolClosedError):
+            await pool.acquire()
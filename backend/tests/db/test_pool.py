@@ -0,0 +1,84 @@
+# backend/tests/db/test_pool.py
+
+import threading
+import pytest
+from app.db.pool import ConnectionPool, PoolTimeoutError, PoolClosedError
+
+
+class TestConnectionPool:
+    """Tests for the bounded SQLite connection pool."""
+
+    @pytest.fixture
+    def pool(self, tmp_path):
+        pool = ConnectionPool(str(tmp_path / "data" / "test.db"), max_size=2, timeout=0.2)
+        yield pool
+        pool.close()
+
+    def test_reuses_released_connection(self, pool):
+        """Test a released connection is handed out again instead of reopening."""
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            assert second is first
+        assert pool.stats()["size"] == 1
+
+    def test_applies_pragmas_once_per_connection(self, pool):
+        """Test configured PRAGMAs are set on new connections."""
+        with pool.connection() as conn:
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+    def test_exhausted_pool_times_out(self, pool):
+        """Test acquiring beyond max_size waits and then raises PoolTimeoutError."""
+        a = pool.acquire()
+        b = pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+        assert pool.stats()["utilization"] == 1.0
+        pool.release(a)
+        pool.release(b)
+
+    def test_waiter_receives_released_connection(self, pool):
+        """Test a blocked acquire is woken when another holder releases."""
+        a = pool.acquire()
+        b = pool.acquire()
+        got = []
+
+        def waiter():
+            got.append(pool.acquire(timeout=2))
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        pool.release(a)
+        thread.join()
+
+        assert got == [a]
+        assert pool.stats()["waits"] == 1
+        pool.release(got[0])
+        pool.release(b)
+
+    def test_release_rolls_back_open_transaction(self, pool):
+        """Test uncommitted work does not leak to the next holder."""
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.commit()
+            conn.execute("INSERT INTO t VALUES (1)")
+        with pool.connection() as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    def test_unhealthy_connection_is_replaced(self, tmp_path):
+        """Test a connection failing its health check is discarded on checkout."""
+        pool = ConnectionPool(str(tmp_path / "test.db"), max_size=1, health_check_interval=0)
+        with pool.connection() as conn:
+            broken = conn
+        broken.close()
+        with pool.connection() as conn:
+            assert conn is not broken
+            assert conn.execute("SELECT 1").fetchone()[0] == 1
+        pool.close()
+
+    def test_closed_pool_rejects_acquire(self, pool):
+        """Test acquiring after close raises PoolClosedError."""
+        pool.close()
+        with pytest.raises(PoolClosedError):
+            pool.acquire()
@@ -0,0 +1,31 @@
+# backend/tests/db/test_session.py
+
+import sqlite3
+from contextlib import closing
+from app.db import session
+
+
+class TestInitDb:
+    """Tests for schema setup on start."""
+
+    def test_adds_missing_columns_once(self, tmp_path, monkeypatch):
+        """Test a database from before a column migration catches up, and re-running is harmless."""
+        path = str(tmp_path / "test.db")
+        monkeypatch.setattr(session, "DATABASE_PATH", path)
+        with closing(sqlite3.connect(path)) as conn:
+            conn.execute(
+                """
+                CREATE TABLE data_jobs (
+                    id TEXT PRIMARY KEY, user_id TEXT NOT NULL, kind TEXT NOT NULL, status TEXT NOT NULL,
+                    format TEXT NOT NULL, params TEXT, idempotency_key TEXT, file_path TEXT,
+                    size_bytes INTEGER, progress TEXT, error TEXT, created_at INTEGER NOT NULL,
+                    updated_at INTEGER NOT NULL, finished_at INTEGER
+                )
+                """
+            )
+
+        session.init_db()
+        session.init_db()
+        with closing(sqlite3.connect(path)) as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(data_jobs)")]
+        assert columns[-2:] == ["lease_owner", "lease_expires_at"]
@@ -0,0 +1,81 @@
+# backend/tests/db/test_writer.py
+
+import sqlite3
+import threading
+import pytest
+from app.db.pool import ConnectionPool
+from app.db.writer import Statement, WriteQueue
+
+
+class TestWriteQueue:
+    """Tests for the WAL single-writer queue."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "test.db")
+
+    @pytest.fixture
+    def writer(self, db_path):
+        writer = WriteQueue(db_path, pragmas={"journal_mode": "WAL", "synchronous": "NORMAL"})
+        writer.execute([Statement("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")])
+        yield writer
+        writer.close()
+
+    def test_enables_wal_journal(self, writer, db_path):
+        """Test the writer switches the database file to WAL."""
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        conn.close()
+
+    def test_execute_returns_rowcounts(self, writer):
+        """Test statements run in order and report their row counts."""
+        rowcounts = writer.execute([
+            Statement("INSERT INTO items (name) VALUES (?)", [("a",), ("b",)], many=True),
+            Statement("UPDATE items SET name = name || '!'"),
+        ])
+        assert rowcounts == [2, 2]
+
+    def test_failing_job_does_not_affect_batch_mates(self, writer, db_path):
+        """Test a job that raises is rolled back alone and its error reaches the caller."""
+        futures = [
+            writer.submit(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('x')").rowcount),
+            writer.submit(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('x')").rowcount),
+            writer.submit(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('y')").rowcount),
+        ]
+        assert futures[0].result() == 1
+        with pytest.raises(sqlite3.IntegrityError):
+            futures[1].result()
+        assert futures[2].result() == 1
+
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+        conn.close()
+
+    def test_concurrent_writes_do_not_lock(self, writer):
+        """Test bursts of writes from many threads all succeed."""
+        errors = []
+
+        def insert(n):
+            try:
+                writer.execute([Statement("INSERT INTO items (name) VALUES (?)", (f"item-{n}",))])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=insert, args=(n,)) for n in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert writer.run(lambda conn: conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]) == 50
+
+    def test_read_only_pool_sees_committed_writes(self, writer, db_path):
+        """Test readers in a read-only pool observe writes made through the queue."""
+        readers = ConnectionPool(db_path, max_size=2, read_only=True)
+        writer.execute([Statement("INSERT INTO items (name) VALUES ('r')")])
+        with readers.connection() as conn:
+            assert conn.execute("SELECT name FROM items").fetchone()["name"] == "r"
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO items (name) VALUES ('nope')")
+        readers.close()
@@ -0,0 +1,194 @@
+# backend/tests/integration/test_ai_jobs.py
+
+import pytest
+from unittest.mock import Mock, patch
+from app.core.metrics import metrics
+from app.db import session
+from app.repositories.ai_jobs import FAILED, RUNNING, claim_ai_job_async, enqueue_ai_job_async, get_ai_job_async
+from app.services import ai_jobs
+from app.services.gemini_client import SafetyException
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+REQUEST = {"situation": "I got a bad grade", "automatic_thought": "I'll never succeed"}
+
+RESPONSE = {
+    "suggestions": [{"distortion": "Overgeneralization", "reasoning": "Uses 'never'"}],
+    "reframes": [{"perspective": "Logical", "content": "One grade is one grade."}],
+    "prompt_version": "1.0.0"
+}
+
+
+def ai_client(analyze):
+    client = Mock()
+    client.analyze_cbt = analyze
+    return client
+
+
+@pytest.mark.anyio
+class TestAnalysisJobs:
+    """Integration tests for the asynchronous analysis queue."""
+
+    @pytest.fixture
+    async def async_client(self, async_client, monkeypatch):
+        """The shared client, with a fresh worker pool."""
+        monkeypatch.setattr(ai_jobs, "_workers", None)
+        monkeypatch.setattr(ai_jobs, "AI_JOB_POLL_INTERVAL_SECONDS", 0.05)
+        yield async_client
+        await ai_jobs.get_analysis_workers().shutdown()
+
+    async def test_async_mode_returns_job_and_result(self, async_client):
+        """Test mode=async answers 202 at once and the job later holds the result."""
+        async def analyze(request):
+            return RESPONSE
+
+        with patch("app.services.ai_jobs.get_ai_client", return_value=ai_client(analyze)):
+            response = await async_client.post("/api/v1/cbt-logs/analyze?mode=async", json=REQUEST)
+            assert response.status_code == 202
+            job = response.json()
+            assert job["status"] == "queued"
+            assert response.headers["location"] == f"/api/v1/cbt-logs/analyze/jobs/{job['id']}"
+
+            response = await async_client.get(response.headers["location"] + "?wait=5")
+
+        assert response.status_code == 200
+        job = response.json()
+        assert job["status"] == "succeeded"
+        assert job["attempts"] == 1
+        assert job["result"]["suggestions"][0]["distortion"] == "Overgeneralization"
+        assert job["result"]["promptVersion"] == "1.0.0"
+        assert job["error"] is None
+
+        # The request text is not kept once the job has finished
+        async with session.get_async_pool().connection() as db:
+            assert (await get_ai_job_async(db, "1", job["id"]))["request"] is None
+
+    async def test_failed_job_records_sync_error(self, async_client):
+        """Test a failed job carries the status and detail the sync endpoint would return."""
+        async def analyze(request):
+            raise SafetyException("Safety message", [{"name": "Test Crisis Line", "phone": "988"}])
+
+        with patch("app.services.ai_jobs.get_ai_client", return_value=ai_client(analyze)):
+            response = await async_client.post("/api/v1/cbt-logs/analyze?mode=async", json=REQUEST)
+            response = await async_client.get(response.headers["location"] + "?wait=5")
+
+        job = response.json()
+        assert job["status"] == "failed"
+        assert job["error"]["statusCode"] == 451
+        assert job["error"]["detail"]["trigger"] == "safety"
+        assert job["result"] is None
+
+    async def test_job_waits_in_queue_when_admission_is_full(self, async_client):
+        """Test a job rejected by admission control is put back and run later, not failed."""
+        from app.services.admission import AdmissionRejected
+
+        calls = []
+
+        async def analyze(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise AdmissionRejected(1)
+            return RESPONSE
+
+        with patch("app.services.ai_jobs.get_ai_client", return_value=ai_client(analyze)):
+            response = await async_client.post("/api/v1/cbt-logs/analyze?mode=async", json=REQUEST)
+            response = await async_client.get(response.headers["location"] + "?wait=5")
+
+        job = response.json()
+        assert job["status"] == "succeeded"
+        assert job["attempts"] == 1
+        assert len(calls) == 2
+
+    async def test_long_poll_holds_no_connection_while_waiting(self, async_client):
+        """Test a waiting job poll leaves the pool free for other requests."""
+        import asyncio
+
+        async with session.get_async_pool().connection() as db:
+            job = await enqueue_ai_job_async(db, "1", REQUEST)
+
+        poll = asyncio.ensure_future(async_client.get(f"/api/v1/cbt-logs/analyze/jobs/{job['id']}?wait=0.3"))
+        await asyncio.sleep(0.1)
+        assert session.get_async_pool().stats()["in_use"] == 0
+        response = await poll
+        assert response.json()["status"] == "queued"
+
+    async def test_concurrent_polls_all_wake_when_the_job_finishes(self, async_client, monkeypatch):
+        """Test a poll that times out does not keep another poll of the same job from waking."""
+        import asyncio
+        import time
+
+        monkeypatch.setattr(ai_jobs, "AI_JOB_POLL_INTERVAL_SECONDS", 5)
+        release = asyncio.Event()
+
+        async def analyze(request):
+            await release.wait()
+            return RESPONSE
+
+        async with session.get_async_pool().connection() as db:
+            job = await enqueue_ai_job_async(db, "1", REQUEST)
+
+        with patch("app.services.ai_jobs.get_ai_client", return_value=ai_client(analyze)):
+            workers = ai_jobs.get_analysis_workers()
+            workers.start()
+            long_poll = asyncio.ensure_future(workers.wait(job["id"], 5))
+            await workers.wait(job["id"], 0.01)
+            start = time.monotonic()
+            release.set()
+            await long_poll
+
+        assert time.monotonic() - start < 1
+        assert workers._finished == {} and workers._waiters == {}
+
+    async def test_queued_jobs_survive_restart(self, async_client):
+        """Test jobs queued while no worker ran are drained once workers start."""
+        async with session.get_async_pool().connection() as db:
+            queued = [await enqueue_ai_job_async(db, "1", REQUEST) for _ in range(3)]
+
+        async def analyze(request):
+            return RESPONSE
+
+        with patch("app.services.ai_jobs.get_ai_client", return_value=ai_client(analyze)):
+            ai_jobs.get_analysis_workers().start()
+            for job in queued:
+                response = await async_client.get(f"/api/v1/cbt-logs/analyze/jobs/{job['id']}?wait=5")
+                assert response.json()["status"] == "succeeded"
+
+        snapshot = metrics.snapshot()
+        assert snapshot["gauges"]["ai_jobs.queue_depth"] == 0
+        assert snapshot["ai_jobs"]["wait_ms"]["count"] >= 3
+
+    async def test_expired_lease_is_reclaimed_then_failed(self, async_client):
+        """Test a job whose worker died is claimed again, and failed after the last attempt."""
+        async with session.get_async_pool().connection() as db:
+            job = await enqueue_ai_job_async(db, "1", REQUEST)
+
+            first = await claim_ai_job_async(db, "a", lease_ms=-1, max_attempts=2)
+            assert first["id"] == job["id"] and first["status"] == RUNNING
+            # Another worker takes over once the lease has expired
+            second = await claim_ai_job_async(db, "b", lease_ms=-1, max_attempts=2)
+            assert second["id"] == job["id"] and second["attempts"] == 2
+            assert second["lease_owner"] != first["lease_owner"]
+
+            assert await claim_ai_job_async(db, "c", lease_ms=60_000, max_attempts=2) is None
+            failed = await get_ai_job_async(db, "1", job["id"])
+            assert failed["status"] == FAILED
+            assert failed["error"]["status_code"] == 503
+
+    async def test_active_lease_is_not_claimed_twice(self, async_client):
+        """Test two workers never hold the same job."""
+        async with session.get_async_pool().connection() as db:
+            await enqueue_ai_job_async(db, "1", REQUEST)
+            assert await claim_ai_job_async(db, "a", lease_ms=60_000, max_attempts=3) is not None
+            assert await claim_ai_job_async(db, "b", lease_ms=60_000, max_attempts=3) is None
+
+    async def test_unknown_job_and_mode(self, async_client):
+        """Test an unknown job is a 404 and an unknown mode is rejected."""
+        response = await async_client.get("/api/v1/cbt-logs/analyze/jobs/missing")
+        assert response.status_code == 404
+
+        response = await async_client.post("/api/v1/cbt-logs/analyze?mode=later", json=REQUEST)
+        assert response.status_code == 422
@@ -0,0 +1,58 @@
+# backend/tests/integration/test_bulk_endpoints.py
+
+import pytest
+from unittest.mock import patch
+from app.repositories.bulk import MAX_BULK_ITEMS
+from tests.conftest import cbt_log, mood
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+class TestBulkEndpoints:
+    """Integration tests for the bulk create endpoints."""
+
+    async def test_bulk_moods_report_per_item_results(self, async_client):
+        """Test new ids are created and existing or repeated ids are reported as duplicates."""
+        await async_client.post("/api/v1/moods/", json=mood("m0"))
+
+        with patch("app.repositories.mood.analyze_mood_notes") as analyze:
+            analyze.return_value = [{"sentiment_score": 0.5, "subjectivity": 0.5, "keywords": []}, None]
+            response = await async_client.post(
+                "/api/v1/moods/bulk",
+                json=[mood("m0"), mood("m1", note="good day"), mood("m2"), mood("m1")]
+            )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["created"] == 2 and body["duplicates"] == 2
+        assert [r["status"] for r in body["results"]] == ["duplicate", "created", "created", "duplicate"]
+        # Notes of the new entries are analyzed in a single batched call
+        analyze.assert_called_once_with(["good day", None])
+
+        moods = (await async_client.get("/api/v1/moods/")).json()
+        assert sorted(m["id"] for m in moods) == ["m0", "m1", "m2"]
+        assert next(m for m in moods if m["id"] == "m1")["aiAnalysis"]["sentimentScore"] == 0.5
+
+        synced = (await async_client.get("/api/v1/sync")).json()
+        assert sorted(m["id"] for m in synced["moods"]) == ["m0", "m1", "m2"]
+
+    async def test_bulk_cbt_logs(self, async_client):
+        """Test CBT logs are bulk inserted and a replay is all duplicates."""
+        batch = [cbt_log(f"c{i}") for i in range(5)]
+        first = (await async_client.post("/api/v1/cbt-logs/bulk", json=batch)).json()
+        assert first["created"] == 5
+        replay = (await async_client.post("/api/v1/cbt-logs/bulk", json=batch)).json()
+        assert replay["created"] == 0 and replay["duplicates"] == 5
+        assert len((await async_client.get("/api/v1/cbt-logs/")).json()) == 5
+
+    async def test_bulk_size_is_bounded(self, async_client):
+        """Test oversized batches are rejected."""
+        response = await async_client.post(
+            "/api/v1/cbt-logs/bulk",
+            json=[cbt_log(f"c{i}") for i in range(MAX_BULK_ITEMS + 1)]
+        )
+        assert response.status_code == 422
@@ -1,10 +1,8 @@
 # backend/tests/integration/test_cbt_analyze_endpoint.py
 
 import pytest
-from httpx import AsyncClient, ASGITransport
 from fastapi import status
 from unittest.mock import Mock, patch
-from app.main import app
 
 
 @pytest.fixture
@@ -16,12 +14,6 @@ def anyio_backend():
 class TestCBTAnalyzeEndpoint:
     """Integration tests for the /analyze endpoint."""
 
-    @pytest.fixture
-    async def async_client(self):
-        """Create an async test client for the FastAPI app."""
-        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-            yield client
-
     @pytest.fixture
     def valid_request(self):
         """Create a valid CBT analysis request."""
@@ -216,3 +208,68 @@ class TestCBTAnalyzeEndpoint:
         data = response.json()
         assert data["suggestions"] == []
         assert data["reframes"] == []
+
+    @patch('app.api.v1.routes.cbt_logs.get_ai_client')
+    async def test_analyze_stream_sends_events(self, mock_get_client, async_client, valid_request):
+        """Test /analyze/stream sends each event as Server-Sent Events."""
+        from app.schemas.cbt import CBTAnalysisResponse
+        from app.services.analysis_stream import response_events
+
+        async def mock_stream(*args, **kwargs):
+            response = CBTAnalysisResponse(
+                suggestions=[],
+                reframes=[{"perspective": "Logical", "content": "c"}],
+                prompt_version="1.0.0"
+            )
+            for event in response_events(response):
+                yield event
+
+        mock_client = Mock()
+        mock_client.analyze_cbt_stream = mock_stream
+        mock_get_client.return_value = mock_client
+
+        response = await async_client.post("/api/v1/cbt-logs/analyze/stream", json=valid_request)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [block.split("\n")[0] for block in response.text.strip().split("\n\n")]
+        assert events == ["event: distortions", "event: reframe", "event: done"]
+
+    @patch('app.api.v1.routes.cbt_logs.get_ai_client')
+    async def test_analyze_stream_ends_with_safety_event(self, mock_get_client, async_client, valid_request):
+        """Test a safety trigger mid-stream arrives as a terminal error event."""
+        import json
+        from app.services.analysis_stream import AnalysisEvent
+        from app.services.gemini_client import SafetyException
+
+        async def mock_stream(*args, **kwargs):
+            yield AnalysisEvent("distortions", {"suggestions": [], "promptVersion": "1.0.0"})
+            raise SafetyException("Safety message", [{"name": "Test Crisis Line", "phone": "988"}])
+
+        mock_client = Mock()
+        mock_client.analyze_cbt_stream = mock_stream
+        mock_get_client.return_value = mock_client
+
+        response = await async_client.post("/api/v1/cbt-logs/analyze/stream", json=valid_request)
+
+        blocks = response.text.strip().split("\n\n")
+        assert [block.split("\n")[0] for block in blocks] == ["event: distortions", "event: error"]
+        error = json.loads(blocks[-1].split("data: ", 1)[1])
+        assert error["statusCode"] == status.HTTP_451_UNAVAILABLE_FOR_LEGAL_REASONS
+        assert error["detail"]["trigger"] == "safety"
+
+    @patch('app.api.v1.routes.cbt_logs.get_ai_client')
+    async def test_analyze_endpoint_sheds_load_with_retry_after(self, mock_get_client, async_client, valid_request):
+        """Test an analysis rejected by admission control is a 429 with Retry-After."""
+        from app.services.admission import AdmissionRejected
+
+        mock_client = Mock()
+        async def mock_analyze(*args, **kwargs): raise AdmissionRejected(7)
+        mock_client.analyze_cbt = mock_analyze
+        mock_get_client.return_value = mock_client
+
+        response = await async_client.post("/api/v1/cbt-logs/analyze", json=valid_request)
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers["retry-after"] == "7"
+        assert "7 seconds" in response.json()["detail"]
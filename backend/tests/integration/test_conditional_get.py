@@ -0,0 +1,84 @@
+# backend/tests/integration/test_conditional_get.py
+
+import pytest
+from unittest.mock import patch
+from app.api.conditional import etag_matches
+from app.repositories.list_cache import list_cache
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_etag_matches_weak_and_lists():
+    """Test If-None-Match parsing accepts lists, weak tags and '*'."""
+    assert etag_matches('"1-a"', '"0-a", W/"1-a"')
+    assert etag_matches('"1-a"', "*")
+    assert not etag_matches('"1-a"', '"1-b"')
+    assert not etag_matches('"1-a"', None)
+
+
+@pytest.mark.anyio
+class TestConditionalGet:
+    """Integration tests for ETag / If-None-Match on read endpoints."""
+
+
+    @pytest.mark.parametrize("path", ["/api/v1/moods/", "/api/v1/cbt-logs/", "/api/v1/data/export"])
+    async def test_not_modified_until_write(self, async_client, path):
+        """Test a matching ETag yields 304 and a write invalidates it."""
+        first = await async_client.get(path)
+        etag = first.headers["ETag"]
+
+        with patch("app.api.v1.routes.moods.get_mood_page_async") as moods, \
+             patch("app.api.v1.routes.cbt_logs.get_cbt_page_async") as logs, \
+             patch("app.api.v1.routes.data.open_export") as export:
+            repeat = await async_client.get(path, headers={"If-None-Match": etag})
+        assert repeat.status_code == 304
+        assert repeat.headers["ETag"] == etag
+        assert repeat.content == b""
+        # Answered without touching the repositories
+        assert not (moods.called or logs.called or export.called)
+
+        await async_client.post(
+            "/api/v1/moods/",
+            json={"id": "m1", "rating": 3, "emotions": ["calm"], "timestamp": 1}
+        )
+        after = await async_client.get(path, headers={"If-None-Match": etag})
+        assert after.status_code == 200
+        assert after.headers["ETag"] != etag
+
+    async def test_etag_varies_with_query(self, async_client):
+        """Test different slices of the same data get different ETags."""
+        full = await async_client.get("/api/v1/moods/")
+        page = await async_client.get("/api/v1/moods/", params={"limit": 1})
+        assert full.headers["ETag"] != page.headers["ETag"]
+        csv = await async_client.get("/api/v1/data/export", params={"format": "csv"})
+        assert csv.headers["ETag"] != (await async_client.get("/api/v1/data/export")).headers["ETag"]
+
+    @pytest.mark.parametrize("fast", [True, False])
+    async def test_list_body_independent_of_serialization_mode(self, async_client, monkeypatch, fast):
+        """Test the fast and validating serialization paths return the same JSON and cursor."""
+        monkeypatch.setattr("app.api.v1.routes.moods.FAST_SERIALIZATION", fast)
+        for i in range(3):
+            await async_client.post(
+                "/api/v1/moods/",
+                json={"id": f"m{i}", "rating": 3, "emotions": ["calm"], "timestamp": i}
+            )
+        page = await async_client.get("/api/v1/moods/", params={"limit": 2})
+        assert page.headers["content-type"] == "application/json"
+        assert "X-Next-Cursor" in page.headers and "ETag" in page.headers
+        assert [m["id"] for m in page.json()] == ["m2", "m1"]
+        assert set(page.json()[0]) >= {"userId", "aiAnalysis", "emotions"}
+
+    async def test_fast_path_caches_each_page_once(self, async_client, monkeypatch):
+        """Test a list page is cached as rendered JSON only, not also as decoded rows."""
+        monkeypatch.setattr("app.api.v1.routes.moods.FAST_SERIALIZATION", True)
+        await async_client.post("/api/v1/moods/", json={"id": "m1", "rating": 3, "emotions": ["calm"], "timestamp": 1})
+
+        await async_client.get("/api/v1/moods/", params={"limit": 2})
+        assert len(list_cache) == 1
+        with patch("app.api.v1.routes.moods.get_mood_page_async") as moods:
+            cached = await async_client.get("/api/v1/moods/", params={"limit": 2})
+        assert not moods.called
+        assert [m["id"] for m in cached.json()] == ["m1"]
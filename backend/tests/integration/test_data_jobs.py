@@ -0,0 +1,237 @@
+# backend/tests/integration/test_data_jobs.py
+
+import asyncio
+import gzip
+import io
+import json
+import os
+import time
+import pytest
+from app.db import session
+from app.repositories.data_jobs import (
+    RUNNING,
+    SUCCEEDED,
+    claim_job_async,
+    create_job_async,
+    get_job_async,
+    update_job_async
+)
+from app.services import data_jobs
+from tests.conftest import mood
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+NOTE = "n" * 200
+
+
+@pytest.mark.anyio
+class TestDataJobs:
+    """Integration tests for background export and import jobs."""
+
+    @pytest.fixture
+    async def async_client(self, async_client, tmp_path, monkeypatch):
+        """The shared client, with a fresh job runner and job directory."""
+        monkeypatch.setattr(data_jobs, "DATA_JOBS_DIR", str(tmp_path / "jobs"))
+        monkeypatch.setattr(data_jobs, "_runner", None)
+        yield async_client
+        await data_jobs.get_job_runner().shutdown()
+
+    async def _import(self, client, lines, key=None):
+        headers = {"Content-Type": "application/x-ndjson"}
+        if key:
+            headers["Idempotency-Key"] = key
+        return await client.post(
+            "/api/v1/data/imports?batch_size=10",
+            content="\n".join(json.dumps(line) for line in lines),
+            headers=headers
+        )
+
+    async def test_import_job_reports_progress(self, async_client):
+        """Test an import job runs in the background and records its counts."""
+        response = await self._import(async_client, [{"type": "mood", **mood(f"m{i}", note=NOTE)} for i in range(25)])
+        assert response.status_code == 202
+        job = response.json()
+        assert job["kind"] == "import"
+        assert response.headers["location"] == f"/api/v1/data/imports/{job['id']}"
+
+        await data_jobs.get_job_runner().join()
+        job = (await async_client.get(f"/api/v1/data/imports/{job['id']}")).json()
+        assert job["status"] == "succeeded"
+        assert job["progress"]["moods"] == {"created": 25, "duplicates": 0}
+        assert job["progress"]["batches"] == 3
+        assert job["finishedAt"] is not None
+
+    async def test_import_job_is_idempotent(self, async_client):
+        """Test a retried upload with the same key returns the original job."""
+        lines = [{"type": "mood", **mood("m1", note=NOTE)}]
+        first = await self._import(async_client, lines, key="upload-1")
+        await data_jobs.get_job_runner().join()
+        retry = await self._import(async_client, lines + [{"type": "mood", **mood("m2", note=NOTE)}], key="upload-1")
+
+        assert retry.status_code == 200
+        assert retry.json()["id"] == first.json()["id"]
+        assert retry.json()["status"] == "succeeded"
+        response = await async_client.get("/api/v1/moods/")
+        assert [m["id"] for m in response.json()] == ["m1"]
+
+    async def test_upload_holds_no_connection_while_streaming(self, async_client):
+        """Test the pool stays free while an import body arrives, and the job is queued after it."""
+        arrived = asyncio.Event()
+        proceed = asyncio.Event()
+
+        async def body():
+            yield json.dumps({"type": "mood", **mood("m1", note=NOTE)}).encode() + b"\n"
+            arrived.set()
+            await proceed.wait()
+            yield json.dumps({"type": "mood", **mood("m2", note=NOTE)}).encode()
+
+        upload = asyncio.ensure_future(async_client.post(
+            "/api/v1/data/imports", content=body(), headers={"Content-Type": "application/x-ndjson"}
+        ))
+        await arrived.wait()
+        assert session.get_async_pool().stats()["in_use"] == 0
+        proceed.set()
+        response = await upload
+        assert response.status_code == 202
+        assert response.json()["sizeBytes"] > 0
+
+        await data_jobs.get_job_runner().join()
+        job = (await async_client.get(f"/api/v1/data/imports/{response.json()['id']}")).json()
+        assert job["progress"]["moods"]["created"] == 2
+
+    async def test_import_job_holds_no_connection_between_batches(self, async_client, monkeypatch):
+        """Test an import job only takes a connection to write a batch, not while parsing."""
+        parse = data_jobs.PARSERS["ndjson"]
+        in_use = []
+
+        async def watched_parse(chunks):
+            async for record in parse(chunks):
+                in_use.append(session.get_async_pool().stats()["in_use"])
+                yield record
+
+        monkeypatch.setitem(data_jobs.PARSERS, "ndjson", watched_parse)
+        await self._import(async_client, [{"type": "mood", **mood(f"m{i}", note=NOTE)} for i in range(25)])
+        await data_jobs.get_job_runner().join()
+        assert len(in_use) == 25 and max(in_use) == 0
+
+    async def test_export_job_supports_range_download(self, async_client):
+        """Test an export artifact can be downloaded in resumable ranges."""
+        await self._import(async_client, [{"type": "mood", **mood(f"m{i}", note=NOTE)} for i in range(50)])
+        await data_jobs.get_job_runner().join()
+
+        response = await async_client.post("/api/v1/data/exports?format=json", headers={"Idempotency-Key": "e1"})
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+        await data_jobs.get_job_runner().join()
+
+        job = (await async_client.get(f"/api/v1/data/exports/{job_id}")).json()
+        assert job["status"] == "succeeded"
+        assert job["downloadUrl"] == f"/api/v1/data/exports/{job_id}/download"
+
+        full = await async_client.get(job["downloadUrl"])
+        assert full.status_code == 200
+        assert full.headers["accept-ranges"] == "bytes"
+        assert int(full.headers["content-length"]) == job["sizeBytes"]
+        assert "mindfultrack_export.json.gz" in full.headers["content-disposition"]
+
+        # Resume after the first 100 bytes, guarded by the artifact's ETag
+        rest = await async_client.get(
+            job["downloadUrl"],
+            headers={"Range": "bytes=100-", "If-Range": full.headers["etag"]}
+        )
+        assert rest.status_code == 206
+        assert full.content[:100] + rest.content == full.content
+
+        exported = json.loads(gzip.decompress(full.content))
+        assert len(exported["moodEntries"]) == 50
+
+        again = await async_client.post("/api/v1/data/exports?format=json", headers={"Idempotency-Key": "e1"})
+        assert again.status_code == 200
+        assert again.json()["id"] == job_id
+
+    async def test_download_before_ready_and_unknown_job(self, async_client):
+        """Test downloads are refused until the artifact exists."""
+        async with session.get_async_pool().connection() as db:
+            job = await create_job_async(db, "1", "export", "csv")
+        response = await async_client.get(f"/api/v1/data/exports/{job['id']}/download")
+        assert response.status_code == 409
+        response = await async_client.get("/api/v1/data/exports/missing")
+        assert response.status_code == 404
+        response = await async_client.post("/api/v1/data/exports?format=xml")
+        assert response.status_code == 400
+
+    async def test_resume_requeues_interrupted_jobs(self, async_client):
+        """Test jobs left running by a stopped process are picked up again."""
+        async with session.get_async_pool().connection() as db:
+            job = await create_job_async(db, "1", "export", "md")
+            await update_job_async(db, job["id"], status=RUNNING)
+
+        runner = data_jobs.get_job_runner()
+        await runner.resume()
+        await runner.join()
+        response = await async_client.get(f"/api/v1/data/exports/{job['id']}")
+        assert response.json()["status"] == "succeeded"
+        assert not [name for name in os.listdir(data_jobs.DATA_JOBS_DIR) if name.endswith(".partial")]
+
+    async def test_leased_job_runs_in_one_runner_only(self, async_client):
+        """Test a job leased by a live runner is left alone until its lease expires."""
+        async with session.get_async_pool().connection() as db:
+            job = await create_job_async(db, "1", "export", "md")
+            claimed = await claim_job_async(db, job["id"], "other-host:1", 60_000)
+            assert claimed["lease_owner"].startswith("other-host:1:")
+            assert await claim_job_async(db, job["id"], "this-host:2", 60_000) is None
+
+        runner = data_jobs.get_job_runner()
+        await runner.resume()
+        await runner.join()
+        response = await async_client.get(f"/api/v1/data/exports/{job['id']}")
+        assert response.json()["status"] == RUNNING
+
+        # The other runner died; once its lease runs out the job is taken over
+        async with session.get_async_pool().connection() as db:
+            await update_job_async(db, job["id"], lease_expires_at=int(time.time() * 1000) - 1)
+        await runner.resume()
+        await runner.join()
+        response = await async_client.get(f"/api/v1/data/exports/{job['id']}")
+        assert response.json()["status"] == SUCCEEDED
+
+    async def test_expired_jobs_are_pruned_periodically(self, async_client, monkeypatch):
+        """Test the runner keeps deleting expired jobs and their files after start."""
+        monkeypatch.setattr(data_jobs, "DATA_JOB_MAINTENANCE_INTERVAL_SECONDS", 0.01)
+        runner = data_jobs.get_job_runner()
+        await runner.resume()
+
+        path = data_jobs.job_file_path("old", "upload")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "wb").close()
+        async with session.get_async_pool().connection() as db:
+            job = await create_job_async(db, "1", "import", "ndjson")
+            await update_job_async(db, job["id"], status=SUCCEEDED, file_path=path)
+            await update_job_async(db, job["id"], finished_at=1)
+
+            for _ in range(100):
+                if await get_job_async(db, "1", job["id"]) is None:
+                    break
+                await asyncio.sleep(0.01)
+            assert await get_job_async(db, "1", job["id"]) is None
+        assert not os.path.exists(path)
+
+    async def test_columnar_export_job(self, async_client):
+        """Test a Parquet export job writes a single-table artifact without gzip."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        await self._import(async_client, [{"type": "mood", **mood(f"m{i}", note=NOTE)} for i in range(5)])
+        await data_jobs.get_job_runner().join()
+
+        response = await async_client.post("/api/v1/data/exports?format=parquet")
+        assert response.status_code == 400
+        response = await async_client.post("/api/v1/data/exports?format=parquet&table=moods")
+        await data_jobs.get_job_runner().join()
+
+        download = await async_client.get(f"/api/v1/data/exports/{response.json()['id']}/download")
+        assert download.headers["content-type"] == "application/vnd.apache.parquet"
+        assert "mindfultrack_moods.parquet" in download.headers["content-disposition"]
+        assert pq.read_table(io.BytesIO(download.content)).num_rows == 5
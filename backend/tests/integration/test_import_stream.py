@@ -0,0 +1,135 @@
+# backend/tests/integration/test_import_stream.py
+
+import asyncio
+import json
+import pytest
+from app.db import session
+from app.db.writer import Statement
+from app.repositories.changes import CBT
+from app.repositories.list_cache import list_cache
+from app.services import importer
+from tests.conftest import cbt_log_record, mood
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+ANALYSIS = {"sentiment_score": 0.1, "subjectivity": 0.2, "keywords": []}
+
+
+@pytest.mark.anyio
+class TestImportStream:
+    """Integration tests for the streaming import endpoint."""
+
+    async def test_ndjson_in_batches(self, async_client):
+        """Test NDJSON is inserted in batches with duplicates and invalid rows counted."""
+        lines = [{"type": "mood", **mood(f"m{i}", ai_analysis=ANALYSIS)} for i in range(5)]
+        lines += [{"type": "mood", **mood("m0")}, {"type": "cbt", **cbt_log_record("c1")}, {"type": "cbt", "id": "broken"}]
+        body = "\n".join(json.dumps(line) for line in lines)
+
+        response = await async_client.post(
+            "/api/v1/data/import/stream",
+            params={"batch_size": 2},
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+        summary = response.json()
+        assert summary["moods"] == {"created": 5, "duplicates": 1}
+        assert summary["cbtLogs"] == {"created": 1, "duplicates": 0}
+        assert summary["invalid"] == 1 and "missing field" in summary["errors"][0]
+        assert summary["message"] == "Data imported; 1 invalid records were skipped"
+        assert summary["batches"] == 4
+
+        moods = (await async_client.get("/api/v1/moods/")).json()
+        assert len(moods) == 5 and moods[0]["aiAnalysis"]["sentimentScore"] == 0.1
+
+    async def test_export_round_trip(self, async_client, tmp_path, monkeypatch):
+        """Test the output of /export imports cleanly into a fresh database."""
+        for i in range(3):
+            await async_client.post("/api/v1/moods/", json=mood(f"m{i}", i))
+        exported = (await async_client.get("/api/v1/data/export")).content
+
+        await session.close_async_db()
+        session.close_db()
+        monkeypatch.setattr(session, "DATABASE_PATH", str(tmp_path / "other.db"))
+        list_cache.clear()
+        session.init_db()
+
+        summary = (await async_client.post(
+            "/api/v1/data/import/stream", content=exported, headers={"Content-Type": "application/json"}
+        )).json()
+        assert summary["moods"]["created"] == 3
+        assert len((await async_client.get("/api/v1/moods/")).json()) == 3
+
+    async def test_malformed_json_reports_progress(self, async_client):
+        """Test a truncated document is rejected with the counts committed so far."""
+        body = json.dumps({"moodEntries": [mood("m1")], "cbtLogs": [cbt_log_record("c1")]})[:-10]
+        response = await async_client.post("/api/v1/data/import/stream", params={"format": "json", "batch_size": 1}, content=body)
+        assert response.status_code == 400
+        detail = response.json()["detail"]
+        assert detail["progress"]["moods"]["created"] == 1
+
+    async def test_legacy_import_still_works(self, async_client):
+        """Test the embedded-string import endpoint goes through the same importer."""
+        content = json.dumps({"moodEntries": [mood("m1")], "cbtLogs": [cbt_log_record("c1")]})
+        response = await async_client.post("/api/v1/data/import", json={"format": "json", "content": content})
+        assert response.status_code == 200
+        assert response.json()["message"] == "Data imported successfully"
+        assert response.json()["cbtLogs"]["created"] == 1
+
+    async def test_stream_holds_no_connection_while_the_body_arrives(self, async_client):
+        """Test the pool stays free between batches while the client is still sending."""
+        arrived = asyncio.Event()
+        proceed = asyncio.Event()
+
+        async def body():
+            yield json.dumps({"type": "mood", **mood("m1")}).encode() + b"\n"
+            arrived.set()
+            await proceed.wait()
+            yield json.dumps({"type": "mood", **mood("m2")}).encode()
+
+        upload = asyncio.ensure_future(async_client.post(
+            "/api/v1/data/import/stream", content=body(), headers={"Content-Type": "application/x-ndjson"}
+        ))
+        await arrived.wait()
+        assert session.get_async_pool().stats()["in_use"] == 0
+        proceed.set()
+        response = await upload
+        assert response.status_code == 200
+        assert response.json()["moods"] == {"created": 2, "duplicates": 0}
+
+    async def test_legacy_import_is_all_or_nothing(self, async_client):
+        """Test one invalid record rejects the whole legacy import."""
+        content = json.dumps({"moodEntries": [mood("m1"), {"id": "broken"}], "cbtLogs": [cbt_log_record("c1")]})
+        response = await async_client.post("/api/v1/data/import", json={"format": "json", "content": content})
+        assert response.status_code == 400
+        detail = response.json()["detail"]
+        assert detail["invalid"] == 1 and "missing field" in detail["errors"][0]
+        assert (await async_client.get("/api/v1/moods/")).json() == []
+        assert (await async_client.get("/api/v1/cbt-logs/")).json() == []
+
+    async def test_legacy_import_rejects_non_scalar_fields(self, async_client):
+        """Test a CBT log with a list id rejects the moods imported alongside it."""
+        content = json.dumps({"moodEntries": [mood("m1")], "cbtLogs": [cbt_log_record(["bad"])]})
+        response = await async_client.post("/api/v1/data/import", json={"format": "json", "content": content})
+        assert response.status_code == 400
+        assert "'id' must be a string or a number" in response.json()["detail"]["errors"][0]
+        assert (await async_client.get("/api/v1/moods/")).json() == []
+
+    async def test_legacy_import_rolls_back_when_a_write_fails(self, async_client, monkeypatch):
+        """Test a failing CBT insert rolls back the moods written in the same import."""
+        build_cbt = importer._BATCH_STATEMENTS[CBT]
+
+        async def failing_cbt_statements(db, user_id, rows):
+            statements, result = await build_cbt(db, user_id, rows)
+            return statements + [Statement("INSERT INTO no_such_table VALUES (1)", ())], result
+
+        monkeypatch.setitem(importer._BATCH_STATEMENTS, CBT, failing_cbt_statements)
+        content = json.dumps({"moodEntries": [mood("m1"), mood("m2")], "cbtLogs": [cbt_log_record("c1")]})
+        response = await async_client.post("/api/v1/data/import", json={"format": "json", "content": content})
+        assert response.status_code == 400
+        assert (await async_client.get("/api/v1/moods/")).json() == []
+        assert (await async_client.get("/api/v1/cbt-logs/")).json() == []
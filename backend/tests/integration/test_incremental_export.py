@@ -0,0 +1,64 @@
+# backend/tests/integration/test_incremental_export.py
+
+import json
+import pytest
+from tests.conftest import cbt_log, mood
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+class TestIncrementalExport:
+    """Integration tests for bounded and incremental exports."""
+
+    async def _export(self, client, **params):
+        response = await client.get("/api/v1/data/export", params={"format": "json", **params})
+        assert response.status_code == 200
+        return response.json()
+
+    async def test_chained_exports_carry_only_changes(self, async_client):
+        """Test exporting from a high-water mark yields just the later writes and deletes."""
+        for i in range(3):
+            await async_client.post("/api/v1/moods/", json=mood(f"m{i}", i))
+            await async_client.post("/api/v1/cbt-logs/", json=cbt_log(f"c{i}", i))
+
+        full = await self._export(async_client)
+        assert [m["id"] for m in full["moodEntries"]] == ["m2", "m1", "m0"]
+        assert full["manifest"]["counts"] == {"moodEntries": 3, "cbtLogs": 3}
+        mark = full["manifest"]["highWaterMark"]
+
+        await async_client.post("/api/v1/moods/", json=mood("m3", 3))
+        await async_client.put("/api/v1/cbt-logs/c0", json={**cbt_log("c0", 0), "userId": "1", "moodAfter": 4})
+        await async_client.delete("/api/v1/moods/m1")
+
+        response = await async_client.get("/api/v1/data/export", params={"cursor": mark})
+        delta = response.json()
+        assert [m["id"] for m in delta["moodEntries"]] == ["m3"]
+        assert [(log["id"], log["mood_after"]) for log in delta["cbtLogs"]] == [("c0", 4)]
+        assert delta["manifest"]["cursor"] == mark
+        assert delta["manifest"]["deleted"] == {"moodEntries": ["m1"], "cbtLogs": []}
+        assert int(response.headers["X-Export-High-Water-Mark"]) == delta["manifest"]["highWaterMark"]
+
+        # Nothing happened since the last export
+        empty = await self._export(async_client, cursor=delta["manifest"]["highWaterMark"])
+        assert empty["moodEntries"] == [] and empty["manifest"]["deleted"]["moodEntries"] == []
+
+    async def test_timestamp_bounds(self, async_client):
+        """Test since is inclusive and until exclusive, as for the list endpoints."""
+        for i in range(5):
+            await async_client.post("/api/v1/moods/", json=mood(f"m{i}", i * 10))
+
+        bounded = await self._export(async_client, since=10, until=40)
+        assert [m["id"] for m in bounded["moodEntries"]] == ["m3", "m2", "m1"]
+        assert (bounded["manifest"]["since"], bounded["manifest"]["until"]) == (10, 40)
+
+    async def test_manifest_header_for_text_formats(self, async_client):
+        """Test formats without room for a manifest still report the high-water mark."""
+        await async_client.post("/api/v1/moods/", json=mood("m0", 0))
+        response = await async_client.get("/api/v1/data/export", params={"format": "csv", "cursor": 0})
+        assert response.headers["X-Export-High-Water-Mark"] == "1"
+        assert "m0" in response.text
+        assert json.loads((await async_client.get("/api/v1/data/export", params={"cursor": 1})).text)["moodEntries"] == []
@@ -0,0 +1,66 @@
+# backend/tests/integration/test_sync_endpoint.py
+
+import json
+import pytest
+from tests.conftest import cbt_log, mood
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+class TestSyncEndpoint:
+    """Integration tests for the /sync change feed."""
+
+    async def test_full_then_incremental_sync(self, async_client):
+        """Test a sync from 0 returns everything and later syncs only the delta."""
+        await async_client.post("/api/v1/moods/", json=mood("m1", 100))
+        await async_client.post("/api/v1/cbt-logs/", json=cbt_log("c1"))
+
+        full = (await async_client.get("/api/v1/sync")).json()
+        assert [m["id"] for m in full["moods"]] == ["m1"]
+        assert [log["id"] for log in full["cbtLogs"]] == ["c1"]
+        assert full["hasMore"] is False
+
+        await async_client.post("/api/v1/moods/", json=mood("m2", 200))
+        await async_client.put("/api/v1/cbt-logs/c1", json={**cbt_log("c1", situation="edited"), "userId": "1"})
+        await async_client.delete("/api/v1/moods/m1")
+
+        delta = (await async_client.get("/api/v1/sync", params={"since": full["cursor"]})).json()
+        assert [m["id"] for m in delta["moods"]] == ["m2"]
+        assert delta["cbtLogs"][0]["situation"] == "edited"
+        assert delta["deleted"] == {"moods": ["m1"], "cbtLogs": []}
+        assert delta["cursor"] > full["cursor"]
+
+        empty = (await async_client.get("/api/v1/sync", params={"since": delta["cursor"]})).json()
+        assert empty == {
+            "cursor": delta["cursor"],
+            "hasMore": False,
+            "moods": [],
+            "cbtLogs": [],
+            "deleted": {"moods": [], "cbtLogs": []}
+        }
+
+    async def test_noop_delete_records_no_change(self, async_client):
+        """Test deleting a missing row does not add a tombstone."""
+        cursor = (await async_client.get("/api/v1/sync")).json()["cursor"]
+        await async_client.delete("/api/v1/moods/missing")
+        assert (await async_client.get("/api/v1/sync", params={"since": cursor})).json()["cursor"] == cursor
+
+    async def test_limit_pages_through_changes(self, async_client):
+        """Test `limit` bounds each batch and `hasMore` signals the rest."""
+        for i in range(3):
+            await async_client.post("/api/v1/moods/", json=mood(f"m{i}", i))
+
+        first = (await async_client.get("/api/v1/sync", params={"limit": 2})).json()
+        assert len(first["moods"]) == 2 and first["hasMore"] is True
+        rest = (await async_client.get("/api/v1/sync", params={"since": first["cursor"], "limit": 2})).json()
+        assert [m["id"] for m in rest["moods"]] == ["m2"] and rest["hasMore"] is False
+
+    async def test_import_appears_in_feed(self, async_client):
+        """Test imported rows are picked up by delta sync."""
+        content = json.dumps({"moodEntries": [mood("imp", 5)], "cbtLogs": []})
+        await async_client.post("/api/v1/data/import", json={"format": "json", "content": content})
+        assert [m["id"] for m in (await async_client.get("/api/v1/sync")).json()["moods"]] == ["imp"]
@@ -0,0 +1,117 @@
+# backend/tests/repositories/test_async_repositories.py
+
+import pytest
+from app.db import session
+from app.repositories.list_cache import list_cache
+from app.repositories import mood as mood_repo
+from app.repositories import cbt as cbt_repo
+from app.schemas.mood import MoodCreate
+from app.schemas.cbt import CBTLogCreate, CBTLogPublic
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db(tmp_path, monkeypatch):
+    """An aiosqlite connection to a freshly initialised, isolated database."""
+    monkeypatch.setattr(session, "DATABASE_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setattr(session, "_pool", None)
+    monkeypatch.setattr(session, "_async_pool", None)
+    list_cache.clear()
+    session.init_db()
+    pool = session.get_async_pool()
+    async with pool.connection() as conn:
+        yield conn
+    await pool.close()
+
+
+@pytest.mark.anyio
+class TestAsyncRepositories:
+    """Round-trip tests for the aiosqlite-backed repository functions."""
+
+    async def test_mood_round_trip(self, db):
+        """Test mood entries can be created, listed newest first and deleted."""
+        for i, ts in enumerate([100, 300, 200]):
+            mood_in = MoodCreate(id=f"m{i}", rating=3, emotions=["calm"], timestamp=ts)
+            created = await mood_repo.create_mood_entry_async(db, "1", mood_in)
+            assert created["user_id"] == "1"
+
+        moods = await mood_repo.get_mood_entries_async(db, "1")
+        assert [m["timestamp"] for m in moods] == [300, 200, 100]
+        assert moods[0]["emotions"] == ["calm"]
+
+        assert await mood_repo.delete_mood_entry_async(db, "1", "m0") is True
+        assert len(await mood_repo.get_mood_entries_async(db, "1")) == 2
+        # Deleting again is idempotent
+        assert await mood_repo.delete_mood_entry_async(db, "1", "m0") is True
+
+    async def test_cbt_round_trip(self, db):
+        """Test CBT logs can be created, updated and deleted."""
+        log_in = CBTLogCreate(
+            id="c1",
+            timestamp=1,
+            situation="s",
+            automatic_thoughts="t",
+            distortions=["Labeling"],
+            rational_response="r",
+            mood_before=3
+        )
+        await cbt_repo.create_cbt_log_async(db, "1", log_in)
+
+        updated = CBTLogPublic(**{**log_in.model_dump(), "user_id": "1", "mood_after": 6})
+        assert await cbt_repo.update_cbt_log_async(db, "1", updated) is True
+
+        logs = await cbt_repo.get_cbt_logs_async(db, "1")
+        assert logs[0]["distortions"] == ["Labeling"]
+        assert logs[0]["mood_after"] == 6
+
+        assert await cbt_repo.delete_cbt_log_async(db, "1", "c1") is True
+        assert await cbt_repo.get_cbt_logs_async(db, "1") == []
+
+    async def test_mood_keyset_pages_cover_history_once(self, db):
+        """Test walking pages with the returned cursor visits every entry once, newest first."""
+        # Duplicate timestamps exercise the id tie-breaker
+        for i in range(7):
+            mood_in = MoodCreate(id=f"m{i}", rating=3, emotions=[], timestamp=100 + i // 2)
+            await mood_repo.create_mood_entry_async(db, "1", mood_in)
+
+        seen, cursor = [], None
+        while True:
+            page = await mood_repo.get_mood_page_async(db, "1", limit=3, cursor=cursor)
+            seen.extend((m["timestamp"], m["id"]) for m in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert len(seen) == 7
+        assert seen == sorted(seen, key=lambda item: (-item[0], item[1]))
+
+    async def test_mood_page_time_range(self, db):
+        """Test since is inclusive and until exclusive."""
+        for ts in [10, 20, 30, 40]:
+            await mood_repo.create_mood_entry_async(db, "1", MoodCreate(id=f"m{ts}", rating=3, emotions=[], timestamp=ts))
+
+        page = await mood_repo.get_mood_page_async(db, "1", since=20, until=40)
+        assert [m["timestamp"] for m in page.items] == [30, 20]
+        assert page.next_cursor is None
+
+    async def test_page_query_uses_composite_index(self, db):
+        """Test the page query is served by the (user_id, timestamp, id) index without a sort."""
+        from app.repositories.pagination import build_list_query, encode_cursor
+
+        sql, params = build_list_query("cbt_logs", "1", since=0, limit=10, cursor=encode_cursor(5, "x"))
+        async with db.execute(f"EXPLAIN QUERY PLAN {sql}", params) as cursor:
+            plan = " ".join(row["detail"] for row in await cursor.fetchall())
+        assert "idx_cbt_logs_user_timestamp_id" in plan
+        assert "TEMP B-TREE" not in plan
+
+    async def test_iter_chunks_walks_all_rows(self, db):
+        """Test chunked iteration visits every row once, newest first."""
+        for i in range(7):
+            await mood_repo.create_mood_entry_async(db, "1", MoodCreate(id=f"m{i}", rating=3, emotions=[], timestamp=i))
+        chunks = [chunk async for chunk in mood_repo.iter_mood_entries_async("1", chunk_size=3)]
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+        assert [m["timestamp"] for chunk in chunks for m in chunk] == [6, 5, 4, 3, 2, 1, 0]
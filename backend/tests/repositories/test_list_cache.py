@@ -0,0 +1,84 @@
+# backend/tests/repositories/test_list_cache.py
+
+import sqlite3
+import pytest
+from app.core.cache import LRUCache
+from app.db import session
+from app.repositories import mood as mood_repo
+from app.repositories.list_cache import list_cache
+from app.schemas.mood import MoodCreate
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class TestLRUCache:
+    """Tests for the generic LRU cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test reads refresh recency so the untouched entry is evicted first."""
+        cache = LRUCache(max_entries=2, name="test.lru")
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+    def test_invalidate_by_predicate(self):
+        """Test only matching keys are dropped."""
+        cache = LRUCache(max_entries=4, name="test.lru")
+        cache.set(("1", "x"), 1)
+        cache.set(("2", "x"), 2)
+        assert cache.invalidate(lambda key: key[0] == "1") == 1
+        assert len(cache) == 1 and cache.get(("2", "x")) == 2
+
+
+@pytest.mark.anyio
+class TestListCache:
+    """Tests for the versioned per-user list cache."""
+
+    @pytest.fixture
+    async def db(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(session, "DATABASE_PATH", str(tmp_path / "test.db"))
+        monkeypatch.setattr(session, "_pool", None)
+        monkeypatch.setattr(session, "_async_pool", None)
+        list_cache.clear()
+        session.init_db()
+        pool = session.get_async_pool()
+        async with pool.connection() as conn:
+            yield conn
+        await pool.close()
+
+    async def test_repeat_reads_are_served_from_cache(self, db):
+        """Test an unchanged list is returned from the cache, not re-decoded."""
+        await mood_repo.create_mood_entry_async(db, "1", MoodCreate(id="m1", rating=3, emotions=["calm"], timestamp=1))
+        first = await mood_repo.get_mood_entries_async(db, "1")
+        assert await mood_repo.get_mood_entries_async(db, "1") is first
+
+    async def test_local_write_invalidates(self, db):
+        """Test repository writes drop the user's cached lists."""
+        await mood_repo.get_mood_entries_async(db, "1")
+        assert len(list_cache) == 1
+        await mood_repo.create_mood_entry_async(db, "1", MoodCreate(id="m1", rating=3, emotions=["calm"], timestamp=1))
+        assert len(list_cache) == 0
+        assert [m["id"] for m in await mood_repo.get_mood_entries_async(db, "1")] == ["m1"]
+
+    async def test_write_from_another_process_is_seen(self, db):
+        """Test a write that bypasses this process's cache still invalidates it via the data version."""
+        assert await mood_repo.get_mood_entries_async(db, "1") == []
+
+        # Simulate another worker: same file, no access to our in-memory cache
+        other = sqlite3.connect(session.DATABASE_PATH)
+        other.execute(
+            "INSERT INTO mood_entries (id, rating, emotions, timestamp, user_id) VALUES ('m2', 4, '[]', 2, '1')"
+        )
+        other.execute(
+            "INSERT INTO change_log (user_id, entity, entity_id, op, changed_at) VALUES ('1', 'mood', 'm2', 'upsert', 2)"
+        )
+        other.commit()
+        other.close()
+
+        assert [m["id"] for m in await mood_repo.get_mood_entries_async(db, "1")] == ["m2"]
@@ -0,0 +1,34 @@
+# backend/tests/repositories/test_pagination.py
+
+import pytest
+from app.repositories.pagination import encode_cursor, decode_cursor, build_list_query, to_page
+
+
+class TestPagination:
+    """Tests for keyset cursor encoding and query building."""
+
+    def test_cursor_round_trip(self):
+        """Test a cursor decodes back to the timestamp and id it was built from."""
+        cursor = encode_cursor(1700000000000, "abc-123")
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (1700000000000, "abc-123")
+
+    @pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor(1, "x")[:-2], "WyJhIiwxXQ"])
+    def test_malformed_cursor_raises_value_error(self, cursor):
+        """Test garbage or tampered cursors are rejected."""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+    def test_limit_fetches_one_look_ahead_row(self):
+        """Test the query asks for limit + 1 rows so the next page can be detected."""
+        sql, params = build_list_query("mood_entries", "1", limit=50)
+        assert sql.endswith("LIMIT ?")
+        assert params[-1] == 51
+
+    def test_to_page_sets_cursor_only_when_more_rows(self):
+        """Test the next cursor points at the last returned row and is omitted on the final page."""
+        rows = [{"timestamp": 3, "id": "c"}, {"timestamp": 2, "id": "b"}, {"timestamp": 1, "id": "a"}]
+        page = to_page(rows, 2, dict)
+        assert len(page.items) == 2
+        assert decode_cursor(page.next_cursor) == (2, "b")
+        assert to_page(rows, 3, dict).next_cursor is None
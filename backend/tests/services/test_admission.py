@@ -0,0 +1,118 @@
+# backend/tests/services/test_admission.py
+
+import asyncio
+import pytest
+from app.core.ai_config import AIConfig
+from app.services import admission
+from app.services.admission import AdmissionController, AdmissionRejected, TokenBucket
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def controller(requests_per_minute=1200, tokens_per_minute=1_000_000, max_wait=5.0, max_queued=4):
+    return AdmissionController(requests_per_minute, tokens_per_minute, max_wait, max_queued)
+
+
+class TestTokenBucket:
+    """Tests for the token bucket."""
+
+    def test_refills_at_rate_up_to_capacity(self):
+        """Test a drained bucket reports how long until an amount is available."""
+        bucket = TokenBucket(rate=10, capacity=5)
+        assert bucket.time_until(5) == 0
+        bucket.take(5)
+        assert bucket.time_until(2) == pytest.approx(0.2, abs=0.01)
+
+
+class TestQuotaShare:
+    """Tests for splitting the quota across worker processes."""
+
+    def test_each_worker_keeps_to_its_share(self, monkeypatch):
+        """Test the buckets hold the quota divided by the worker count, taken from WEB_CONCURRENCY."""
+        monkeypatch.setenv("WEB_CONCURRENCY", "4")
+        config = AIConfig(gemini_api_key="x", ai_requests_per_minute=600, ai_tokens_per_minute=1_000_000)
+        assert config.ai_worker_processes == 4
+
+        monkeypatch.setattr(admission, "_controller", None)
+        monkeypatch.setattr(admission, "get_ai_config", lambda: config)
+        controller = admission.get_admission_controller()
+        assert controller.requests.capacity == 150
+        assert controller.tokens.rate == pytest.approx(250_000 / 60)
+
+
+@pytest.mark.anyio
+class TestAdmissionController:
+    """Tests for admission control and fair queueing."""
+
+    async def test_admits_within_budget_without_waiting(self):
+        """Test analyses that fit the budget are admitted at once."""
+        admission = controller()
+        await asyncio.wait_for(admission.admit("a", 2, 3000), timeout=0.1)
+        assert admission.requests.available == pytest.approx(1198, abs=1)
+
+    async def test_sheds_when_the_wait_would_be_too_long(self):
+        """Test an analysis that cannot start within max_wait is rejected with a retry hint."""
+        admission = controller(requests_per_minute=60, max_wait=1.0)
+        admission.drain()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.admit("a", 2, 100)
+        # Two calls at one per second
+        assert rejected.value.retry_after == 2
+
+    async def test_token_budget_limits_too(self):
+        """Test the token budget rejects work the request budget would allow."""
+        admission = controller(tokens_per_minute=6000, max_wait=0.5)
+        await admission.admit("a", 1, 6000)
+        with pytest.raises(AdmissionRejected):
+            await admission.admit("a", 1, 3000)
+
+    async def test_users_are_served_round_robin(self):
+        """Test a user with queued work does not hold back another user's analysis."""
+        admission = controller(requests_per_minute=1200)
+        admission.drain()
+        order = []
+
+        async def analyze(user, n):
+            await admission.admit(user, 1, 10)
+            order.append((user, n))
+
+        tasks = [asyncio.ensure_future(analyze("heavy", n)) for n in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(analyze("light", 0)))
+        await asyncio.gather(*tasks)
+
+        assert order.index(("light", 0)) <= 1
+        assert [n for user, n in order if user == "heavy"] == [0, 1, 2]
+
+    async def test_per_user_queue_limit(self):
+        """Test a user with max_queued_per_user waiting analyses is rejected, others are not."""
+        admission = controller(requests_per_minute=1200, max_queued=1)
+        admission.drain()
+        first = asyncio.ensure_future(admission.admit("a", 1, 10))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected):
+            await admission.admit("a", 1, 10)
+        await asyncio.wait_for(asyncio.gather(first, admission.admit("b", 1, 10)), timeout=1)
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        """Test a cancelled analysis gives up its place and budget."""
+        admission = controller(requests_per_minute=1200)
+        admission.drain()
+        waiting = asyncio.ensure_future(admission.admit("a", 1, 10))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        await asyncio.wait_for(admission.admit("b", 1, 10), timeout=1)
+        assert admission.stats()["queued"] == 0
+
+    async def test_optional_calls_only_take_spare_budget(self):
+        """Test try_take succeeds within the budget and never waits or jumps the queue."""
+        admission = controller(requests_per_minute=60)
+        assert admission.try_take(1, 10)
+        admission.drain()
+        assert not admission.try_take(1, 10)
+        assert admission.stats()["queued"] == 0
@@ -1,10 +1,19 @@
 # backend/tests/services/test_ai_client_factory.py
 
-from unittest.mock import patch
-from app.services.ai_client import get_ai_client, TextBlobClient, GeminiAdapter
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.core.metrics import metrics
+from app.services import ai_client
+from app.services.ai_client import create_ai_client, get_ai_client, init_ai_client, TextBlobClient, GeminiAdapter
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
 
 class TestAIClientFactory:
-    """Tests for the AI client factory logic (get_ai_client)."""
+    """Tests for the AI client factory logic (create_ai_client)."""
 
     def test_get_ai_client_returns_gemini_when_enabled(self):
         """Test factory returns GeminiAdapter when enable_gemini is True."""
@@ -15,7 +24,7 @@ class TestAIClientFactory:
             
             # We mock GeminiClient to avoid initializing the actual SDK
             with patch('app.services.ai_client.GeminiClient'):
-                client = get_ai_client()
+                client = create_ai_client()
                 assert isinstance(client, GeminiAdapter)
 
     def test_get_ai_client_returns_textblob_when_disabled(self):
@@ -25,7 +34,7 @@ class TestAIClientFactory:
             
             mock_config.return_value.enable_gemini = False
             
-            client = get_ai_client()
+            client = create_ai_client()
             assert isinstance(client, TextBlobClient)
 
     def test_get_ai_client_falls_back_when_gemini_not_available(self):
@@ -35,5 +44,51 @@ class TestAIClientFactory:
             
             mock_config.return_value.enable_gemini = True
             
-            client = get_ai_client()
+            client = create_ai_client()
             assert isinstance(client, TextBlobClient)
+
+
+class TestSharedAIClient:
+    """Tests for the process-wide AI client."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_client(self, monkeypatch):
+        monkeypatch.setattr(ai_client, "_client", None)
+
+    def test_client_is_built_once(self):
+        """Test every caller shares one client and construction is measured."""
+        with patch('app.services.ai_client.get_ai_config') as mock_config:
+            mock_config.return_value.enable_gemini = False
+            before = metrics.counter("ai.client.constructed")
+
+            assert get_ai_client() is get_ai_client()
+
+        assert metrics.counter("ai.client.constructed") == before + 1
+        assert metrics.snapshot()["gauges"]["ai.client.construct_ms"] >= 0
+
+    @pytest.mark.anyio
+    async def test_init_warms_up_and_tolerates_failure(self):
+        """Test startup warms the shared client, and a failed warm-up does not fail startup."""
+        with patch('app.services.ai_client.get_ai_config') as mock_config, \
+             patch('app.services.ai_client._gemini_available', True), \
+             patch('app.services.ai_client.GeminiClient') as mock_gemini:
+            mock_config.return_value.enable_gemini = True
+            mock_gemini.return_value.warm_up = AsyncMock()
+
+            client = await init_ai_client()
+
+            assert client is get_ai_client()
+            mock_gemini.return_value.warm_up.assert_awaited_once()
+            assert metrics.snapshot()["gauges"]["ai.client.warm_up_ms"] >= 0
+
+            mock_gemini.return_value.warm_up = AsyncMock(side_effect=ConnectionError("offline"))
+            assert await init_ai_client() is client
+
+    @pytest.mark.anyio
+    async def test_init_tolerates_missing_configuration(self):
+        """Test a client that cannot be configured does not fail startup and is retried on first use."""
+        with patch('app.services.ai_client.get_ai_config', side_effect=ValueError("GEMINI_API_KEY missing")):
+            assert await init_ai_client() is None
+            with pytest.raises(ValueError):
+                get_ai_client()
+        assert ai_client._client is None
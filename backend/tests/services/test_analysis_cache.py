@@ -0,0 +1,142 @@
+# backend/tests/services/test_analysis_cache.py
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.core.metrics import metrics
+from app.db import session
+from app.schemas.cbt import CBTAnalysisRequest, CBTAnalysisResponse, RationalReframe
+from app.services import analysis_cache
+from app.services.analysis_cache import AnalysisCache, analysis_key
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(session, "DATABASE_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setattr(session, "_pool", None)
+    monkeypatch.setattr(session, "_async_pool", None)
+    session.init_db()
+    yield tmp_path / "test.db"
+    await session.close_async_db()
+    session.close_db()
+
+
+def response(content="Be kind to yourself"):
+    return CBTAnalysisResponse(
+        suggestions=[],
+        reframes=[RationalReframe(perspective="Compassionate", content=content)],
+        prompt_version="default"
+    )
+
+
+class TestAnalysisKey:
+    """Tests for content-addressed cache keys."""
+
+    def test_whitespace_and_unicode_form_do_not_change_the_key(self):
+        """Test trivially different inputs share a key."""
+        assert analysis_key("  I failed\tthe test ", "Cafe\u0301", "fp") == analysis_key("I failed the test", "Caf\u00e9", "fp")
+
+    def test_fingerprint_and_text_change_the_key(self):
+        """Test model settings and content are part of the key, and no raw text leaks into it."""
+        key = analysis_key("s", "I'm a failure", "fp")
+        assert key != analysis_key("s", "I'm a failure", "fp2")
+        assert key != analysis_key("s", "I'm fine", "fp")
+        assert len(key) == 64 and "failure" not in key
+
+
+@pytest.mark.anyio
+class TestAnalysisCache:
+    """Tests for the memory + SQLite analysis cache."""
+
+    async def test_persists_across_processes(self, db_path):
+        """Test an entry is served from SQLite once the memory tier is gone."""
+        await AnalysisCache(3600, 1 << 20, 8).set("k1", response())
+
+        fresh = AnalysisCache(3600, 1 << 20, 8)
+        before = metrics.counter("cache.analysis.db.hits")
+        assert (await fresh.get("k1")).reframes[0].content == "Be kind to yourself"
+        assert metrics.counter("cache.analysis.db.hits") == before + 1
+        # Now promoted to memory
+        assert len(fresh.memory) == 1
+        assert await fresh.get("missing") is None
+
+    async def test_expired_entries_are_misses_and_evicted(self, db_path):
+        """Test entries past their TTL are ignored and removed."""
+        cache = AnalysisCache(60, 1 << 20, 8)
+        with patch("app.services.analysis_cache._now", return_value=1_000):
+            await cache.set("old", response())
+        with patch("app.services.analysis_cache._now", return_value=1_061):
+            assert await cache.get("old") is None
+            async with session.get_async_pool().connection() as db:
+                assert await cache.evict(db) == 1
+
+    async def test_size_budget_evicts_least_recently_hit(self, db_path):
+        """Test entries beyond the byte budget go least recently hit first."""
+        size = len(response().model_dump_json())
+        cache = AnalysisCache(3600, 2 * size, 0)
+        for key, now in (("a", 100), ("b", 200), ("c", 300)):
+            with patch("app.services.analysis_cache._now", return_value=now):
+                await cache.set(key, response())
+        with patch("app.services.analysis_cache._now", return_value=400):
+            await cache.get("a")
+            async with session.get_async_pool().connection() as db:
+                assert await cache.evict(db) == 1
+            assert await cache.get("b") is None
+            assert await cache.get("a") is not None and await cache.get("c") is not None
+
+
+    async def test_failures_are_misses(self, db_path):
+        """Test a corrupt entry or an unavailable pool is counted and treated as a miss."""
+        await AnalysisCache(3600, 1 << 20, 8).set("k1", response())
+        async with session.get_async_pool().connection() as db:
+            await db.execute("UPDATE analysis_cache SET response = '{\"suggestions\": 1}'")
+            await db.commit()
+
+        cache = AnalysisCache(3600, 1 << 20, 0)
+        before = metrics.counter("cache.analysis.errors")
+        assert await cache.get("k1") is None
+        with patch("app.services.analysis_cache.get_async_pool", side_effect=TimeoutError("pool exhausted")):
+            assert await cache.get("k2") is None
+            await cache.set("k2", response())
+        assert metrics.counter("cache.analysis.errors") == before + 3
+        assert cache.stats()["errors"] == before + 3
+
+@pytest.mark.anyio
+class TestGeminiAdapterCaching:
+    """Tests for cached CBT analysis through the Gemini adapter."""
+
+    def _adapter(self, temperature=0.2):
+        from app.services.ai_client import GeminiAdapter
+
+        with patch("app.services.ai_client.GeminiClient") as client_class:
+            adapter = GeminiAdapter()
+        client = client_class.return_value
+        client.config = Mock(ai_cache_enabled=True, gemini_temperature=temperature, ai_cache_max_temperature=0.7)
+        client.analysis_fingerprint = AsyncMock(return_value="fp")
+        client.analyze_cbt = AsyncMock(return_value=response())
+        return adapter, client
+
+    async def test_repeat_analysis_skips_the_model(self, db_path, monkeypatch):
+        """Test the second identical request is answered from the cache."""
+        monkeypatch.setattr(analysis_cache, "_cache", AnalysisCache(3600, 1 << 20, 8))
+        adapter, client = self._adapter()
+        request = CBTAnalysisRequest(situation="Exam", automatic_thought="I will fail")
+
+        first = await adapter.analyze_cbt(request)
+        second = await adapter.analyze_cbt(CBTAnalysisRequest(situation=" Exam ", automatic_thought="I  will fail"))
+        assert first == second
+        client.analyze_cbt.assert_awaited_once()
+
+    async def test_high_temperature_bypasses_the_cache(self, db_path, monkeypatch):
+        """Test varied-output settings always call the model."""
+        monkeypatch.setattr(analysis_cache, "_cache", AnalysisCache(3600, 1 << 20, 8))
+        adapter, client = self._adapter(temperature=0.9)
+        request = CBTAnalysisRequest(situation="Exam", automatic_thought="I will fail")
+
+        await adapter.analyze_cbt(request)
+        await adapter.analyze_cbt(request)
+        assert client.analyze_cbt.await_count == 2
@@ -0,0 +1,51 @@
+# backend/tests/services/test_analysis_stream.py
+
+import json
+from app.schemas.cbt import CBTAnalysisResponse, DistortionSuggestion, RationalReframe
+from app.services.analysis_stream import ReframeStreamParser, response_events, sse_message
+
+
+class TestReframeStreamParser:
+    """Tests for incremental extraction of reframes from streamed JSON."""
+
+    def test_objects_are_returned_once_complete(self):
+        """Test each reframe is returned as soon as its closing brace arrives, whatever the chunking."""
+        text = json.dumps({"reframes": [
+            {"perspective": "Compassionate", "content": "It's {not} the end, [really]."},
+            {"perspective": "Logical", "content": "b"},
+        ]})
+        for size in (1, 7, len(text)):
+            parser = ReframeStreamParser()
+            items = []
+            for start in range(0, len(text), size):
+                items.extend(parser.feed(text[start:start + size]))
+            assert [item["perspective"] for item in items] == ["Compassionate", "Logical"]
+            assert items[0]["content"] == "It's {not} the end, [really]."
+
+    def test_nothing_before_the_array(self):
+        """Test text before the reframes array yields nothing."""
+        parser = ReframeStreamParser()
+        assert parser.feed('{"reframes"') == []
+        assert parser.feed(': [{"perspective": "Logical", "content": "c"') == []
+        assert parser.feed("}]}") == [{"perspective": "Logical", "content": "c"}]
+
+
+class TestSSEMessages:
+    """Tests for the events of a finished analysis."""
+
+    def test_response_events_and_format(self):
+        """Test a complete response replays as distortions, reframes and done, in camelCase."""
+        response = CBTAnalysisResponse(
+            suggestions=[DistortionSuggestion(distortion="Labeling", reasoning="r")],
+            reframes=[RationalReframe(perspective="Logical", content="c")],
+            prompt_version="v1"
+        )
+        messages = [sse_message(event).decode() for event in response_events(response)]
+
+        assert [message.split("\n")[0] for message in messages] == ["event: distortions", "event: reframe", "event: done"]
+        assert all(message.endswith("\n\n") for message in messages)
+        assert json.loads(messages[0].split("data: ", 1)[1]) == {
+            "suggestions": [{"distortion": "Labeling", "reasoning": "r", "confidence": None}],
+            "promptVersion": "v1"
+        }
+        assert json.loads(messages[2].split("data: ", 1)[1])["promptVersion"] == "v1"
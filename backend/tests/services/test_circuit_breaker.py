@@ -0,0 +1,165 @@
+# backend/tests/services/test_circuit_breaker.py
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.schemas.cbt import CBTAnalysisRequest, CBTAnalysisResponse
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+from app.services.gemini_client import SafetyException
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def breaker(min_calls=4, failure_rate=0.5, slow_call_seconds=5.0, open_seconds=60.0):
+    return CircuitBreaker(60.0, min_calls, failure_rate, slow_call_seconds, open_seconds)
+
+
+def trip(b, bad=4):
+    for _ in range(bad):
+        b.record(b.allow(), 0.1, True)
+
+
+class TestCircuitBreaker:
+    """Tests for the rolling-window circuit breaker."""
+
+    def test_opens_once_the_failure_rate_is_reached(self):
+        """Test the breaker waits for min_calls, then opens on the failure share."""
+        b = breaker()
+        for failed in (True, True, False):
+            b.record(b.allow(), 0.1, failed)
+        assert b.state == CLOSED
+        b.record(b.allow(), 0.1, False)
+        assert b.state == OPEN
+        assert b.allow() is None
+        assert 59 <= b.retry_after() <= 60
+
+    def test_slow_calls_count_as_failures(self):
+        """Test successful calls above the latency limit trip the breaker too."""
+        b = breaker()
+        for _ in range(4):
+            b.record(b.allow(), 6.0, False)
+        assert b.state == OPEN
+
+    def test_half_open_lets_one_probe_through(self):
+        """Test after open_seconds a single probe decides whether the breaker closes."""
+        b = breaker(open_seconds=0.0)
+        trip(b)
+        probe = b.allow()
+        assert probe is not None and probe.probe
+        assert b.state == HALF_OPEN
+        assert b.allow() is None
+        b.record(probe, 0.1, False)
+        assert b.state == CLOSED
+        assert b.stats()["calls"] == 0
+
+    def test_failed_probe_reopens(self):
+        """Test a bad probe opens the breaker again; a released one lets the next call probe."""
+        b = breaker(open_seconds=0.0)
+        trip(b)
+        b.release(b.allow())
+        b.record(b.allow(), 0.1, True)
+        assert b.state == OPEN
+
+    def test_only_the_probe_decides_in_half_open(self):
+        """Test calls admitted before the breaker opened, and stale probes, cannot close or reopen it."""
+        b = breaker(open_seconds=0.0)
+        straggler = b.allow()
+        trip(b)
+        stale = b.allow()
+        b.record(stale, 0.1, True)
+        probe = b.allow()
+        assert b.state == HALF_OPEN
+
+        b.record(straggler, 0.1, False)
+        b.record(stale, 0.1, False)
+        assert b.state == HALF_OPEN
+        b.record(probe, 0.1, False)
+        assert b.state == CLOSED
+
+    def test_state_is_reported_without_building_a_breaker(self, monkeypatch):
+        """Test health checks see "unavailable" rather than needing AI configuration."""
+        monkeypatch.setattr(circuit_breaker, "_breaker", None)
+        with patch("app.services.circuit_breaker.get_ai_config", side_effect=AssertionError("no config")):
+            assert circuit_breaker.circuit_state() == "unavailable"
+        monkeypatch.setattr(circuit_breaker, "_breaker", breaker())
+        assert circuit_breaker.circuit_state() == CLOSED
+
+
+@pytest.mark.anyio
+class TestGeminiAdapterBreaker:
+    """Tests for the circuit breaker around the Gemini adapter."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_breaker(self, monkeypatch):
+        b = breaker(min_calls=2)
+        monkeypatch.setattr(circuit_breaker, "_breaker", b)
+        with patch("app.services.ai_client.get_admission_controller") as admission:
+            admission.return_value.admit = AsyncMock()
+            yield b
+
+    def _adapter(self, analyze):
+        from app.services.ai_client import GeminiAdapter
+
+        with patch("app.services.ai_client.GeminiClient") as client_class:
+            adapter = GeminiAdapter()
+        client = client_class.return_value
+        client.config = Mock(ai_cache_enabled=False, ai_analysis_strategy="combined")
+        client.analysis_fingerprint = AsyncMock(return_value="fp")
+        client.analyze_cbt = analyze
+        return adapter, client
+
+    async def test_open_breaker_serves_a_degraded_analysis(self, fresh_breaker):
+        """Test failures open the breaker, after which the model is skipped for a heuristic answer."""
+        analyze = AsyncMock(side_effect=RuntimeError("unavailable"))
+        adapter, _ = self._adapter(analyze)
+        request = CBTAnalysisRequest(situation="Exam", automatic_thought="I always mess up")
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await adapter.analyze_cbt(request)
+        assert fresh_breaker.state == OPEN
+
+        response = await adapter.analyze_cbt(request)
+        assert analyze.await_count == 2
+        assert response.degraded
+        assert response.prompt_version == "heuristic"
+        assert [s.distortion for s in response.suggestions] == ["Overgeneralization"]
+        assert response.reframes == []
+
+        events = [event async for event in adapter.analyze_cbt_stream(request)]
+        assert [event.event for event in events] == ["distortions", "done"]
+        assert events[-1].data.degraded
+
+    async def test_fail_mode_raises_circuit_open(self, fresh_breaker):
+        """Test with fallback "fail" an open breaker raises instead of answering."""
+        adapter, _ = self._adapter(AsyncMock())
+        trip(fresh_breaker, 2)
+
+        with patch("app.services.ai_client.get_ai_config") as config:
+            config.return_value.ai_breaker_fallback = "fail"
+            with pytest.raises(CircuitOpen):
+                await adapter.analyze_cbt(CBTAnalysisRequest(situation="Exam", automatic_thought="I will fail"))
+
+    async def test_safety_triggers_do_not_count_as_failures(self, fresh_breaker):
+        """Test a safety refusal is a healthy model answer to the breaker."""
+        analyze = AsyncMock(side_effect=SafetyException("Safety message", []))
+        adapter, _ = self._adapter(analyze)
+        request = CBTAnalysisRequest(situation="Exam", automatic_thought="I will fail")
+
+        for _ in range(3):
+            with pytest.raises(SafetyException):
+                await adapter.analyze_cbt(request)
+        assert fresh_breaker.state == CLOSED
+
+    async def test_successful_probe_closes_the_breaker(self, fresh_breaker):
+        """Test a half-open probe that succeeds restores model analyses."""
+        fresh_breaker.open_seconds = 0.0
+        trip(fresh_breaker, 2)
+        adapter, _ = self._adapter(AsyncMock(return_value=CBTAnalysisResponse(suggestions=[], reframes=[])))
+
+        response = await adapter.analyze_cbt(CBTAnalysisRequest(situation="Exam", automatic_thought="I will fail"))
+        assert not response.degraded
+        assert fresh_breaker.state == CLOSED
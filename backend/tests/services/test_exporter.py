@@ -0,0 +1,106 @@
+# backend/tests/services/test_exporter.py
+
+import gzip
+import io
+import json
+import pytest
+from app.services.exporter import export_filename, new_manifest, render_export
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+MOODS = [
+    {"id": f"m{i}", "timestamp": i, "rating": 3, "emotions": ["calm", "ok"], "note": "line\nbreak" if i == 1 else None,
+     "trigger": None, "behavior": "walk", "user_id": "1", "ai_analysis": {"keywords": ["k"]}}
+    for i in range(5)
+]
+CBT_LOGS = [
+    {"id": f"c{i}", "timestamp": i, "situation": "s", "automatic_thoughts": "t, \"quoted\"", "distortions": ["Labeling"],
+     "rational_response": "r", "mood_before": 2, "mood_after": None, "behavioral_link": None, "user_id": "1"}
+    for i in range(3)
+]
+
+
+def chunked(rows, size):
+    async def chunks():
+        for start in range(0, len(rows), size):
+            yield rows[start:start + size]
+    return chunks()
+
+
+async def render(format, moods, cbt_logs, size, table=None, compression=None):
+    pieces = render_export(format, chunked(moods, size), chunked(cbt_logs, size), table, compression)
+    return b"".join([piece async for piece in pieces])
+
+
+@pytest.mark.anyio
+class TestRenderExport:
+    """Tests for the incremental export renderers."""
+
+    @pytest.mark.parametrize("moods,cbt_logs", [(MOODS, CBT_LOGS), ([], CBT_LOGS), ([], [])])
+    async def test_json_matches_whole_document_dump(self, moods, cbt_logs):
+        """Test streamed JSON is byte-identical to dumping the whole export at once."""
+        expected = json.dumps({"moodEntries": moods, "cbtLogs": cbt_logs}, indent=2).encode()
+        assert await render("json", moods, cbt_logs, size=2) == expected
+
+    @pytest.mark.parametrize("format", ["json", "csv", "md"])
+    async def test_output_independent_of_chunking(self, format):
+        """Test chunk boundaries never show up in the rendered output."""
+        whole = await render(format, MOODS, CBT_LOGS, size=100)
+        assert await render(format, MOODS, CBT_LOGS, size=1) == whole
+        assert await render(format, MOODS, CBT_LOGS, size=2) == whole
+
+    async def test_csv_sections(self):
+        """Test the CSV export keeps its section layout."""
+        lines = (await render("csv", MOODS, CBT_LOGS, size=2)).decode().splitlines()
+        assert lines[0] == "--- MOOD ENTRIES ---"
+        assert lines[1].startswith("ID,Timestamp,Rating")
+        assert "--- CBT LOGS ---" in lines
+
+    async def test_json_manifest_is_last_with_final_counts(self):
+        """Test the manifest is appended to the JSON export with the rendered row counts."""
+        manifest = new_manifest("json", high_water_mark=7)
+        pieces = render_export("json", chunked(MOODS, 2), chunked(CBT_LOGS, 2), manifest=manifest)
+        body = b"".join([piece async for piece in pieces])
+        assert manifest["counts"] == {"moodEntries": len(MOODS), "cbtLogs": len(CBT_LOGS)}
+        expected = {"moodEntries": MOODS, "cbtLogs": CBT_LOGS, "manifest": manifest}
+        assert body.decode() == json.dumps(expected, indent=2)
+
+    async def test_gzip_wraps_text_formats(self):
+        """Test gzip output decompresses to the plain export."""
+        plain = await render("md", MOODS, CBT_LOGS, size=2)
+        compressed = await render("md", MOODS, CBT_LOGS, size=2, compression="gzip")
+        assert gzip.decompress(compressed) == plain
+        assert export_filename("md", compression="gzip") == "mindfultrack_export.md.gz"
+
+
+@pytest.mark.anyio
+class TestColumnarExport:
+    """Tests for the Arrow and Parquet exports (optional pyarrow dependency)."""
+
+    @pytest.fixture(autouse=True)
+    def pyarrow(self):
+        return pytest.importorskip("pyarrow")
+
+    async def test_arrow_keeps_typed_columns(self, pyarrow):
+        """Test the Arrow stream has one typed row per mood entry."""
+        body = await render("arrow", MOODS, CBT_LOGS, size=2, table="moods")
+        table = pyarrow.ipc.open_stream(body).read_all()
+        assert table.num_rows == len(MOODS)
+        assert table.schema.field("rating").type == pyarrow.int8()
+        assert table.schema.field("timestamp").type == pyarrow.timestamp("ms", tz="UTC")
+        assert table.column("emotions").to_pylist()[0] == ["calm", "ok"]
+        assert export_filename("arrow", "moods") == "mindfultrack_moods.arrows"
+
+    async def test_parquet_round_trips_cbt_logs(self, pyarrow):
+        """Test the Parquet file holds the CBT logs with nullable mood_after."""
+        import pyarrow.parquet as pq
+
+        body = await render("parquet", MOODS, CBT_LOGS, size=2, table="cbt_logs")
+        table = pq.read_table(io.BytesIO(body))
+        assert table.column("id").to_pylist() == ["c0", "c1", "c2"]
+        assert table.schema.field("mood_before").type == pyarrow.int8()
+        assert table.column("mood_after").to_pylist() == [None, None, None]
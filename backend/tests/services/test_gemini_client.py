@@ -90,7 +90,9 @@ class TestGeminiClient:
             # Mock PromptManager to return simple prompt
             client.prompt_manager.get_distortion_prompt = AsyncMock(return_value=("simple prompt", "default"))
 
-            with patch('asyncio.to_thread', return_value=mock_response):
+            client.config.ai_max_concurrency = 1
+            client.config.ai_hedge_enabled = False
+            with patch.object(client.model, 'generate_content_async', AsyncMock(return_value=mock_response)):
                 # We need to decide if the implementation SHOULD filter. 
                 # Current implementation just takes what Gemini gives. 
                 # This test will likely FAIL until we implement filtering.
@@ -177,7 +179,9 @@ class TestGeminiClient:
             # Mock PromptManager to return simple prompt
             client.prompt_manager.get_distortion_prompt = AsyncMock(return_value=("simple prompt", "default"))
 
-            with patch('asyncio.to_thread', return_value=mock_response):
+            client.config.ai_max_concurrency = 1
+            client.config.ai_hedge_enabled = False
+            with patch.object(client.model, 'generate_content_async', AsyncMock(return_value=mock_response)):
                 with pytest.raises(SafetyException) as exc_info:
                     await client._detect_distortions("situation", "thought")
 
@@ -207,7 +211,9 @@ class TestGeminiClient:
             # Mock PromptManager to return simple prompt
             client.prompt_manager.get_distortion_prompt = AsyncMock(return_value=("simple prompt", "default"))
 
-            with patch('asyncio.to_thread', return_value=mock_response):
+            client.config.ai_max_concurrency = 1
+            client.config.ai_hedge_enabled = False
+            with patch.object(client.model, 'generate_content_async', AsyncMock(return_value=mock_response)):
                 with pytest.raises(ParseException, match="Invalid AI response format"):
                     await client._detect_distortions("situation", "thought")
 
@@ -228,3 +234,427 @@ class TestGeminiClient:
 
             ratings = client._extract_safety_ratings(mock_response)
             assert ratings["test_cat"] == HarmProbability.HIGH
+
+
+async def _stream(responses):
+    for response in responses:
+        yield response
+
+
+def _gemini_response(payload):
+    response = Mock()
+    response.text = json.dumps(payload)
+    response.candidates = []
+    response.prompt_feedback = None
+    return response
+
+
+@pytest.mark.anyio
+class TestAnalysisStrategies:
+    """Tests for the sequential, parallel and combined analysis strategies."""
+
+    def _client(self, strategy):
+        with patch('app.services.gemini_client.get_ai_config') as mock_config, \
+             patch('app.services.gemini_client.genai.configure'), \
+             patch('app.services.gemini_client.genai.GenerativeModel'):
+            mock_config.return_value.ai_analysis_strategy = strategy
+            mock_config.return_value.ai_max_retries = 0
+            mock_config.return_value.ai_max_concurrency = 2
+            mock_config.return_value.ai_hedge_enabled = False
+            client = GeminiClient()
+        client._log_audit = AsyncMock()
+        return client
+
+    async def test_parallel_overlaps_calls_and_reframes_from_guess(self):
+        """Test parallel starts reframing before detection finishes, using the local guess."""
+        import asyncio
+
+        client = self._client("parallel")
+        events = []
+
+        async def detect(situation, thought):
+            events.append("detect:start")
+            await asyncio.sleep(0.01)
+            events.append("detect:end")
+            return [DistortionSuggestion(distortion="Labeling", reasoning="r")], "v2"
+
+        async def reframe(situation, thought, distortions):
+            events.append(("reframe:start", tuple(distortions)))
+            await asyncio.sleep(0.01)
+            return [RationalReframe(perspective="Logical", content="c")], "v2"
+
+        client._detect_distortions = detect
+        client._generate_reframes = reframe
+        result = await client.analyze_cbt(CBTAnalysisRequest(situation="s", automatic_thought="I'm a failure"))
+
+        assert events.index(("reframe:start", ("Labeling",))) < events.index("detect:end")
+        assert [s.distortion for s in result.suggestions] == ["Labeling"]
+        assert result.prompt_version == "v2"
+
+    async def test_parallel_cancels_reframing_when_detection_fails(self):
+        """Test a failed detection does not leave the speculative reframe running."""
+        import asyncio
+
+        client = self._client("parallel")
+        cancelled = asyncio.Event()
+
+        async def detect(situation, thought):
+            raise ParseException("bad")
+
+        async def reframe(situation, thought, distortions):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        client._detect_distortions = detect
+        client._generate_reframes = reframe
+        with pytest.raises(ParseException):
+            await client.analyze_cbt(CBTAnalysisRequest(situation="s", automatic_thought="t"))
+        assert cancelled.is_set()
+
+    async def test_combined_uses_one_model_call(self):
+        """Test combined parses distortions and reframes from a single response."""
+        from app.core.metrics import metrics
+
+        client = self._client("combined")
+        payload = {
+            "distortions": [{"distortion": "Labeling", "reasoning": "r"}, {"distortion": "Made Up", "reasoning": "x"}],
+            "reframes": [{"perspective": "Compassionate", "content": "c"}],
+        }
+        before = metrics.counter("ai.analyze.combined.success")
+        with patch.object(client.model, 'generate_content_async', AsyncMock(return_value=_gemini_response(payload))) as call:
+            result = await client.analyze_cbt(CBTAnalysisRequest(situation="s", automatic_thought="t"))
+
+        call.assert_awaited_once()
+        assert "reframes" in call.await_args.args[0]
+        assert [s.distortion for s in result.suggestions] == ["Labeling"]
+        assert [r.perspective for r in result.reframes] == ["Compassionate"]
+        assert metrics.counter("ai.analyze.combined.success") == before + 1
+        assert metrics.histogram("ai.analyze.combined.latency_ms").count >= 1
+
+    async def test_combined_missing_reframe_fields_raise_parse_exception(self):
+        """Test a combined response with malformed reframes is a parse error, not retried."""
+        client = self._client("combined")
+        payload = {"distortions": [], "reframes": [{"perspective": "Logical"}]}
+        with patch.object(client.model, 'generate_content_async', AsyncMock(return_value=_gemini_response(payload))) as call:
+            with pytest.raises(ParseException):
+                await client.analyze_cbt(CBTAnalysisRequest(situation="s", automatic_thought="t"))
+        call.assert_awaited_once()
+
+    async def test_stream_yields_reframes_as_they_are_generated(self):
+        """Test streaming emits distortions, then each reframe before the response has finished."""
+        from app.core.metrics import metrics
+
+        client = self._client("parallel")
+        client.prompt_manager.get_reframing_prompt = AsyncMock(return_value=("prompt", "v3"))
+        client._detect_distortions = AsyncMock(
+            return_value=([DistortionSuggestion(distortion="Labeling", reasoning="r")], "v3")
+        )
+        text = json.dumps({"reframes": [
+            {"perspective": "Compassionate", "content": "a"},
+            {"perspective": "Logical", "content": "b"},
+        ]})
+        end_of_first = text.index("}") + 1
+        pieces = [text[:20], text[20:end_of_first], text[end_of_first:]]
+        generated = []
+
+        async def chunks():
+            for piece in pieces:
+                generated.append(piece)
+                response = _gemini_response({})
+                response.text = piece
+                yield response
+
+        client.model.generate_content_async = AsyncMock(return_value=chunks())
+        before = metrics.counter("ai.analyze.stream.success")
+        events = []
+        async for event in client.analyze_cbt_stream(CBTAnalysisRequest(situation="s", automatic_thought="t")):
+            events.append((event.event, len(generated)))
+
+        assert client.model.generate_content_async.await_args.kwargs["stream"] is True
+        assert [name for name, _ in events] == ["distortions", "reframe", "reframe", "done"]
+        # The first reframe was out before the last chunk had been generated
+        assert events[1][1] < len(pieces)
+        assert metrics.counter("ai.analyze.stream.success") == before + 1
+
+    async def test_stream_safety_in_a_chunk_raises(self):
+        """Test an unsafe chunk ends the stream with SafetyException after what was already sent."""
+        from google.generativeai.types import HarmCategory
+
+        client = self._client("sequential")
+        client.prompt_manager.get_reframing_prompt = AsyncMock(return_value=("prompt", "v3"))
+        client._detect_distortions = AsyncMock(return_value=([], "v3"))
+        unsafe = _gemini_response({})
+        unsafe.text = "]}"
+        rating = Mock(category=HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT, probability=HarmProbability.HIGH)
+        unsafe.candidates = [Mock(safety_ratings=[rating])]
+        first = _gemini_response({})
+        first.text = '{"reframes": ['
+        client.model.generate_content_async = AsyncMock(return_value=_stream([first, unsafe]))
+
+        events = []
+        with pytest.raises(SafetyException):
+            async for event in client.analyze_cbt_stream(CBTAnalysisRequest(situation="s", automatic_thought="t")):
+                events.append(event.event)
+        assert events == ["distortions"]
+        assert client._log_audit.await_args.kwargs["safety_tier"] == "high"
+
+    async def test_calls_are_native_async_and_bounded(self):
+        """Test model calls never use a worker thread and at most ai_max_concurrency run at once."""
+        import asyncio
+        from app.core.metrics import metrics
+
+        client = self._client("sequential")
+        peak = 0
+
+        async def generate(prompt, **kwargs):
+            nonlocal peak
+            peak = max(peak, metrics.snapshot()["gauges"]["ai.gemini.in_flight"])
+            await asyncio.sleep(0.01)
+            return _gemini_response({"distortions": []})
+
+        client.model.generate_content_async = generate
+        with patch('asyncio.to_thread', side_effect=AssertionError("no threads")):
+            await asyncio.gather(*(client._generate_json("p") for _ in range(6)))
+
+        assert peak == 2
+        assert metrics.snapshot()["gauges"]["ai.gemini.in_flight"] == 0
+
+    async def test_timeout_cancels_the_model_call(self):
+        """Test an abandoned analysis cancels its in-flight call and frees the slot."""
+        import asyncio
+        from app.core.metrics import metrics
+
+        client = self._client("sequential")
+        cancelled = asyncio.Event()
+
+        async def generate(prompt, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        client.model.generate_content_async = generate
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                client.analyze_cbt(CBTAnalysisRequest(situation="s", automatic_thought="t")), timeout=0.05
+            )
+
+        assert cancelled.is_set()
+        assert metrics.snapshot()["gauges"]["ai.gemini.in_flight"] == 0
+
+
+@pytest.mark.anyio
+class TestDeadlineAwareRetries:
+    """Tests for retries and call timeouts under an analysis deadline."""
+
+    @pytest.fixture
+    def deadline(self):
+        from app.services.deadline import analysis_deadline
+
+        token = analysis_deadline.set(None)
+        yield
+        analysis_deadline.reset(token)
+
+    def _client(self, max_retries=2):
+        with patch('app.services.gemini_client.get_ai_config') as mock_config, \
+             patch('app.services.gemini_client.genai.configure'), \
+             patch('app.services.gemini_client.genai.GenerativeModel'):
+            mock_config.return_value.ai_max_retries = max_retries
+            mock_config.return_value.ai_max_concurrency = 2
+            mock_config.return_value.ai_hedge_enabled = False
+            mock_config.return_value.ai_timeout = 10
+            client = GeminiClient()
+        client._expected_call_seconds = Mock(return_value=2.0)
+        return client
+
+    async def test_no_retry_starts_that_cannot_finish_in_time(self, deadline):
+        """Test a failure with less than a typical call left is raised without retrying."""
+        from app.core.metrics import metrics
+        from app.services.deadline import set_analysis_deadline
+
+        client = self._client()
+        set_analysis_deadline(1.5)
+        abandoned = metrics.counter("ai.retry.abandoned")
+        with patch.object(client, '_detect_distortions', AsyncMock(side_effect=Exception("Transient"))) as detect, \
+             patch('asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            with pytest.raises(Exception, match="Transient"):
+                await client._detect_distortions_with_retry("s", "t")
+
+        assert detect.await_count == 1
+        mock_sleep.assert_not_awaited()
+        assert metrics.counter("ai.retry.abandoned") == abandoned + 1
+
+    async def test_backoff_is_jittered_and_fits_the_deadline(self, deadline):
+        """Test the backoff is drawn with full jitter and shortened so the retry still fits."""
+        from app.services.deadline import set_analysis_deadline
+
+        client = self._client()
+        set_analysis_deadline(3.0)
+        with patch.object(client, '_detect_distortions', AsyncMock(side_effect=[Exception("Transient"), ([], "v1")])), \
+             patch('app.services.gemini_client.random.uniform', return_value=2.0) as uniform, \
+             patch('asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            await client._detect_distortions_with_retry("s", "t")
+
+        uniform.assert_called_once_with(0, 1)
+        assert mock_sleep.await_args.args[0] <= 1.0
+
+    async def test_cold_process_retries_within_the_deadline(self, deadline):
+        """Test without measured calls a typical latency is assumed, not the whole call timeout."""
+        from app.services.deadline import set_analysis_deadline
+
+        client = self._client()
+        del client._expected_call_seconds
+        client.config.ai_expected_call_seconds = 2.0
+        client.config.ai_latency_min_samples = 10**9
+        set_analysis_deadline(8.0)
+        with patch.object(client, '_detect_distortions', AsyncMock(side_effect=[Exception("Transient"), ([], "v1")])) as detect, \
+             patch('asyncio.sleep', new_callable=AsyncMock):
+            await client._detect_distortions_with_retry("s", "t")
+
+        assert detect.await_count == 2
+        assert client._expected_call_seconds() == 2.0
+
+    async def test_call_timeout_comes_from_the_remaining_budget(self, deadline):
+        """Test each model call is given at most the time left, and the phase's budget use is recorded."""
+        from app.core.metrics import metrics
+        from app.services.deadline import set_analysis_deadline
+
+        client = self._client()
+        client.prompt_manager.get_distortion_prompt = AsyncMock(return_value=("prompt", "v1"))
+        generate = AsyncMock(return_value=_gemini_response({"distortions": []}))
+        client.model.generate_content_async = generate
+        used = metrics.histogram("ai.budget.distortion_detection.used_ms").count
+
+        set_analysis_deadline(4.0)
+        await client._detect_distortions_with_retry("s", "t")
+        assert 3.0 < generate.await_args.kwargs["request_options"]["timeout"] <= 4.0
+        assert metrics.histogram("ai.budget.distortion_detection.used_ms").count == used + 1
+
+        set_analysis_deadline(-1.0)
+        with pytest.raises(TimeoutError):
+            await client._generate_json("p")
+
+
+@pytest.mark.anyio
+class TestHedgedCalls:
+    """Tests for hedging slow model calls."""
+
+    @pytest.fixture(autouse=True)
+    def recent_latency(self, monkeypatch):
+        """Recent calls took 10ms, so calls are hedged after 10ms."""
+        from app.core.metrics import Histogram, metrics
+
+        latency = Histogram()
+        for _ in range(20):
+            latency.observe(10.0)
+        monkeypatch.setitem(metrics._histograms, "ai.gemini.call_ms", latency)
+        with patch('app.services.gemini_client.get_admission_controller') as admission:
+            admission.return_value.try_take.return_value = True
+            yield latency
+
+    def _client(self, max_rate=1.0):
+        with patch('app.services.gemini_client.get_ai_config') as mock_config, \
+             patch('app.services.gemini_client.genai.configure'), \
+             patch('app.services.gemini_client.genai.GenerativeModel'):
+            config = mock_config.return_value
+            config.ai_max_concurrency = 4
+            config.ai_timeout = 10
+            config.ai_hedge_enabled = True
+            config.ai_hedge_percentile = 95.0
+            config.ai_hedge_max_rate = max_rate
+            config.ai_hedge_min_samples = 10
+            config.ai_tokens_per_call = 100
+            client = GeminiClient()
+        return client
+
+    def _model(self, client, delays):
+        """Model calls that take the given delays in turn; returns the list of cancelled call numbers."""
+        import asyncio
+
+        delays = iter(delays)
+        cancelled = []
+        count = 0
+
+        async def generate(prompt, **kwargs):
+            nonlocal count
+            count += 1
+            number = count
+            try:
+                await asyncio.sleep(next(delays))
+            except asyncio.CancelledError:
+                cancelled.append(number)
+                raise
+            return _gemini_response({"call": number})
+
+        client.model.generate_content_async = generate
+        return cancelled
+
+    async def test_slow_call_is_hedged_and_the_loser_cancelled(self):
+        """Test a call still running at the percentile gets a second call, whose answer wins."""
+        from app.core.metrics import metrics
+
+        client = self._client()
+        cancelled = self._model(client, [5, 0.01])
+        sent, won = metrics.counter("ai.hedge.sent"), metrics.counter("ai.hedge.won")
+        gains = metrics.histogram("ai.hedge.gain_ms").count
+
+        assert await client._generate_json("p") == {"call": 2}
+        assert cancelled == [1]
+        assert metrics.counter("ai.hedge.sent") == sent + 1
+        assert metrics.counter("ai.hedge.won") == won + 1
+        assert metrics.histogram("ai.hedge.gain_ms").count == gains + 1
+        assert metrics.snapshot()["gauges"]["ai.gemini.in_flight"] == 0
+
+    async def test_cut_off_calls_are_recorded_censored(self, recent_latency):
+        """Test the cancelled loser and timed-out calls still add their running time to call_ms."""
+        import asyncio
+        from google.api_core.exceptions import DeadlineExceeded
+        from app.core.metrics import metrics
+
+        client = self._client()
+        self._model(client, [0.2, 0.05])
+        censored = metrics.counter("ai.gemini.call_censored")
+        await client._generate_json("p")
+        # The winner, and the loser at the time it had run when cancelled
+        assert recent_latency.count == 22
+        assert metrics.counter("ai.gemini.call_censored") == censored + 1
+        assert max(recent_latency.values()) >= 50
+
+        async def timed_out(prompt, **kwargs):
+            await asyncio.sleep(0.02)
+            raise DeadlineExceeded("timeout")
+        client.model.generate_content_async = timed_out
+        with pytest.raises(DeadlineExceeded):
+            await client._generate_once("p")
+        assert recent_latency.count == 23
+        assert metrics.counter("ai.gemini.call_censored") == censored + 2
+
+    async def test_fast_calls_are_not_hedged(self):
+        """Test a call finishing before the percentile costs one model call."""
+        from app.core.metrics import metrics
+
+        client = self._client()
+        self._model(client, [0])
+        sent = metrics.counter("ai.hedge.sent")
+
+        assert await client._generate_json("p") == {"call": 1}
+        assert metrics.counter("ai.hedge.sent") == sent
+
+    async def test_hedge_rate_is_capped(self):
+        """Test with max_rate 0.5 only every other slow call may be hedged."""
+        from app.core.metrics import metrics
+
+        client = self._client(max_rate=0.5)
+        self._model(client, [0.05, 0.05, 0.01])
+        sent, capped = metrics.counter("ai.hedge.sent"), metrics.counter("ai.hedge.capped")
+
+        # First call: half a hedge earned, so it runs alone
+        assert await client._generate_json("p") == {"call": 1}
+        assert metrics.counter("ai.hedge.capped") == capped + 1
+        # Second call: a whole hedge earned, and the hedge answers first
+        assert await client._generate_json("p") == {"call": 3}
+        assert metrics.counter("ai.hedge.sent") == sent + 1
@@ -0,0 +1,18 @@
+# backend/tests/services/test_heuristics.py
+
+from app.core.constants import COGNITIVE_DISTORTIONS
+from app.services.heuristics import guess_distortions
+
+
+class TestGuessDistortions:
+    """Tests for the local keyword distortion guess."""
+
+    def test_guesses_known_distortions_in_order(self):
+        """Test keywords map to predefined distortions in the canonical order."""
+        guess = guess_distortions("Everyone thinks I'm a failure. I should never have tried.")
+        assert guess == ["Overgeneralization", "Mind Reading", "Should Statements", "Labeling"]
+        assert all(name in COGNITIVE_DISTORTIONS for name in guess)
+
+    def test_neutral_text_guesses_nothing(self):
+        """Test ordinary text yields no guess."""
+        assert guess_distortions("Went for a walk after lunch.") == []
@@ -0,0 +1,71 @@
+# backend/tests/services/test_importer.py
+
+import json
+import pytest
+from app.services.importer import ImportFormatError, iter_export_json, iter_ndjson
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def split(data: bytes, size: int):
+    async def chunks():
+        for start in range(0, len(data), size):
+            yield data[start:start + size]
+    return chunks()
+
+
+async def collect(parser, data: bytes, size: int):
+    return [item async for item in parser(split(data, size))]
+
+
+EXPORT = {
+    "moodEntries": [{"id": "m1", "note": "naïve café ☕", "rating": 3}, {"id": "m2", "rating": 12345}],
+    "version": {"nested": [1, 2]},
+    "cbtLogs": [{"id": "c1", "situation": "a \"quoted\" } ] thing"}],
+}
+
+
+@pytest.mark.anyio
+class TestParsers:
+    """Tests for the incremental import parsers."""
+
+    @pytest.mark.parametrize("size", [1, 2, 7, 4096])
+    async def test_export_json_any_chunking(self, size):
+        """Test the export document parses identically however the bytes are split."""
+        data = json.dumps(EXPORT, indent=2, ensure_ascii=False).encode("utf-8")
+        records = await collect(iter_export_json, data, size)
+        assert records == [
+            ("mood", EXPORT["moodEntries"][0]),
+            ("mood", EXPORT["moodEntries"][1]),
+            ("cbt", EXPORT["cbtLogs"][0]),
+        ]
+
+    async def test_export_json_empty_arrays(self):
+        """Test empty documents and arrays yield nothing."""
+        assert await collect(iter_export_json, b'{"moodEntries": [], "cbtLogs": []}', 3) == []
+        assert await collect(iter_export_json, b"{}", 1) == []
+
+    @pytest.mark.parametrize("data", [b'{"moodEntries": [{"id": 1}', b'["not", "an", "object"]', b'{"moodEntries": []} trailing'])
+    async def test_export_json_malformed(self, data):
+        """Test structural errors raise ImportFormatError."""
+        with pytest.raises(ImportFormatError):
+            await collect(iter_export_json, data, 4)
+
+    @pytest.mark.parametrize("size", [1, 5, 4096])
+    async def test_ndjson_lines(self, size):
+        """Test NDJSON yields typed records and reports bad lines without stopping."""
+        data = "\n".join([
+            json.dumps({"type": "mood", "id": "m1", "note": "☕"}, ensure_ascii=False),
+            "",
+            "{not json",
+            json.dumps({"type": "other"}),
+            json.dumps({"type": "cbt", "id": "c1"}),
+        ]).encode("utf-8")
+        records = await collect(iter_ndjson, data, size)
+        assert records[0] == ("mood", {"type": "mood", "id": "m1", "note": "☕"})
+        assert records[1][0] is None and records[1][1].startswith("line 3")
+        assert records[2][0] is None and "unknown type" in records[2][1]
+        assert records[3] == ("cbt", {"type": "cbt", "id": "c1"})
@@ -0,0 +1,108 @@
+# backend/tests/services/test_single_flight.py
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from app.core.metrics import metrics
+from app.schemas.cbt import CBTAnalysisRequest, CBTAnalysisResponse
+from app.services.single_flight import SingleFlight
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+class TestSingleFlight:
+    """Tests for coalescing concurrent calls."""
+
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test callers of the same key get the result of a single call."""
+        flights = SingleFlight("test.flight.shared")
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flights.do("k", work) for _ in range(3)))
+        assert results == ["result"] * 3
+        assert len(calls) == 1
+        assert flights.stats() == {"in_flight": 0, "coalesced": 2}
+
+        # Once finished, the next call runs again
+        await flights.do("k", work)
+        assert len(calls) == 2
+
+    async def test_exception_reaches_every_caller(self):
+        """Test a failure is raised to all coalesced callers."""
+        flights = SingleFlight("test.flight.error")
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(flights.do("k", work), flights.do("k", work), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def test_cancelled_waiter_leaves_the_others_running(self):
+        """Test cancelling one caller does not cancel the shared call until nobody waits."""
+        flights = SingleFlight("test.flight.cancel")
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.create_task(flights.do("k", work))
+        second = asyncio.create_task(flights.do("k", work))
+        await started.wait()
+        first.cancel()
+        await asyncio.sleep(0)
+        assert not cancelled.is_set()
+
+        second.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        await asyncio.sleep(0)
+        assert flights.stats()["in_flight"] == 0
+
+
+@pytest.mark.anyio
+class TestGeminiAdapterSingleFlight:
+    """Tests for coalescing identical analyses in the Gemini adapter."""
+
+    async def test_identical_concurrent_analyses_share_model_calls(self):
+        """Test duplicate requests in flight cost one model call and count as coalesced."""
+        from app.services.ai_client import GeminiAdapter
+
+        with patch("app.services.ai_client.GeminiClient") as client_class:
+            adapter = GeminiAdapter()
+        client = client_class.return_value
+        client.config = Mock(ai_cache_enabled=False, ai_analysis_strategy="combined")
+        client.analysis_fingerprint = AsyncMock(return_value="fp")
+
+        async def analyze(request):
+            await asyncio.sleep(0.01)
+            return CBTAnalysisResponse(suggestions=[], reframes=[])
+        client.analyze_cbt = AsyncMock(side_effect=analyze)
+
+        before = metrics.counter("ai.single_flight.coalesced")
+        with patch("app.services.ai_client.get_admission_controller") as admission:
+            admission.return_value.admit = AsyncMock()
+            results = await asyncio.gather(
+                adapter.analyze_cbt(CBTAnalysisRequest(situation="Exam", automatic_thought="I will fail")),
+                adapter.analyze_cbt(CBTAnalysisRequest(situation=" Exam", automatic_thought="I  will fail")),
+                adapter.analyze_cbt(CBTAnalysisRequest(situation="Exam", automatic_thought="I might fail")),
+            )
+
+        assert len(results) == 3
+        assert client.analyze_cbt.await_count == 2
+        assert admission.return_value.admit.await_count == 2
+        assert metrics.counter("ai.single_flight.coalesced") - before == 1
@@ -0,0 +1,25 @@
+-- Deploy mood-tracker:add_ai_jobs to sqlite
+
+BEGIN;
+
+-- Durable queue for asynchronous CBT analysis. Workers in any process claim
+-- a job by taking a lease; a job whose lease expires is claimed again
+CREATE TABLE IF NOT EXISTS ai_jobs (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    status TEXT NOT NULL,           -- "queued", "running", "succeeded" or "failed"
+    request TEXT,                   -- JSON CBTAnalysisRequest; cleared once finished
+    result TEXT,                    -- JSON CBTAnalysisResponse
+    error TEXT,                     -- JSON {"statusCode", "detail"}
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires_at INTEGER,
+    created_at INTEGER NOT NULL,
+    started_at INTEGER,
+    finished_at INTEGER,
+    updated_at INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_ai_jobs_status_created_at ON ai_jobs(status, created_at);
+
+COMMIT;
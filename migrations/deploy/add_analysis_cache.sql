@@ -0,0 +1,20 @@
+-- Deploy mood-tracker:add_analysis_cache to sqlite
+
+BEGIN;
+
+-- Content-addressed CBT analysis results. `key` is a SHA-256 over the
+-- normalized input and model settings, so no journal text is stored in it
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,         -- JSON CBTAnalysisResponse
+    prompt_version TEXT,
+    size_bytes INTEGER NOT NULL,
+    created_at INTEGER NOT NULL,
+    expires_at INTEGER NOT NULL,
+    last_hit_at INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_expires_at ON analysis_cache(expires_at);
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_hit_at ON analysis_cache(last_hit_at);
+
+COMMIT;
@@ -0,0 +1,26 @@
+-- Deploy mood-tracker:add_change_log to sqlite
+
+BEGIN;
+
+-- Append-only change feed for delta sync. Every insert, update and delete of a
+-- mood entry or CBT log appends a row; rows with op = 'delete' are tombstones.
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    entity TEXT NOT NULL,       -- "mood" or "cbt"
+    entity_id TEXT NOT NULL,
+    op TEXT NOT NULL,           -- "upsert" or "delete"
+    changed_at INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_log_user_seq ON change_log(user_id, seq);
+
+-- Existing rows become the initial upserts so a full sync from seq 0 sees them
+INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+    SELECT user_id, 'mood', id, 'upsert', timestamp FROM mood_entries
+    WHERE NOT EXISTS (SELECT 1 FROM change_log WHERE entity = 'mood');
+INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+    SELECT user_id, 'cbt', id, 'upsert', timestamp FROM cbt_logs
+    WHERE NOT EXISTS (SELECT 1 FROM change_log WHERE entity = 'cbt');
+
+COMMIT;
@@ -0,0 +1,10 @@
+-- Deploy mood-tracker:add_data_job_leases to sqlite
+
+BEGIN;
+
+-- A running job is leased to one runner; the runner extends the lease while it
+-- works, and a job whose lease expired (its runner died) may be claimed again
+ALTER TABLE data_jobs ADD COLUMN lease_owner TEXT;
+ALTER TABLE data_jobs ADD COLUMN lease_expires_at INTEGER;
+
+COMMIT;
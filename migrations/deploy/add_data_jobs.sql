@@ -0,0 +1,27 @@
+-- Deploy mood-tracker:add_data_jobs to sqlite
+
+BEGIN;
+
+-- Background export/import jobs; artifacts and uploads live under DATA_JOBS_DIR
+CREATE TABLE IF NOT EXISTS data_jobs (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,             -- "export" or "import"
+    status TEXT NOT NULL,           -- "queued", "running", "succeeded" or "failed"
+    format TEXT NOT NULL,
+    params TEXT,                    -- JSON
+    idempotency_key TEXT,
+    file_path TEXT,                 -- export artifact or stored import upload
+    size_bytes INTEGER,
+    progress TEXT,                  -- JSON
+    error TEXT,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL,
+    finished_at INTEGER
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_data_jobs_idempotency
+    ON data_jobs(user_id, kind, idempotency_key);
+CREATE INDEX IF NOT EXISTS idx_data_jobs_status ON data_jobs(status);
+
+COMMIT;
@@ -0,0 +1,11 @@
+-- Deploy mood-tracker:add_list_indexes to sqlite
+
+BEGIN;
+
+-- Keyset pagination walks a user's history by (timestamp DESC, id)
+CREATE INDEX IF NOT EXISTS idx_mood_entries_user_timestamp_id
+    ON mood_entries(user_id, timestamp DESC, id);
+CREATE INDEX IF NOT EXISTS idx_cbt_logs_user_timestamp_id
+    ON cbt_logs(user_id, timestamp DESC, id);
+
+COMMIT;
@@ -0,0 +1,8 @@
+-- Revert mood-tracker:add_ai_jobs from sqlite
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_ai_jobs_status_created_at;
+DROP TABLE IF EXISTS ai_jobs;
+
+COMMIT;
@@ -0,0 +1,9 @@
+-- Revert mood-tracker:add_analysis_cache from sqlite
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_analysis_cache_last_hit_at;
+DROP INDEX IF EXISTS idx_analysis_cache_expires_at;
+DROP TABLE IF EXISTS analysis_cache;
+
+COMMIT;
@@ -0,0 +1,8 @@
+-- Revert mood-tracker:add_change_log from sqlite
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_change_log_user_seq;
+DROP TABLE IF EXISTS change_log;
+
+COMMIT;
@@ -0,0 +1,8 @@
+-- Revert mood-tracker:add_data_job_leases from sqlite
+
+BEGIN;
+
+ALTER TABLE data_jobs DROP COLUMN lease_expires_at;
+ALTER TABLE data_jobs DROP COLUMN lease_owner;
+
+COMMIT;
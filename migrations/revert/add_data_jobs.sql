@@ -0,0 +1,9 @@
+-- Revert mood-tracker:add_data_jobs from sqlite
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_data_jobs_status;
+DROP INDEX IF EXISTS idx_data_jobs_idempotency;
+DROP TABLE IF EXISTS data_jobs;
+
+COMMIT;
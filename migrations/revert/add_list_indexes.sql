@@ -0,0 +1,8 @@
+-- Revert mood-tracker:add_list_indexes from sqlite
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_mood_entries_user_timestamp_id;
+DROP INDEX IF EXISTS idx_cbt_logs_user_timestamp_id;
+
+COMMIT;
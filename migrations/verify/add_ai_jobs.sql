@@ -0,0 +1,9 @@
+-- Verify mood-tracker:add_ai_jobs on sqlite
+
+BEGIN;
+
+SELECT id, user_id, status, request, result, error, attempts, lease_owner,
+       lease_expires_at, created_at, started_at, finished_at, updated_at
+FROM ai_jobs WHERE 0;
+
+ROLLBACK;
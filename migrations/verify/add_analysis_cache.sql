@@ -0,0 +1,8 @@
+-- Verify mood-tracker:add_analysis_cache on sqlite
+
+BEGIN;
+
+SELECT key, response, prompt_version, size_bytes, created_at, expires_at, last_hit_at
+FROM analysis_cache WHERE 0;
+
+ROLLBACK;
@@ -0,0 +1,7 @@
+-- Verify mood-tracker:add_change_log on sqlite
+
+BEGIN;
+
+SELECT seq, user_id, entity, entity_id, op, changed_at FROM change_log WHERE 0;
+
+ROLLBACK;
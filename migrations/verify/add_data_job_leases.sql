@@ -0,0 +1,7 @@
+-- Verify mood-tracker:add_data_job_leases on sqlite
+
+BEGIN;
+
+SELECT lease_owner, lease_expires_at FROM data_jobs WHERE 0;
+
+ROLLBACK;
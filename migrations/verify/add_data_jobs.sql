@@ -0,0 +1,9 @@
+-- Verify mood-tracker:add_data_jobs on sqlite
+
+BEGIN;
+
+SELECT id, user_id, kind, status, format, params, idempotency_key, file_path,
+       size_bytes, progress, error, created_at, updated_at, finished_at
+FROM data_jobs WHERE 0;
+
+ROLLBACK;
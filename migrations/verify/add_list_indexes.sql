@@ -0,0 +1,8 @@
+-- Verify mood-tracker:add_list_indexes on sqlite
+
+BEGIN;
+
+SELECT 1/COUNT(*) FROM sqlite_master WHERE type = 'index' AND name = 'idx_mood_entries_user_timestamp_id';
+SELECT 1/COUNT(*) FROM sqlite_master WHERE type = 'index' AND name = 'idx_cbt_logs_user_timestamp_id';
+
+ROLLBACK;